@@ -0,0 +1,323 @@
+"""
+Набор замеров горячих методов всех лабораторных.
+
+Каждый замер - функция от размера набора данных: она создаёт данные и возвращает функцию, которая выполняет
+операции и возвращает их количество. Время берётся лучшее из нескольких повторов, пиковая память - по tracemalloc
+в отдельном проходе (создание данных и один запуск), чтобы трассировка не искажала время. Замеры изменений
+(mutation) создают данные заново перед каждым повтором, чтобы каждый повтор начинался с одного состояния.
+
+Запуск:
+    python benchmarks.py run --sizes 1000 10000 100000 --output current.json
+    python benchmarks.py compare baseline.json current.json --threshold 0.1
+compare завершается с кодом 1, если пропускная способность какого-либо замера упала больше чем на threshold.
+run --baseline без --output пишет сравнение в stderr, чтобы stdout оставался отчётом JSON.
+"""
+from typing import Callable, Iterable, NamedTuple, Optional, TextIO
+
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import lab_loader
+
+
+class Benchmark(NamedTuple):
+    name: str
+    kind: str  # construction, lookup, mutation или rendering
+    prepare: Callable[[int], Callable[[], int]]
+
+
+class Result(NamedTuple):
+    name: str
+    kind: str
+    size: int
+    operations: int
+    seconds: float
+    ops_per_second: float
+    peak_bytes: Optional[int]
+
+
+BENCHMARKS: list[Benchmark] = []
+
+
+def benchmark(name: str, kind: str) -> Callable:
+    def register(prepare: Callable[[int], Callable[[], int]]) -> Callable[[int], Callable[[], int]]:
+        BENCHMARKS.append(Benchmark(name, kind, prepare))
+        return prepare
+    return register
+
+
+def _lookups(size: int) -> int:
+    # Линейный поиск стоит O(size), поэтому количество запросов уменьшается с ростом размера
+    return max(10, min(10_000, 10 ** 7 // size))
+
+
+@benchmark('lab2.Book.__init__', 'construction')
+def lab2_book_init(size: int) -> Callable[[], int]:
+    book = lab_loader.load('lab2').Book
+
+    def run() -> int:
+        [book(index, f"book_{index % 1000}", 100 + index % 500) for index in range(size)]
+        return size
+    return run
+
+
+@benchmark('lab2.Library.get_index_by_book_id', 'lookup')
+def lab2_get_index(size: int) -> Callable[[], int]:
+    main = lab_loader.load('lab2')
+    library = main.Library([main.Book(index, "book", 100) for index in range(1, size + 1)])
+    ids = random.Random(0).choices(range(1, size + 1), k=_lookups(size))
+
+    def run() -> int:
+        for id_ in ids:
+            library.get_index_by_book_id(id_)
+        return len(ids)
+    return run
+
+
+@benchmark('lab2.Library.get_next_book_id', 'lookup')
+def lab2_next_id(size: int) -> Callable[[], int]:
+    main = lab_loader.load('lab2')
+    library = main.Library([main.Book(index, "book", 100) for index in range(1, size + 1)])
+    calls = _lookups(size)
+
+    def run() -> int:
+        for _ in range(calls):
+            library.get_next_book_id()
+        return calls
+    return run
+
+
+@benchmark('lab1.GameCharacter.__init__', 'construction')
+def lab1_character_init(size: int) -> Callable[[], int]:
+    character = lab_loader.load('lab1').GameCharacter
+
+    def run() -> int:
+        [character("Шарик", 100, 80, index % 50) for index in range(size)]
+        return size
+    return run
+
+
+@benchmark('lab1.GameCharacter.take_damage', 'mutation')
+def lab1_take_damage(size: int) -> Callable[[], int]:
+    character = lab_loader.load('lab1').GameCharacter
+    characters = [character("Шарик", 10 ** 9, 10 ** 9, index % 50) for index in range(size)]
+
+    def run() -> int:
+        for man in characters:
+            man.take_damage(10)
+        return size
+    return run
+
+
+@benchmark('lab1.Boot.__init__', 'construction')
+def lab1_boot_init(size: int) -> Callable[[], int]:
+    boot = lab_loader.load('lab1').Boot
+    rng = random.Random(0)
+    types, colors = sorted(boot.boots_database), sorted(boot.color_database)
+    rows = [(rng.choice(types), rng.randint(16, 60), rng.choice(colors)) for _ in range(size)]
+
+    def run() -> int:
+        [boot(*row) for row in rows]
+        return size
+    return run
+
+
+@benchmark('lab1.Boot.delta_size', 'mutation')
+def lab1_boot_delta(size: int) -> Callable[[], int]:
+    boot = lab_loader.load('lab1').Boot
+    boots = [boot('кроссовки', 16 + index % 45, 'красный') for index in range(size)]
+
+    def run() -> int:
+        for item in boots:
+            item.delta_size(1)
+            item.delta_size(-1)
+        return 2 * size
+    return run
+
+
+@benchmark('lab1.Guitar.remove_strings', 'mutation')
+def lab1_guitar_remove(size: int) -> Callable[[], int]:
+    guitar = lab_loader.load('lab1').Guitar
+    guitars = [guitar('гитара', 6, index % 2 == 0) for index in range(size)]
+
+    def run() -> int:
+        for item in guitars:
+            item.add_strings(1)
+            item.remove_strings(1)
+        return 2 * size
+    return run
+
+
+@benchmark('lab3.PaperBook.__init__', 'construction')
+def lab3_paper_init(size: int) -> Callable[[], int]:
+    paper_book = lab_loader.load('lab3').PaperBook
+
+    def run() -> int:
+        [paper_book(f"Книга {index % 1000}", "Пушкин", 1 + index % 500) for index in range(size)]
+        return size
+    return run
+
+
+@benchmark('lab3.__repr__', 'rendering')
+def lab3_repr(size: int) -> Callable[[], int]:
+    main = lab_loader.load('lab3')
+    books = [main.PaperBook(f"Книга {index}", "Пушкин", 1 + index % 500) if index % 2
+             else main.AudioBook(f"Книга {index}", "Лермонтов", 1.5 + index % 100) for index in range(size)]
+
+    def run() -> int:
+        [repr(book) for book in books]
+        return size
+    return run
+
+
+@benchmark('lab3.__str__', 'rendering')
+def lab3_str(size: int) -> Callable[[], int]:
+    main = lab_loader.load('lab3')
+    books = [main.PaperBook(f"Книга {index}", "Пушкин", 1 + index % 500) if index % 2
+             else main.AudioBook(f"Книга {index}", "Лермонтов", 1.5 + index % 100) for index in range(size)]
+
+    def run() -> int:
+        [str(book) for book in books]
+        return size
+    return run
+
+
+def measure(bench: Benchmark, size: int, repeats: int = 3, memory: bool = True) -> Result:
+    """
+    Выполняет один замер
+
+    :param bench: Замер
+    :param size: Размер набора данных
+    :param repeats: Количество повторов, берётся лучшее время
+    :param memory: Измерять ли пиковую память отдельным проходом
+    :return: Результат замера
+    """
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        bench.prepare(size)()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    best, operations = float('inf'), 0
+    run = None
+    for _ in range(repeats):
+        if run is None or bench.kind == 'mutation':
+            run = None  # прежние данные освобождаются до создания новых
+            gc.collect()
+            run = bench.prepare(size)
+        start = time.perf_counter()
+        operations = run()
+        best = min(best, time.perf_counter() - start)
+    return Result(bench.name, bench.kind, size, operations, best, operations / best if best else float('inf'), peak)
+
+
+def run_suite(sizes: Iterable[int], names: Optional[list[str]] = None, repeats: int = 3,
+              memory: bool = True) -> dict:
+    """
+    Выполняет выбранные замеры для всех размеров
+
+    :param sizes: Размеры наборов данных
+    :param names: Подстроки имён замеров, по умолчанию - все замеры
+    :param repeats: Количество повторов
+    :param memory: Измерять ли пиковую память
+    :return: Отчёт, пригодный для json.dump
+    """
+    results = []
+    for bench in BENCHMARKS:
+        if names and not any(name in bench.name for name in names):
+            continue
+        for size in sizes:
+            result = measure(bench, size, repeats, memory)
+            peak = '' if result.peak_bytes is None else f", пик {result.peak_bytes / 2 ** 20:8.1f} МиБ"
+            print(f"{bench.name:<38} {size:>9}: {result.ops_per_second:>14,.0f} оп/с{peak}", file=sys.stderr)
+            results.append(result._asdict())
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1, file: Optional[TextIO] = None) -> list[str]:
+    """
+    Сравнивает два отчёта по пропускной способности
+
+    :param baseline: Сохранённый отчёт
+    :param current: Новый отчёт
+    :param threshold: Допустимое относительное падение пропускной способности
+    :param file: Поток для вывода сравнения, по умолчанию - stdout
+    :return: Описания регрессий
+    """
+    previous = {(result['name'], result['size']): result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        old = previous.get((result['name'], result['size']))
+        if old is None:
+            continue
+        change = result['ops_per_second'] / old['ops_per_second'] - 1
+        line = f"{result['name']:<38} {result['size']:>9}: {change:+7.1%}"
+        if change < -threshold:
+            regressions.append(line)
+            line += "  РЕГРЕССИЯ"
+        print(line, file=file)
+    return regressions
+
+
+def main(arguments: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Замеры горячих методов лабораторных")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help="выполнить замеры и записать отчёт JSON")
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=[10 ** 3, 10 ** 4, 10 ** 5],
+                            help="размеры наборов данных, например 1000 10000000")
+    run_parser.add_argument('--filter', nargs='*', help="подстроки имён замеров")
+    run_parser.add_argument('--repeats', type=int, default=3)
+    run_parser.add_argument('--no-memory', action='store_true', help="не измерять пиковую память")
+    run_parser.add_argument('--output', help="файл отчёта, по умолчанию - stdout")
+    run_parser.add_argument('--baseline', help="сразу сравнить с сохранённым отчётом")
+    run_parser.add_argument('--threshold', type=float, default=0.1)
+    compare_parser = commands.add_parser('compare', help="сравнить два отчёта")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.1)
+    options = parser.parse_args(arguments)
+
+    output = None
+    if options.command == 'run':
+        report = run_suite(options.sizes, options.filter, options.repeats, not options.no_memory)
+        if options.output:
+            with open(options.output, 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+        else:
+            json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+            print()
+            output = sys.stderr  # stdout занят отчётом
+        if not options.baseline:
+            return 0
+        with open(options.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+        current = report
+    else:
+        with open(options.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+        with open(options.current, encoding='utf-8') as file:
+            current = json.load(file)
+
+    regressions = compare(baseline, current, options.threshold, output)
+    if regressions:
+        print(f"Регрессий: {len(regressions)} (порог {options.threshold:.0%})", file=output)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
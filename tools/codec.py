@@ -0,0 +1,363 @@
+"""
+Двоичный кодек для объектов всех лабораторных.
+
+Поля класса берутся из его схемы (Schema из schema.py): имя атрибута в __dict__ и допустимые типы. Подряд идущие
+объекты одного класса записываются одним блоком по столбцам: целые - array('q'), дробные - array('d'), bool -
+по байту, int или float - байт признака и array('d'), строки - общий текст UTF-8 со смещениями в символах или, если
+значения часто повторяются, словарь различных строк и array('I') номеров. Числовые столбцы выровнены по 8 байт,
+поэтому decode_columns читает их из memoryview без копирования.
+
+Формат сообщения (порядок байт little-endian):
+    MESSAGE_HEADER: b'LBC1', количество блоков;
+    блок: BLOCK_HEADER (код класса, количество объектов), столбцы в порядке полей.
+"""
+from array import array
+from itertools import accumulate
+from operator import attrgetter
+from typing import Any, Iterable, Optional, Sequence, Union
+
+import pickle
+import random
+import struct
+import sys
+import time
+
+import lab_loader
+
+
+MAGIC = b'LBC1'
+MESSAGE_HEADER = struct.Struct('<4sI')
+BLOCK_HEADER = struct.Struct('<HI')
+STRING_HEADER = struct.Struct('<BII')  # способ записи, количество строк, байт текста
+PLAIN, DICTIONARY_B, DICTIONARY_H, DICTIONARY_I = range(4)  # номера в словаре - array('B'), ('H') или ('I')
+CODE_TYPES = {DICTIONARY_B: 'B', DICTIONARY_H: 'H', DICTIONARY_I: 'I'}
+EXACT_INT = 2 ** 53  # целые с большим модулем не переживут запись в столбец 'd'
+SWAP = sys.byteorder != 'little'
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def kind_of(types: Union[type, tuple[type, ...]]) -> str:
+    """
+    Возвращает вид столбца для допустимых типов поля схемы
+
+    :param types: Тип или кортеж типов из Field.types
+    :return: 'int', 'float', 'bool', 'number' или 'str'
+    """
+    kinds = {int: 'int', float: 'float', bool: 'bool', str: 'str', (int, float): 'number', (float, int): 'number'}
+    if types not in kinds:
+        raise TypeError(f"Ошибка. Для типов {types} нет вида столбца")
+    return kinds[types]
+
+
+class _Entry:
+    def __init__(self, type_id: int, cls: type, fields: Sequence[tuple[str, str]], extra: Sequence[tuple[str, str]]):
+        self.type_id = type_id
+        self.cls = cls
+        self.fields = tuple(fields)
+        self.extra = tuple(extra)
+
+
+class _Writer:
+    def __init__(self):
+        self.out = bytearray()
+
+    def pad(self) -> None:
+        self.out += bytes(-len(self.out) % 8)
+
+    def array(self, values: array) -> None:
+        self.pad()
+        if SWAP:
+            values.byteswap()
+        self.out += values
+
+    def column(self, kind: str, values: list) -> None:
+        if kind == 'int':
+            self.array(array('q', values))
+        elif kind == 'float':
+            self.array(array('d', values))
+        elif kind == 'bool':
+            self.out += bytes(values)
+        elif kind == 'number':
+            tags = bytes([type(value) is int for value in values])
+            integers = [value for value, tag in zip(values, tags) if tag]
+            if integers and (max(integers) > EXACT_INT or min(integers) < -EXACT_INT):
+                raise OverflowError(f"Ошибка. Целые значения должны быть по модулю не больше {EXACT_INT}")
+            self.out += tags
+            self.array(array('d', values))
+        elif kind == 'int_pair':
+            self.array(array('q', [pair[0] for pair in values]))
+            self.array(array('q', [pair[1] for pair in values]))
+        elif kind == 'str':
+            unique = dict.fromkeys(values)
+            if len(unique) * 2 <= len(values):
+                codes = {value: code for code, value in enumerate(unique)}
+                mode = next(mode for mode, limit in ((DICTIONARY_B, 0x100), (DICTIONARY_H, 0x10000),
+                                                     (DICTIONARY_I, 0x100000000)) if len(unique) <= limit)
+                self.strings(mode, list(unique))
+                self.array(array(CODE_TYPES[mode], [codes[value] for value in values]))
+            else:
+                self.strings(PLAIN, values)
+        else:
+            raise ValueError(f"Ошибка. Неизвестный вид столбца {kind!r}")
+
+    def strings(self, mode: int, values: list[str]) -> None:
+        text = ''.join(values).encode('utf-8')
+        self.pad()
+        self.out += STRING_HEADER.pack(mode, len(values), len(text))
+        self.array(array('I', accumulate(map(len, values), initial=0)))
+        self.out += text
+
+
+class _Reader:
+    def __init__(self, buffer: Buffer):
+        self.view = memoryview(buffer).cast('B')
+        self.offset = 0
+
+    def pad(self) -> None:
+        self.offset += -self.offset % 8
+
+    def take(self, size: int) -> memoryview:
+        if self.offset + size > len(self.view):
+            raise ValueError("Ошибка. Сообщение обрезано")
+        view = self.view[self.offset:self.offset + size]
+        self.offset += size
+        return view
+
+    def array(self, typecode: str, count: int) -> Union[memoryview, array]:
+        self.pad()
+        view = self.take(count * array(typecode).itemsize).cast(typecode)
+        if SWAP:
+            values = array(typecode, view)
+            values.byteswap()
+            return values
+        return view
+
+    def column(self, kind: str, count: int) -> Any:
+        """ Числовые столбцы возвращаются как memoryview поверх буфера, строки - списком str. """
+        if kind == 'int':
+            return self.array('q', count)
+        if kind == 'float':
+            return self.array('d', count)
+        if kind == 'bool':
+            return self.take(count)
+        if kind == 'number':
+            return self.take(count), self.array('d', count)
+        if kind == 'int_pair':
+            return self.array('q', count), self.array('q', count)
+        if kind == 'str':
+            mode, strings = self.strings()
+            if mode in CODE_TYPES:
+                return [strings[code] for code in self.array(CODE_TYPES[mode], count).tolist()]
+            return strings
+        raise ValueError(f"Ошибка. Неизвестный вид столбца {kind!r}")
+
+    def strings(self) -> tuple[int, list[str]]:
+        self.pad()
+        mode, count, size = STRING_HEADER.unpack(self.take(STRING_HEADER.size))
+        offsets = self.array('I', count + 1).tolist()
+        # Смещения записаны в символах, поэтому текст декодируется один раз, а строки получаются срезами
+        text = str(self.take(size), 'utf-8')
+        return mode, [text[start:end] for start, end in zip(offsets, offsets[1:])]
+
+
+class Codec:
+    """
+    Кодек с реестром классов. Коды классов задаются при регистрации и должны совпадать у отправителя
+    и получателя.
+    """
+    def __init__(self):
+        self._by_id: dict[int, _Entry] = {}
+        self._by_class: dict[type, _Entry] = {}
+
+    def register(self, type_id: int, cls: type, fields: Optional[Sequence[tuple[str, str]]] = None,
+                 extra: Sequence[tuple[str, str]] = ()) -> None:
+        """
+        Регистрирует класс
+
+        :param type_id: Код класса в сообщениях, от 0 до 65535
+        :param cls: Класс
+        :param fields: Пары (атрибут, вид столбца), по умолчанию - из cls._schema
+        :param extra: Атрибуты, которые задаются не аргументами конструктора (например, Boot.catalog_version)
+        :return: None
+        """
+        if not 0 <= type_id <= 0xFFFF:
+            raise ValueError("Ошибка. type_id должен быть в пределах от 0 до 65535")
+        if type_id in self._by_id or cls in self._by_class:
+            raise ValueError("Ошибка. Класс или код уже зарегистрирован")
+        if fields is None:
+            fields = [(field.attribute, kind_of(field.types)) for field in cls._schema.fields]
+        entry = _Entry(type_id, cls, fields, extra)
+        self._by_id[type_id] = entry
+        self._by_class[cls] = entry
+
+    def encode_many(self, objects: Iterable[Any]) -> bytes:
+        """
+        Кодирует последовательность объектов зарегистрированных классов. Подряд идущие объекты одного класса
+        записываются одним блоком
+
+        :param objects: Объекты
+        :return: Сообщение
+        """
+        blocks: list[tuple[_Entry, list]] = []
+        for obj in objects:
+            entry = self._by_class.get(type(obj))
+            if entry is None:
+                raise TypeError(f"Ошибка. Класс {type(obj).__name__} не зарегистрирован в кодеке")
+            if blocks and blocks[-1][0] is entry:
+                blocks[-1][1].append(obj)
+            else:
+                blocks.append((entry, [obj]))
+
+        writer = _Writer()
+        writer.out += MESSAGE_HEADER.pack(MAGIC, len(blocks))
+        for entry, block in blocks:
+            writer.pad()
+            writer.out += BLOCK_HEADER.pack(entry.type_id, len(block))
+            for attribute, kind in entry.fields + entry.extra:
+                writer.column(kind, list(map(attrgetter(attribute), block)))
+        return bytes(writer.out)
+
+    def encode(self, obj: Any) -> bytes:
+        return self.encode_many([obj])
+
+    def decode_columns(self, buffer: Buffer) -> list[tuple[type, int, dict[str, Any]]]:
+        """
+        Разбирает сообщение на столбцы без создания объектов. Числовые столбцы - memoryview поверх buffer без
+        копирования, поэтому buffer нельзя изменять, пока они используются
+
+        :param buffer: Сообщение: bytes, bytearray, memoryview или mmap
+        :return: Для каждого блока - класс, количество объектов и столбцы: атрибут -> значения
+        """
+        reader = _Reader(buffer)
+        magic, block_count = MESSAGE_HEADER.unpack(reader.take(MESSAGE_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError("Ошибка. Это не сообщение кодека")
+        blocks = []
+        for _ in range(block_count):
+            reader.pad()
+            type_id, count = BLOCK_HEADER.unpack(reader.take(BLOCK_HEADER.size))
+            entry = self._by_id.get(type_id)
+            if entry is None:
+                raise ValueError(f"Ошибка. Класс с кодом {type_id} не зарегистрирован в кодеке")
+            columns = {attribute: reader.column(kind, count) for attribute, kind in entry.fields + entry.extra}
+            blocks.append((entry.cls, count, columns))
+        return blocks
+
+    def decode_many(self, buffer: Buffer, validate: bool = False) -> list:
+        """
+        Декодирует сообщение в объекты
+
+        :param buffer: Сообщение: bytes, bytearray, memoryview или mmap
+        :param validate: Если True, объекты создаются через cls.from_rows с проверками конструктора, иначе -
+            без проверок, как из доверенного источника
+        :return: Список объектов в исходном порядке
+        """
+        objects = []
+        for cls, count, columns in self.decode_columns(buffer):
+            entry = self._by_class[cls]
+            values = [_values(kind, columns[attribute]) for attribute, kind in entry.fields]
+            rows = zip(*values) if values else [()] * count
+            if validate:
+                objects.extend(cls.from_rows(list(rows)))
+                continue
+            block = cls._schema.build(cls, rows)
+            for attribute, kind in entry.extra:
+                for obj, value in zip(block, _values(kind, columns[attribute])):
+                    setattr(obj, attribute, value)
+            objects.extend(block)
+        return objects
+
+    def decode(self, buffer: Buffer, validate: bool = False) -> Any:
+        objects = self.decode_many(buffer, validate)
+        if len(objects) != 1:
+            raise ValueError("Ошибка. В сообщении должен быть ровно один объект")
+        return objects[0]
+
+
+def _values(kind: str, column: Any) -> list:
+    if kind in ('int', 'float'):
+        return column.tolist()
+    if kind == 'bool':
+        return list(map(bool, column))
+    if kind == 'number':
+        tags, values = column
+        return [int(value) if tag else value for tag, value in zip(tags, values.tolist())]
+    if kind == 'int_pair':
+        return list(zip(column[0].tolist(), column[1].tolist()))
+    return column
+
+
+def default_codec() -> Codec:
+    """
+    Кодек со всеми классами лабораторных: коды 1-7 закреплены за классами и не должны меняться
+
+    :return: Кодек
+    """
+    lab1, lab2, lab3 = (lab_loader.load(lab) for lab in ('lab1', 'lab2', 'lab3'))
+    codec = Codec()
+    codec.register(1, lab2.Book)
+    codec.register(2, lab3.Book)
+    codec.register(3, lab3.PaperBook)
+    codec.register(4, lab3.AudioBook)
+    codec.register(5, lab1.GameCharacter)
+    codec.register(6, lab1.Boot, extra=[('catalog_version', 'int_pair')])
+    codec.register(7, lab1.Guitar)
+    return codec
+
+
+def _datasets(size: int) -> dict[str, tuple[str, list]]:
+    lab1, lab2, lab3 = (lab_loader.load(lab) for lab in ('lab1', 'lab2', 'lab3'))
+    rng = random.Random(0)
+    authors = [f"Автор {index}" for index in range(100)]
+    boot_types, colors = sorted(lab1.Boot.boots_database), sorted(lab1.Boot.color_database)
+    return {
+        'lab2 Book': ('lab2', [lab2.Book(index, f"book_{index}", rng.randint(1, 1000)) for index in range(size)]),
+        'lab3 PaperBook': ('lab3', [lab3.PaperBook(f"Книга {index}", rng.choice(authors), rng.randint(1, 1000))
+                                    for index in range(size)]),
+        'lab3 AudioBook': ('lab3', [lab3.AudioBook(f"Книга {index}", rng.choice(authors), rng.uniform(1, 100))
+                                    for index in range(size)]),
+        'GameCharacter': ('lab1', [lab1.GameCharacter(f"Герой {index}", 100, rng.randint(0, 100), rng.uniform(0, 50))
+                                   for index in range(size)]),
+        'Boot': ('lab1', [lab1.Boot(rng.choice(boot_types), rng.randint(16, 60), rng.choice(colors))
+                          for _ in range(size)]),
+        'Guitar': ('lab1', [lab1.Guitar('гитара', rng.randint(4, 12), rng.random() < 0.5) for _ in range(size)]),
+    }
+
+
+def _best(function, repeats: int) -> tuple[float, Any]:
+    best, result = float('inf'), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def benchmark(size: int = 100_000, repeats: int = 3) -> None:
+    """
+    Сравнивает размер сообщения и время кодирования и декодирования списка объектов с pickle (протокол 5)
+
+    :param size: Количество объектов каждого класса
+    :param repeats: Количество повторов, берётся лучшее время
+    :return: None
+    """
+    codec = default_codec()
+    print(f"{size} объектов; размер в байтах на объект, время в мс")
+    print(f"{'':>15} {'pickle':>8} {'codec':>8} | {'dumps':>7} {'loads':>7} | {'encode':>7} {'decode':>7} "
+          f"{'columns':>7}")
+    for title, (lab, objects) in _datasets(size).items():
+        with lab_loader.active(lab):
+            dump_time, pickled = _best(lambda: pickle.dumps(objects, protocol=5), repeats)
+            load_time, _ = _best(lambda: pickle.loads(pickled), repeats)
+        encode_time, encoded = _best(lambda: codec.encode_many(objects), repeats)
+        decode_time, decoded = _best(lambda: codec.decode_many(encoded), repeats)
+        columns_time, _ = _best(lambda: codec.decode_columns(memoryview(encoded)), repeats)
+        assert [obj.__dict__ for obj in decoded] == [obj.__dict__ for obj in objects]
+        print(f"{title:>15} {len(pickled) / size:>8.1f} {len(encoded) / size:>8.1f} | {dump_time * 1e3:>7.1f} "
+              f"{load_time * 1e3:>7.1f} | {encode_time * 1e3:>7.1f} {decode_time * 1e3:>7.1f} "
+              f"{columns_time * 1e3:>7.2f}")
+
+
+if __name__ == '__main__':
+    benchmark()
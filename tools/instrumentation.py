@@ -0,0 +1,341 @@
+"""
+Подключаемое измерение методов классов лабораторных.
+
+Instrumentation.attach заменяет методы класса обёртками, которые считают вызовы и исключения по типам и
+записывают время выполнения в гистограмму; detach возвращает исходные методы, поэтому выключенное измерение ничего
+не стоит. В режиме выборки (every > 1) время измеряется у каждого every-го вызова, а вызовы и исключения
+по-прежнему считаются все.
+
+Снимок выгружается в JSON или в текстовом формате Prometheus - в файл (write) или по HTTP (serve):
+/metrics - Prometheus, /metrics.json - JSON.
+"""
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Iterable, Optional
+
+import doctest
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+
+import lab_loader
+
+
+# Верхние границы корзин гистограммы в секундах, последняя корзина - +Inf
+BUCKETS = (1e-7, 2.5e-7, 5e-7, 1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0)
+
+
+class MethodStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.read_calls: Callable[[], int] = lambda: 0  # счётчик вызовов живёт в замыкании обёртки
+        self.sampled = 0
+        self.total_seconds = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.exceptions: dict[str, int] = {}
+
+    @property
+    def calls(self) -> int:
+        return self.read_calls()
+
+    def observe(self, seconds: float) -> None:
+        self.sampled += 1
+        self.total_seconds += seconds
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    def error(self, error: BaseException) -> None:
+        name = type(error).__name__
+        self.exceptions[name] = self.exceptions.get(name, 0) + 1
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'sampled': self.sampled,
+            'total_seconds': self.total_seconds,
+            'buckets': dict(zip([*map(str, BUCKETS), '+Inf'], self.buckets)),
+            'exceptions': dict(self.exceptions),
+        }
+
+
+# Внутренние имена обёртки начинаются с PREFIX, чтобы не совпасть с параметрами метода, которые обёртка повторяет
+PREFIX = '__ins_'
+_WRAPPER_SOURCE = """
+def __ins_factory(__ins_function, __ins_stats, __ins_every, __ins_perf_counter):
+    __ins_calls = 0
+
+    def __ins_wrapper({parameters}):
+        nonlocal __ins_calls
+        __ins_calls += 1
+        if __ins_calls % __ins_every:
+            try:
+                return __ins_function({parameters})
+            except BaseException as __ins_error:
+                __ins_stats.error(__ins_error)
+                raise
+        __ins_start = __ins_perf_counter()
+        try:
+            return __ins_function({parameters})
+        except BaseException as __ins_error:
+            __ins_stats.error(__ins_error)
+            raise
+        finally:
+            __ins_stats.observe(__ins_perf_counter() - __ins_start)
+
+    def __ins_read():
+        return __ins_calls
+    return __ins_wrapper, __ins_read
+"""
+
+
+def _wrap(function: Callable, stats: MethodStats, every: int) -> Callable:
+    # Обёртка генерируется с той же сигнатурой, что и у метода: передача *args и **kwargs заметно дороже,
+    # а счётчик в замыкании дешевле атрибута объекта
+    try:
+        parameters = inspect.signature(function).parameters.values()
+    except (TypeError, ValueError):
+        parameters = None
+    simple = parameters is not None and all(parameter.kind is parameter.POSITIONAL_OR_KEYWORD
+                                            and not parameter.name.startswith(PREFIX) for parameter in parameters)
+    source = _WRAPPER_SOURCE.format(parameters=", ".join(parameter.name for parameter in parameters) if simple
+                                    else f"*{PREFIX}args, **{PREFIX}kwargs")
+    namespace: dict[str, Any] = {}
+    exec(compile(source, f"<wrapper {stats.name}>", "exec"), namespace)
+    wrapper, stats.read_calls = namespace[f'{PREFIX}factory'](function, stats, every, time.perf_counter)
+    functools.update_wrapper(wrapper, function)
+    if simple:
+        wrapper.__defaults__ = function.__defaults__
+    return wrapper
+
+
+class Instrumentation:
+    """
+    Набор измеряемых методов. Счётчики обновляются без блокировок: при вызовах из нескольких потоков отдельные
+    приращения могут теряться, что для статистики допустимо.
+    """
+    def __init__(self, every: int = 1):
+        """
+        :param every: Измерять время каждого every-го вызова (1 - каждого)
+        """
+        if not isinstance(every, int) or every < 1:
+            raise ValueError("Ошибка. every должен быть целым числом больше либо равным 1")
+        self.every = every
+        self.stats: dict[str, MethodStats] = {}
+        self._originals: list[tuple[type, str, Optional[Any]]] = []  # класс, имя, собственный атрибут класса
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def attach(self, cls: type, names: Iterable[str]) -> None:
+        """
+        Заменяет методы класса измеряющими обёртками. Поддерживаются обычные методы, classmethod и staticmethod,
+        в том числе унаследованные
+
+        :param cls: Класс
+        :param names: Имена методов
+        :return: None
+
+        Примеры:
+        >>> class Probe:
+        ...     def start(self, start, calls=1):
+        ...         return start * calls
+        ...     def function(self, function, every, stats=None):
+        ...         return function(every)
+        >>> with Instrumentation() as instrumentation:
+        ...     instrumentation.attach(Probe, ['start', 'function'])
+        ...     print(Probe().start(5), Probe().start(5, calls=3), Probe().function(abs, -2))
+        5 15 2
+        >>> print(instrumentation.stats['Probe.start'].calls, instrumentation.stats['Probe.function'].calls)
+        2 1
+        """
+        for name in names:
+            key = f"{cls.__name__}.{name}"
+            if key in self.stats:
+                raise ValueError(f"Ошибка. Метод {key} уже измеряется")
+            for klass in cls.__mro__:
+                if name in klass.__dict__:
+                    attribute = klass.__dict__[name]
+                    break
+            else:
+                raise AttributeError(f"Ошибка. У класса {cls.__name__} нет метода {name}")
+            stats = self.stats[key] = MethodStats(key)
+            if isinstance(attribute, (classmethod, staticmethod)):
+                wrapper = type(attribute)(_wrap(attribute.__func__, stats, self.every))
+            elif callable(attribute):
+                wrapper = _wrap(attribute, stats, self.every)
+            else:
+                raise TypeError(f"Ошибка. {key} не является методом")
+            self._originals.append((cls, name, cls.__dict__.get(name)))
+            setattr(cls, name, wrapper)
+
+    def detach(self) -> None:
+        """ Возвращает исходные методы всех классов. Накопленная статистика сохраняется. """
+        for cls, name, original in reversed(self._originals):
+            if original is None:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, original)
+        self._originals.clear()
+
+    def __enter__(self) -> "Instrumentation":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.detach()
+        self.stop_server()
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        return {key: stats.snapshot() for key, stats in self.stats.items()}
+
+    def to_json(self) -> str:
+        return json.dumps({'created': time.time(), 'every': self.every, 'methods': self.snapshot()},
+                          ensure_ascii=False, indent=2)
+
+    def to_prometheus(self) -> str:
+        """
+        Снимок в текстовом формате Prometheus. Гистограмма строится по измеренным (выборочным) вызовам
+
+        :return: Текст метрик
+        """
+        lines = [
+            "# HELP lab_method_calls_total Количество вызовов метода",
+            "# TYPE lab_method_calls_total counter",
+        ]
+        lines += [f'lab_method_calls_total{{method="{key}"}} {stats.calls}' for key, stats in self.stats.items()]
+        lines += [
+            "# HELP lab_method_exceptions_total Количество исключений по типам",
+            "# TYPE lab_method_exceptions_total counter",
+        ]
+        for key, stats in self.stats.items():
+            lines += [f'lab_method_exceptions_total{{method="{key}",exception="{name}"}} {count}'
+                      for name, count in stats.exceptions.items()]
+        lines += [
+            "# HELP lab_method_latency_seconds Время выполнения метода",
+            "# TYPE lab_method_latency_seconds histogram",
+        ]
+        for key, stats in self.stats.items():
+            cumulative = 0
+            for bound, count in zip([*map(repr, BUCKETS), '+Inf'], stats.buckets):
+                cumulative += count
+                lines.append(f'lab_method_latency_seconds_bucket{{method="{key}",le="{bound}"}} {cumulative}')
+            lines.append(f'lab_method_latency_seconds_sum{{method="{key}"}} {stats.total_seconds!r}')
+            lines.append(f'lab_method_latency_seconds_count{{method="{key}"}} {stats.sampled}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str, fmt: str = 'json') -> None:
+        """
+        Атомарно записывает снимок в файл
+
+        :param path: Путь к файлу
+        :param fmt: 'json' или 'prometheus'
+        :return: None
+        """
+        if fmt not in ('json', 'prometheus'):
+            raise ValueError("Ошибка. fmt должен быть 'json' или 'prometheus'")
+        text = self.to_json() if fmt == 'json' else self.to_prometheus()
+        temporary = f"{path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as file:
+            file.write(text)
+        os.replace(temporary, path)
+
+    def serve(self, port: int = 9108, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """
+        Запускает HTTP-сервер метрик в фоновом потоке
+
+        :param port: Порт, 0 - любой свободный
+        :param host: Адрес, по умолчанию только локальный
+        :return: Сервер; фактический порт - server.server_address[1]
+        """
+        instrumentation = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path == '/metrics':
+                    body, content_type = instrumentation.to_prometheus(), 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json':
+                    body, content_type = instrumentation.to_json(), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', f"{content_type}; charset=utf-8")
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.stop_server()
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+    def stop_server(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def attach_defaults(instrumentation: Instrumentation) -> None:
+    """
+    Подключает измерение к горячим методам лабораторных
+
+    :param instrumentation: Набор измеряемых методов
+    :return: None
+    """
+    lab1, lab2 = lab_loader.load('lab1'), lab_loader.load('lab2')
+    instrumentation.attach(lab1.GameCharacter, ['take_damage', 'reduce_health', 'increase_health'])
+    instrumentation.attach(lab1.Boot, ['__init__', 'add_boot_type', 'remove_boot_type', 'delta_size'])
+    instrumentation.attach(lab1.Guitar, ['add_strings', 'remove_strings'])
+    instrumentation.attach(lab2.Library, ['get_next_book_id', 'get_index_by_book_id'])
+
+
+def measure_overhead(calls: int = 100_000, repeats: int = 15) -> None:
+    """
+    Сравнивает время GameCharacter.take_damage без измерения, с измерением каждого вызова и с выборкой.
+    Варианты чередуются в каждом повторе, чтобы колебания скорости машины сказывались на всех одинаково
+
+    :param calls: Количество вызовов в замере
+    :param repeats: Количество повторов, берётся лучшее время
+    :return: None
+    """
+    character = lab_loader.load('lab1').GameCharacter
+    man = character("Шарик", 10 ** 12, 10 ** 12, 10)
+    variants = (None, 1, 16, 256)
+    best = dict.fromkeys(variants, float('inf'))
+    for _ in range(repeats):
+        for every in variants:
+            instrumentation = Instrumentation(every or 1)
+            if every is not None:
+                instrumentation.attach(character, ['take_damage'])
+            take_damage = man.take_damage
+            start = time.perf_counter()
+            for _ in range(calls):
+                take_damage(1)
+            best[every] = min(best[every], (time.perf_counter() - start) / calls)
+            instrumentation.detach()
+    baseline = best[None]
+    print(f"без измерения {baseline * 1e9:6.0f} нс/вызов")
+    for every in variants[1:]:
+        print(f"every={every:<4} {best[every] * 1e9:6.0f} нс/вызов, "
+              f"накладные расходы {best[every] / baseline - 1:+.1%}")
+
+
+if __name__ == '__main__':
+    doctest.testmod()
+    measure_overhead()
+
+    with Instrumentation() as demo:
+        attach_defaults(demo)
+        boot_class = lab_loader.load('lab1').Boot
+        boot_class.add_boot_type('мокасины')
+        for boot_size in (40, 41, 70):
+            try:
+                boot_class('мокасины', boot_size, 'синий').delta_size(1)
+            except ValueError:
+                pass
+        boot_class.remove_boot_type('мокасины')
+        print(demo.to_prometheus())
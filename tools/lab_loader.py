@@ -0,0 +1,103 @@
+"""
+Загрузка модулей лабораторных работ по пути к папке.
+
+Каждая лабораторная - самостоятельная папка, модули которой импортируют друг друга по простому имени
+(from main import Book, from schema import Schema), поэтому у трёх лабораторных совпадают имена модулей main и
+schema. load() импортирует модуль так, чтобы эти имена указывали на модули нужной лабораторной, а затем убирает
+их из sys.modules. active() временно возвращает модули лабораторной в sys.modules, например для pickle, который
+ищет класс по имени модуля.
+
+Общие модули (SHARED) скопированы в папки лабораторных без изменений; запуск этого файла как скрипта сверяет копии.
+"""
+from contextlib import contextmanager
+from pathlib import Path
+from types import ModuleType
+from typing import Iterator
+
+import importlib
+import sys
+
+
+ROOT = Path(__file__).resolve().parent.parent
+LABS = {
+    'lab1': ROOT / 'Основы ООП' / 'Лабораторная 1' / 'task1',
+    'lab2': ROOT / 'Атрибуты и методы' / 'Лабораторная 2' / 'Класс Library',
+    'lab3': ROOT / 'Инкапсуляция, наследование, полиморфизм' / 'Лабораторная 3' / 'task1',
+}
+
+SHARED = ('schema.py',)  # модули, одинаковые во всех лабораторных, где они есть
+
+_modules: dict[str, dict[str, ModuleType]] = {lab: {} for lab in LABS}
+
+
+def _folder(lab: str) -> Path:
+    if lab not in LABS:
+        raise ValueError(f"Ошибка. Лабораторной {lab!r} нет, доступны {', '.join(LABS)}")
+    return LABS[lab]
+
+
+def _in_folder(module: ModuleType, folder: Path) -> bool:
+    path = getattr(module, '__file__', None)
+    return path is not None and Path(path).resolve().parent == folder
+
+
+@contextmanager
+def active(lab: str) -> Iterator[dict[str, ModuleType]]:
+    """
+    Контекстный менеджер: на время блока в sys.modules под простыми именами стоят модули лабораторной, а
+    одноимённые модули других папок убраны
+
+    :param lab: Ключ лабораторной: 'lab1', 'lab2' или 'lab3'
+    :return: Загруженные модули лабораторной: имя -> модуль
+    """
+    folder = _folder(lab)
+    modules = _modules[lab]
+    saved = {name: sys.modules.pop(name) for name in [path.stem for path in folder.glob('*.py')]
+             if name in sys.modules and not _in_folder(sys.modules[name], folder)}
+    sys.modules.update(modules)
+    sys.path.insert(0, str(folder))
+    try:
+        yield modules
+    finally:
+        sys.path.remove(str(folder))
+        for name, module in list(sys.modules.items()):
+            if _in_folder(module, folder):
+                modules[name] = module
+                del sys.modules[name]
+        sys.modules.update(saved)
+
+
+def load(lab: str, name: str = 'main') -> ModuleType:
+    """
+    Импортирует модуль лабораторной один раз и возвращает его
+
+    :param lab: Ключ лабораторной: 'lab1', 'lab2' или 'lab3'
+    :param name: Имя модуля в папке лабораторной, по умолчанию main
+    :return: Модуль
+    """
+    modules = _modules[lab] if lab in LABS else {}
+    if name in modules:
+        return modules[name]
+    with active(lab):
+        return importlib.import_module(name)
+
+
+def mismatched_copies() -> list[Path]:
+    """
+    Сверяет копии общих модулей SHARED в папках лабораторных
+
+    :return: Пути копий, отличающихся от копии первой лабораторной, в которой модуль есть
+    """
+    mismatched = []
+    for name in SHARED:
+        copies = [folder / name for folder in LABS.values() if (folder / name).exists()]
+        reference = copies[0].read_bytes() if copies else b""
+        mismatched.extend(path for path in copies[1:] if path.read_bytes() != reference)
+    return mismatched
+
+
+if __name__ == '__main__':
+    differing = mismatched_copies()
+    for path in differing:
+        print(f"Ошибка. {path.relative_to(ROOT)} отличается от других копий", file=sys.stderr)
+    sys.exit(1 if differing else 0)
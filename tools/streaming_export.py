@@ -0,0 +1,307 @@
+"""
+Потоковая выгрузка каталогов книг лабораторных 2 и 3 в CSV, JSON Lines и текст из repr объектов.
+
+Книги обрабатываются порциями по chunk_size. Книги порции разбиваются по классам; у каждого класса значения полей
+читаются по столбцам через attrgetter по именам атрибутов из схемы класса, а строки собираются одним шаблоном
+%-форматирования и сливаются обратно в исходном порядке. Порция сразу пишется в буферизованный файл, поэтому памяти
+нужно на одну порцию, сколько бы книг ни было в каталоге, а промежуточных строк вида super().__repr__()[:-1] не
+создаётся.
+
+export(..., workers=N) делит последовательность книг на N частей, записывает их в отдельные файлы параллельно
+(процессами, если доступен fork, иначе потоками) и склеивает файлы.
+"""
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import compress, islice, repeat
+from json.encoder import encode_basestring
+from operator import attrgetter, is_
+from typing import Any, Callable, Iterable, Optional, Sequence, TextIO
+
+import csv
+import gc
+import json
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import lab_loader
+
+
+FORMATS = ('csv', 'jsonl', 'repr')
+
+
+class Layout:
+    """ Описание выгрузки одного класса книг: поля из схемы класса и шаблон repr. """
+    def __init__(self, cls: type, repr_template: str, repr_transforms: Optional[dict[str, Callable]] = None):
+        """
+        :param cls: Класс книг со схемой _schema
+        :param repr_template: Шаблон %-форматирования, совпадающий с cls.__repr__, по одному месту на поле схемы
+        :param repr_transforms: Имя поля -> преобразование столбца значений, которое повторяет __repr__ (например,
+            округление)
+        """
+        self.cls = cls
+        self.type_name = cls.__name__
+        self.names = [field.name for field in cls._schema.fields]
+        self.getters = [attrgetter(field.attribute) for field in cls._schema.fields]
+        self.kinds = [field.types for field in cls._schema.fields]
+        self.repr_template = repr_template + "\n"
+        self.repr_transforms = dict(repr_transforms or {})
+        unknown = set(self.repr_transforms) - set(self.names)
+        if unknown:
+            raise ValueError(f"Ошибка. У класса {self.type_name} нет полей {', '.join(sorted(unknown))}")
+        self.json_template = "{" + ", ".join([f'"type": "{self.type_name}"'] + [
+            f'"{name}": {"%d" if kind is int else "%s"}' for name, kind in zip(self.names, self.kinds)
+        ]) + "}\n"
+
+    def columns(self, books: list) -> list[list]:
+        return [list(map(getter, books)) for getter in self.getters]
+
+
+def _json_column(kind: type, values: list) -> Iterable:
+    if kind is str:
+        return map(encode_basestring, values)
+    if kind is float:
+        # repr дробного числа совпадает с json.dumps, кроме inf и nan
+        return map(float.__repr__, values) if all(map(math.isfinite, values)) else map(json.dumps, values)
+    return values
+
+
+class Exporter:
+    """
+    Выгрузка смешанного каталога книг. Столбцы CSV - type и объединение полей всех классов в порядке
+    регистрации; у книги, в классе которой поля нет, ячейка пустая.
+    """
+    def __init__(self, layouts: Iterable[Layout] = (), chunk_size: int = 8192):
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError("Ошибка. chunk_size должен быть целым числом больше либо равным 1")
+        self.chunk_size = chunk_size
+        self.layouts: dict[type, Layout] = {}
+        self.columns: list[str] = []
+        for layout in layouts:
+            self.register(layout)
+
+    @classmethod
+    def for_lab(cls, lab: str, chunk_size: int = 8192) -> "Exporter":
+        """
+        Выгрузка книг лабораторной 2 или 3
+
+        :param lab: 'lab2' или 'lab3'
+        :param chunk_size: Количество книг в порции
+        :return: Объект выгрузки
+        """
+        main = lab_loader.load(lab)
+        if lab == 'lab2':
+            layouts = [Layout(main.Book, "Book(id_=%s, name='%s', pages=%s)")]
+        elif lab == 'lab3':
+            layouts = [
+                Layout(main.Book, "Book(name=%r, author=%r)"),
+                Layout(main.PaperBook, "PaperBook(name=%r, author=%r, pages=%s)"),
+                Layout(main.AudioBook, "AudioBook(name=%r, author=%r, duration=%s)",
+                       {'duration': lambda durations: map(round, durations, repeat(2))}),
+            ]
+        else:
+            raise ValueError("Ошибка. Выгрузка поддерживается для 'lab2' и 'lab3'")
+        return cls(layouts, chunk_size)
+
+    def register(self, layout: Layout) -> None:
+        self.layouts[layout.cls] = layout
+        self.columns += [name for name in layout.names if name not in self.columns]
+
+    def _layout(self, cls: type) -> Layout:
+        layout = self.layouts.get(cls)
+        if layout is None:
+            raise TypeError(f"Ошибка. Для класса {cls.__name__} не задано описание выгрузки")
+        return layout
+
+    def _rows(self, fmt: str, cls: type, books: list) -> Iterable:
+        """ Строки выгрузки книг одного класса: str для repr и jsonl, кортежи ячеек для csv. """
+        layout = self.layouts.get(cls)
+        if fmt == 'repr':
+            if layout is None:
+                # Незарегистрированный класс выгружается его собственным __repr__
+                return map("%r\n".__mod__, books)
+            columns = layout.columns(books)
+            for index, name in enumerate(layout.names):
+                if name in layout.repr_transforms:
+                    columns[index] = layout.repr_transforms[name](columns[index])
+            return map(layout.repr_template.__mod__, zip(*columns))
+        layout = self._layout(cls)
+        columns = layout.columns(books)
+        if fmt == 'jsonl':
+            columns = [_json_column(kind, values) for kind, values in zip(layout.kinds, columns)]
+            return map(layout.json_template.__mod__, zip(*columns))
+        by_name = dict(zip(layout.names, columns))
+        return zip(repeat(layout.type_name), *[by_name.get(name, repeat('')) for name in self.columns])
+
+    def _write_chunk(self, fmt: str, chunk: list, file: TextIO, writer: Any) -> None:
+        types = list(map(type, chunk))
+        classes = dict.fromkeys(types)
+        if len(classes) == 1:
+            rows = self._rows(fmt, types[0], chunk)
+        else:
+            # Книги каждого класса выгружаются своим шаблоном, затем строки сливаются обратно в исходном порядке:
+            # map(next, ...) берёт очередную строку класса очередной книги без цикла Python по книгам
+            rendered = {cls: iter(self._rows(fmt, cls, list(compress(chunk, map(is_, types, repeat(cls))))))
+                        for cls in classes}
+            rows = map(next, map(rendered.__getitem__, types))
+        if writer is None:
+            file.write("".join(rows))
+        else:
+            writer.writerows(rows)
+
+    def write(self, books: Iterable, file: TextIO, fmt: str, header: bool = True) -> int:
+        """
+        Записывает книги в открытый текстовый файл
+
+        :param books: Книги, в том числе генератор
+        :param file: Файл, открытый на запись с newline=''
+        :param fmt: 'csv', 'jsonl' или 'repr'
+        :param header: Записывать ли строку заголовка CSV
+        :return: Количество записанных книг
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Ошибка. fmt должен быть одним из {', '.join(FORMATS)}")
+        writer = csv.writer(file, lineterminator="\n") if fmt == 'csv' else None
+        if writer is not None and header:
+            writer.writerow(['type', *self.columns])
+        iterator = iter(books)
+        count = 0
+        while chunk := list(islice(iterator, self.chunk_size)):
+            self._write_chunk(fmt, chunk, file, writer)
+            count += len(chunk)
+        return count
+
+    def export(self, books: Iterable, path: str, fmt: str, workers: int = 1) -> int:
+        """
+        Записывает книги в файл. При workers > 1 части каталога записываются во временные файлы параллельно и
+        затем склеиваются
+
+        :param books: Книги
+        :param path: Путь к файлу
+        :param fmt: 'csv', 'jsonl' или 'repr'
+        :param workers: Количество параллельно записываемых частей
+        :return: Количество записанных книг
+        """
+        if not isinstance(workers, int) or workers < 1:
+            raise ValueError("Ошибка. workers должен быть целым числом больше либо равным 1")
+        global _shared
+        if workers > 1:
+            if not isinstance(books, Sequence):
+                books = list(books)
+            workers = min(workers, len(books))  # пустые части не создаются
+        if workers <= 1:
+            with open(path, 'w', encoding='utf-8', newline='', buffering=2 ** 20) as file:
+                return self.write(books, file, fmt)
+
+        bounds = [len(books) * index // workers for index in range(workers + 1)]
+        directory = os.path.dirname(os.path.abspath(path))
+        parts: list[str] = []
+        _shared = (self, books, fmt)
+        try:
+            for index in range(workers):
+                fd, part = tempfile.mkstemp(dir=directory, suffix=f".part{index}")
+                parts.append(part)
+                os.close(fd)  # часть открывается заново по имени в процессе пула
+            with _executor(workers) as executor:
+                counts = list(executor.map(_write_part, parts, bounds, bounds[1:], range(workers)))
+            with open(path, 'wb') as out:
+                for part in parts:
+                    with open(part, 'rb') as source:
+                        shutil.copyfileobj(source, out, 2 ** 20)
+        finally:
+            _shared = None
+            for part in parts:
+                os.unlink(part)
+        return sum(counts)
+
+
+# Книги и объект выгрузки передаются частям через глобальную переменную: процессы, созданные fork, получают её
+# без pickle, а передаются им только границы частей
+_shared: Optional[tuple[Exporter, Sequence, str]] = None
+
+
+def _write_part(path: str, start: int, stop: int, index: int) -> int:
+    exporter, books, fmt = _shared
+    with open(path, 'w', encoding='utf-8', newline='', buffering=2 ** 20) as file:
+        return exporter.write(books[start:stop], file, fmt, header=index == 0)
+
+
+def _executor(workers: int) -> Executor:
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork'))
+    return ThreadPoolExecutor(workers)
+
+
+def _mixed_books(size: int) -> list:
+    main = lab_loader.load('lab3')
+    rng = random.Random(0)
+    return [main.PaperBook(f"Книга {index}", "Пушкин", rng.randint(1, 1000)) if index % 2
+            else main.AudioBook(f"Книга {index}", "Лермонтов", rng.uniform(1, 100)) for index in range(size)]
+
+
+def benchmark(size: int = 10 ** 6, workers: int = 4) -> None:
+    """
+    Сравнивает выгрузку смешанного каталога лабораторной 3 через repr каждой книги (список строк repr, как в
+    блоках __main__) с потоковой выгрузкой во всех форматах: время и пик памяти сверх самих книг
+
+    :param size: Количество книг
+    :param workers: Количество частей для параллельной выгрузки
+    :return: None
+    """
+    books = _mixed_books(size)
+    exporter = Exporter.for_lab('lab3')
+
+    def repr_path(path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write("\n".join([repr(book) for book in books]) + "\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        baseline_path = os.path.join(directory, "baseline.txt")
+        variants = [("repr каждой книги", lambda: repr_path(baseline_path))]
+        for fmt in FORMATS:
+            path = os.path.join(directory, f"export.{fmt}")
+            variants.append((f"поток {fmt}", lambda fmt=fmt, path=path: exporter.export(books, path, fmt)))
+        path = os.path.join(directory, "parallel.repr")
+        variants.append((f"поток repr, {workers} части",
+                         lambda: exporter.export(books, path, 'repr', workers=workers)))
+
+        baseline = None
+        for name, run in variants:
+            gc.collect()
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            tracemalloc.start()
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            baseline = baseline or elapsed
+            print(f"{name:<22} {size / elapsed:>12,.0f} книг/с  x{baseline / elapsed:4.1f}  "
+                  f"пик {peak / 2 ** 20:7.1f} МиБ")
+        with open(baseline_path, encoding='utf-8') as expected, \
+                open(os.path.join(directory, "export.repr"), encoding='utf-8') as streamed:
+            assert expected.read() == streamed.read()
+
+
+if __name__ == '__main__':
+    lab2, lab3 = lab_loader.load('lab2'), lab_loader.load('lab3')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        demo_books = [lab3.PaperBook('У лукоморья', 'Пушкин', 26), lab3.AudioBook('Пиковая дама', 'Пушкин', 120.5),
+                      lab3.AudioBook('Герой "нашего" времени', 'Лермонтов', 54.9712),
+                      lab3.Book('Азбука', 'Крузенштерн')]
+        for demo_fmt in FORMATS:
+            demo_path = os.path.join(tmp_dir, f"demo.{demo_fmt}")
+            Exporter.for_lab('lab3').export(demo_books, demo_path, demo_fmt, workers=2)
+            with open(demo_path, encoding='utf-8') as demo_file:
+                print(demo_file.read())
+        demo_path = os.path.join(tmp_dir, "lab2.repr")
+        Exporter.for_lab('lab2').export([lab2.Book(1, "test_name_1", 200), lab2.Book(2, "test_name_2", 400)],
+                                        demo_path, 'repr')
+        with open(demo_path, encoding='utf-8') as demo_file:
+            print(demo_file.read())
+
+    benchmark()
@@ -0,0 +1,190 @@
+from itertools import islice
+from typing import Callable, Iterator, NamedTuple, Optional, TextIO
+
+import csv
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from main import BOOKS_DATABASE, Book, Library
+
+
+class BadRow(NamedTuple):
+    """ Строка источника, из которой не удалось создать книгу. """
+    line_number: int
+    raw: str
+    error: Exception
+
+
+def report_to_stderr(bad_row: BadRow) -> None:
+    """ Обработчик ошибочных строк по умолчанию: выводит их в stderr и не прерывает загрузку. """
+    print(f"Строка {bad_row.line_number} пропущена: {bad_row.error}", file=sys.stderr)
+
+
+def _parse_json_line(line: str) -> Book:
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise TypeError("Ошибка. Запись должна быть объектом JSON")
+    return Book(id_=record["id"], name=record["name"], pages=record["pages"])
+
+
+def _parse_csv_record(values: list[str], header: list[str]) -> Book:
+    if len(values) != len(header):
+        raise ValueError(f"Ошибка. Ожидалось {len(header)} полей, получено {len(values)}")
+    record = dict(zip(header, values))
+    return Book(id_=int(record["id"]), name=record["name"], pages=int(record["pages"]))
+
+
+def _iter_csv(file: TextIO, on_error: Callable[[BadRow], None]) -> Iterator[Book]:
+    # Один csv.reader на весь файл: поле в кавычках может содержать перевод строки, и запись займёт несколько
+    # физических строк. Номер строки в BadRow - номер последней строки записи
+    reader = csv.reader(file)
+    header = next(reader, [])
+    while True:
+        try:
+            values = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as error:
+            on_error(BadRow(reader.line_num, "", error))
+            continue
+        if not any(values):
+            continue
+        try:
+            book = _parse_csv_record(values, header)
+        except (KeyError, TypeError, ValueError) as error:
+            on_error(BadRow(reader.line_num, ",".join(values), error))
+            continue
+        yield book
+
+
+def iter_books(path: str, chunk_size: int = 10_000, fmt: Optional[str] = None,
+               on_error: Callable[[BadRow], None] = report_to_stderr) -> Iterator[Book]:
+    """
+    Генератор читает файл JSON Lines или CSV порциями по chunk_size строк и лениво создаёт объекты Book.
+    Строки, которые не удалось разобрать или проверить, передаются в on_error и пропускаются
+
+    :param path: Путь к файлу с записями вида {"id": ..., "name": ..., "pages": ...}
+    :param chunk_size: Количество строк JSON Lines, читаемых из файла за один раз
+    :param fmt: Формат файла "jsonl" или "csv". По умолчанию определяется по расширению
+    :param on_error: Обработчик ошибочных строк
+    :return: Итератор объектов Book
+    """
+    if not isinstance(chunk_size, int):
+        raise TypeError("Ошибка. chunk_size должен быть int")
+    if chunk_size <= 0:
+        raise ValueError("Ошибка. chunk_size должен быть больше 0")
+    if fmt is None:
+        fmt = "csv" if path.lower().endswith(".csv") else "jsonl"
+    if fmt not in ("jsonl", "csv"):
+        raise ValueError(f"Ошибка. Формат '{fmt}' не поддерживается")
+
+    with open(path, encoding="utf-8", newline="") as file:
+        if fmt == "csv":
+            yield from _iter_csv(file, on_error)
+            return
+
+        line_number = 0
+        for chunk in iter(lambda: list(islice(file, chunk_size)), []):
+            for line in chunk:
+                line_number += 1
+                if not line.strip():
+                    continue
+                try:
+                    book = _parse_json_line(line)
+                except (KeyError, TypeError, ValueError) as error:  # json.JSONDecodeError - подкласс ValueError
+                    on_error(BadRow(line_number, line.rstrip("\r\n"), error))
+                    continue
+                yield book
+
+
+def load_library(path: str, library: Optional[Library] = None, chunk_size: int = 10_000, fmt: Optional[str] = None,
+                 on_error: Callable[[BadRow], None] = report_to_stderr) -> Library:
+    """
+    Функция потоково загружает книги из файла в библиотеку, не собирая промежуточный список и не копируя его.
+    Если у библиотеки есть метод add_book (например, у IndexedLibrary), книги добавляются через него, и отказ
+    в добавлении тоже считается ошибочной строкой
+
+    :param path: Путь к файлу JSON Lines или CSV
+    :param library: Библиотека, в которую добавляются книги. По умолчанию создаётся пустая Library
+    :param chunk_size: Количество строк, читаемых из файла за один раз
+    :param fmt: Формат файла "jsonl" или "csv". По умолчанию определяется по расширению
+    :param on_error: Обработчик ошибочных строк
+    :return: Библиотека с загруженными книгами
+    """
+    if library is None:
+        library = Library()
+    if not isinstance(library, Library):
+        raise TypeError("Ошибка. library должен быть объектом класса Library")
+
+    add_book = getattr(library, "add_book", None)
+    if add_book is None:
+        library.books.extend(iter_books(path, chunk_size, fmt, on_error))
+        return library
+
+    for book in iter_books(path, chunk_size, fmt, on_error):
+        try:
+            add_book(book)
+        except (TypeError, ValueError) as error:
+            on_error(BadRow(-1, repr(book), error))  # номер строки источника здесь уже неизвестен
+    return library
+
+
+def _write_jsonl(path: str, size: int) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        for id_ in range(1, size + 1):
+            file.write(json.dumps({"id": id_, "name": f"book_{id_}", "pages": 100 + id_ % 500}) + "\n")
+
+
+def measure_peak_memory(size: int) -> tuple[int, int]:
+    """
+    Сравнивает пиковую память при загрузке size книг через список словарей и через load_library
+
+    :param size: Количество книг в файле
+    :return: Пиковая память в байтах без учёта итоговой библиотеки: для списка словарей и для потоковой загрузки
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "books.jsonl")
+        _write_jsonl(path, size)
+
+        tracemalloc.start()
+        with open(path, encoding="utf-8") as file:
+            records = [json.loads(line) for line in file]
+        list_books = [Book(id_=record["id"], name=record["name"], pages=record["pages"]) for record in records]
+        library = Library(books=list_books)
+        _, list_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del records, list_books, library
+
+        tracemalloc.start()
+        library = load_library(path)
+        result_size, stream_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del library
+    return list_peak - result_size, stream_peak - result_size
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        jsonl_path = os.path.join(tmp_dir, "books.jsonl")
+        with open(jsonl_path, "w", encoding="utf-8") as jsonl_file:
+            for book_dict in BOOKS_DATABASE:
+                jsonl_file.write(json.dumps(book_dict) + "\n")
+            jsonl_file.write('{"id": 3, "name": "test_name_3", "pages": -5}\n')  # ошибочная строка
+            jsonl_file.write('не JSON\n')  # ошибочная строка
+        print(load_library(jsonl_path).books)
+
+        csv_path = os.path.join(tmp_dir, "books.csv")
+        with open(csv_path, "w", encoding="utf-8", newline="") as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=["id", "name", "pages"])
+            writer.writeheader()
+            writer.writerows(BOOKS_DATABASE)
+            csv_file.write("3,test_name_3,много\n")  # ошибочная строка
+        print(load_library(csv_path).books)
+
+    for size in (10 ** 4, 10 ** 5, 10 ** 6):
+        list_peak, stream_peak = measure_peak_memory(size)
+        print(f"{size:>8} книг: пик сверх результата {list_peak / 2 ** 20:.1f} МиБ для списка, "
+              f"{stream_peak / 2 ** 20:.1f} МиБ для потоковой загрузки")
@@ -0,0 +1,186 @@
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Iterator, Optional
+
+import tracemalloc
+
+from main import BOOKS_DATABASE, Book, Library
+
+
+INT64_MAX = 2 ** 63 - 1
+
+
+class BookStore:
+    """
+    Колоночное хранилище книг.
+
+    Идентификаторы и количество страниц хранятся в типизированных массивах, наименования - в общей таблице строк,
+    на которую ссылаются целочисленные коды. Объекты Book создаются только по запросу и являются копиями данных:
+    изменение полученного объекта не меняет хранилище.
+
+    Для поиска по id_ строится индекс - массивы id_, отсортированные по значению, и позиций книг. Книги,
+    добавленные после построения индекса, ищутся перебором хвоста, а когда хвост вырастает, индекс строится заново.
+    """
+    def __init__(self, books: Optional[Iterable[Book]] = None):
+        """
+        Инициализирует объект "Хранилище книг"
+
+        :param books: Последовательность объектов класса Book
+        """
+        self._ids = array('q')
+        self._pages = array('q')
+        self._name_codes = array('L')
+        self._names: list[str] = []
+        self._codes_by_name: dict[str, int] = {}
+        self._sorted_ids = array('q')
+        self._sorted_positions = array('q')
+        if books is not None:
+            for book in books:
+                self.add_book(book)
+
+    def append(self, id_: int, name: str, pages: int) -> None:
+        """
+        Метод добавляет книгу в хранилище. Правила проверки совпадают с правилами Book.__init__
+
+        :param id_: Идентификатор книги
+        :param name: Наименование книги
+        :param pages: Количество страниц
+        :return: None
+        """
+        if not isinstance(id_, int):
+            raise TypeError("Ошибка. Идентификатор книги должен быть целым числом")
+        if id_ < 0:
+            raise ValueError("Ошибка. Идентификатор книги должен быть больше 0")
+        if not isinstance(name, str):
+            raise TypeError("Ошибка. Имя должно быть строковым значением")
+        if not isinstance(pages, int):
+            raise TypeError("Ошибка. Количество страниц должно быть целым числом")
+        if pages < 0:
+            raise ValueError("Ошибка. Количество страниц должно быть больше 0")
+        # Проверка до первого append: иначе OverflowError на втором массиве оставил бы колонки разной длины
+        if id_ > INT64_MAX:
+            raise ValueError("Ошибка. Идентификатор книги не помещается в 64 бита")
+        if pages > INT64_MAX:
+            raise ValueError("Ошибка. Количество страниц не помещается в 64 бита")
+
+        code = self._codes_by_name.get(name)
+        if code is None:
+            code = self._codes_by_name[name] = len(self._names)
+            self._names.append(name)
+        self._ids.append(id_)
+        self._pages.append(pages)
+        self._name_codes.append(code)
+
+    def add_book(self, book: Book) -> None:
+        """
+        Метод добавляет в хранилище данные объекта Book
+
+        :param book: Добавляемая книга
+        :return: None
+        """
+        if not isinstance(book, Book):
+            raise TypeError("Ошибка. book должен быть объектом класса Book")
+        self.append(book.id_, book.name, book.pages)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, index: int) -> Book:
+        # Данные уже проверены при добавлении, поэтому объект собирается без повторной проверки
+        book = Book.__new__(Book)
+        book.id_ = self._ids[index]
+        book.name = self._names[self._name_codes[index]]
+        book.pages = self._pages[index]
+        return book
+
+    def __iter__(self) -> Iterator[Book]:
+        for index in range(len(self._ids)):
+            yield self[index]
+
+    def get_name(self, index: int) -> str:
+        """
+        Метод возвращает наименование книги по индексу без создания объекта Book
+
+        :param index: Индекс книги в хранилище
+        :return: Наименование книги
+        """
+        return self._names[self._name_codes[index]]
+
+    def get_next_book_id(self) -> int:
+        """
+        Метод находит максимальный id_ книги в хранилище и возвращает значение на единицу больше
+
+        :return: Идентификатор, следующий по порядку после максимального
+        """
+        if not self._ids:
+            return 1
+        return max(self._ids) + 1
+
+    def get_index_by_book_id(self, id_: int) -> int:
+        """
+        Метод возвращает индекс книги с требуемым id_ в хранилище
+
+        :param id_: Идентификатор книги
+        :return: Индекс книги с требуемым id_
+        """
+        if not isinstance(id_, int):
+            raise TypeError("Ошибка. Идентификатор книги должен быть целым числом")
+        indexed = len(self._sorted_ids)
+        tail = len(self._ids) - indexed
+        if tail > max(1024, indexed // 8):
+            self._build_index()
+            indexed, tail = len(self._ids), 0
+        position = bisect_left(self._sorted_ids, id_)
+        if position < indexed and self._sorted_ids[position] == id_:
+            return self._sorted_positions[position]
+        if tail and -INT64_MAX - 1 <= id_ <= INT64_MAX:
+            try:
+                return self._ids.index(id_, indexed)
+            except ValueError:
+                pass
+        raise ValueError("Книги с запрашиваемым id не существует")
+
+    def _build_index(self) -> None:
+        # Сортировка устойчива, поэтому среди одинаковых id_ первой окажется книга с меньшим индексом, как в Library
+        order = sorted(range(len(self._ids)), key=self._ids.__getitem__)
+        self._sorted_positions = array('q', order)
+        self._sorted_ids = array('q', map(self._ids.__getitem__, order))
+
+    def to_library(self) -> Library:
+        """
+        Метод создаёт объект Library со всеми книгами хранилища
+
+        :return: Библиотека
+        """
+        return Library(list(self))
+
+
+def measure_memory(size: int) -> tuple[int, int]:
+    """
+    Измеряет память, занятую каталогом из size книг в виде списка объектов Book и в виде BookStore
+
+    :param size: Количество книг
+    :return: Количество байт для списка объектов и для BookStore
+    """
+    results = []
+    for build in (list, BookStore):
+        tracemalloc.start()
+        catalog = build(Book(id_=id_, name=f"book_{id_ % 1000}", pages=100 + id_ % 500) for id_ in range(size))
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append(current)
+        del catalog
+    return results[0], results[1]
+
+
+if __name__ == '__main__':
+    store = BookStore(
+        Book(id_=book_dict["id"], name=book_dict["name"], pages=book_dict["pages"]) for book_dict in BOOKS_DATABASE
+    )
+    store.append(id_=store.get_next_book_id(), name="test_name_1", pages=120)  # наименование попадёт в ту же строку
+    print(list(store))
+    print(store.get_index_by_book_id(3))  # 2
+
+    for size in (10 ** 4, 10 ** 5, 10 ** 6):
+        objects, columns = measure_memory(size)
+        print(f"{size:>8} книг: list[Book] {objects / size:.1f} байт/книга, BookStore {columns / size:.1f} байт/книга")
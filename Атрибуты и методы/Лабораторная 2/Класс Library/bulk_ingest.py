@@ -0,0 +1,191 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, chain
+from typing import Callable, Iterable, Optional
+
+import multiprocessing
+import os
+import time
+
+from book_loader import BadRow, report_to_stderr
+from indexed_library import IndexedLibrary
+from main import BOOKS_DATABASE, Book, Library
+
+
+# Результат обработки части записей - кортеж из простых значений, которые pickle передаёт одним куском памяти:
+#   номер первой записи части;
+#   id_ и pages проверенных записей - байты array('q') (или списки, если id_ не помещается в 64 бита);
+#   наименования - одна строка через SEPARATOR и None, или, если SEPARATOR встречается в наименованиях, строка
+#   без разделителей и байты array('Q') с концами наименований в ней;
+#   номера проверенных записей внутри части - байты array('I'), или None, если ошибок не было;
+#   ошибки - список (номер записи, repr записи, исключение).
+Packed = tuple[int, object, object, str, Optional[bytes], Optional[bytes], list[tuple[int, str, Exception]]]
+SEPARATOR = "\x1f"
+
+
+def _encode(start: int, records: list) -> Packed:
+    """ Проверяет записи части по столбцам и упаковывает их. Выполняется в процессе пула. """
+    try:
+        ids = [record["id"] for record in records]
+        names = [record["name"] for record in records]
+        pages = [record["pages"] for record in records]
+        Book._schema.validate_columns(ids, names, pages)
+        good, errors = None, []
+    except (KeyError, TypeError, ValueError):
+        # В части есть ошибочные записи: проверяем по одной, чтобы найти их все
+        ids, names, pages, good, errors = [], [], [], array('I'), []
+        for offset, record in enumerate(records):
+            try:
+                if not isinstance(record, dict):
+                    raise TypeError("Ошибка. Запись должна быть словарём")
+                values = record["id"], record["name"], record["pages"]
+                Book._schema.validate(*values)
+            except (KeyError, TypeError, ValueError) as error:
+                errors.append((start + offset, repr(record), error))
+                continue
+            ids.append(values[0])
+            names.append(values[1])
+            pages.append(values[2])
+            good.append(offset)
+    try:
+        packed_ids, packed_pages = array('q', ids).tobytes(), array('q', pages).tobytes()
+    except OverflowError:
+        packed_ids, packed_pages = ids, pages
+    text, packed_ends = SEPARATOR.join(names), None
+    if text.count(SEPARATOR) != max(len(names) - 1, 0):
+        text, packed_ends = "".join(names), array('Q', accumulate(map(len, names))).tobytes()
+    return start, packed_ids, packed_pages, text, packed_ends, None if good is None else good.tobytes(), errors
+
+
+# Записи передаются процессам, созданным fork, через глобальную переменную без pickle: в задачах только границы
+_shared: Optional[list] = None
+
+
+def _encode_range(start: int, stop: int) -> Packed:
+    return _encode(start, _shared[start:stop])
+
+
+def _unpack(packed: object) -> Iterable[int]:
+    if isinstance(packed, list):
+        return packed
+    values = array('q')
+    values.frombytes(packed)
+    return values
+
+
+def ingest(records: Iterable[dict], library: Optional[Library] = None, workers: Optional[int] = None,
+           chunk_size: int = 50_000, on_error: Callable[[BadRow], None] = report_to_stderr) -> Library:
+    """
+    Функция проверяет записи вида {"id": ..., "name": ..., "pages": ...} частями по chunk_size в пуле процессов
+    и добавляет книги в библиотеку. Процессы возвращают упакованные столбцы, а объекты Book создаются в основном
+    процессе без повторных проверок. Ошибочные записи и повторяющиеся id_ (между частями и с книгами, уже
+    стоящими в библиотеке) передаются в on_error и пропускаются; при повторе остаётся первая книга
+
+    :param records: Записи
+    :param library: Библиотека, в которую добавляются книги. По умолчанию создаётся пустая Library
+    :param workers: Количество процессов, по умолчанию - количество ядер; 1 - без пула
+    :param chunk_size: Количество записей в части
+    :param on_error: Обработчик ошибочных записей; line_number в BadRow - номер записи, начиная с 1
+    :return: Библиотека с добавленными книгами
+    """
+    if library is None:
+        library = Library()
+    if not isinstance(library, Library):
+        raise TypeError("Ошибка. library должен быть объектом класса Library")
+    if not isinstance(chunk_size, int) or chunk_size <= 0:
+        raise ValueError("Ошибка. chunk_size должен быть целым числом больше 0")
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if not isinstance(workers, int) or workers < 1:
+        raise ValueError("Ошибка. workers должен быть целым числом больше либо равным 1")
+
+    global _shared
+    records = records if isinstance(records, list) else list(records)
+    bounds = list(range(0, len(records), chunk_size))
+    stops = [min(start + chunk_size, len(records)) for start in bounds]
+    if workers == 1 or len(bounds) < 2:
+        results = (_encode(start, records[start:stop]) for start, stop in zip(bounds, stops))
+        return _merge(results, library, on_error)
+    if 'fork' in multiprocessing.get_all_start_methods():
+        _shared = records
+        try:
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork')) as executor:
+                return _merge(executor.map(_encode_range, bounds, stops), library, on_error)
+        finally:
+            _shared = None
+    with ProcessPoolExecutor(workers) as executor:
+        chunks = (records[start:stop] for start, stop in zip(bounds, stops))
+        return _merge(executor.map(_encode, bounds, chunks), library, on_error)
+
+
+def _merge(results: Iterable[Packed], library: Library, on_error: Callable[[BadRow], None]) -> Library:
+    seen = set(library.book_ids()) if isinstance(library, IndexedLibrary) else {book.id_ for book in library.books}
+    for start, packed_ids, packed_pages, text, packed_ends, packed_good, errors in results:
+        for number, raw, error in errors:
+            on_error(BadRow(number + 1, raw, error))
+        ids, pages = _unpack(packed_ids), _unpack(packed_pages)
+        if packed_ends is None:
+            names = text.split(SEPARATOR) if ids else []
+        else:
+            ends = array('Q')
+            ends.frombytes(packed_ends)
+            names = list(map(text.__getitem__, map(slice, chain((0,), ends), ends)))
+        unique = set(ids)
+        if len(unique) == len(ids) and seen.isdisjoint(unique):
+            seen |= unique
+            rows = zip(ids, names, pages)
+        else:
+            if packed_good is None:
+                positions = range(len(ids))
+            else:
+                positions = array('I')
+                positions.frombytes(packed_good)
+            rows = []
+            for position, id_, name, page_count in zip(positions, ids, names, pages):
+                if id_ in seen:
+                    raw = repr({"id": id_, "name": name, "pages": page_count})
+                    on_error(BadRow(start + position + 1, raw,
+                                    ValueError(f"Ошибка. Книга с id_={id_} уже есть в библиотеке")))
+                    continue
+                seen.add(id_)
+                rows.append((id_, name, page_count))
+        books = Book._schema.build(Book, rows)
+        if isinstance(library, IndexedLibrary):
+            library.extend(books)
+        else:
+            library.books.extend(books)
+    return library
+
+
+def benchmark(size: int = 10 ** 6, worker_counts: Iterable[int] = (1, 2, 4)) -> None:
+    """
+    Сравнивает создание Library из словарей конструктором Book с ingest при разном количестве процессов
+
+    :param size: Количество записей
+    :param worker_counts: Количество процессов
+    :return: None
+    """
+    records = [{"id": id_, "name": f"book_{id_}", "pages": 100 + id_ % 500} for id_ in range(1, size + 1)]
+    print(f"{size} записей, ядер: {os.cpu_count()}")
+    start = time.perf_counter()
+    Library([Book(id_=record["id"], name=record["name"], pages=record["pages"]) for record in records])
+    baseline = time.perf_counter() - start
+    print(f"{'конструктор Book':<20} {size / baseline:>12,.0f} записей/с")
+    for workers in worker_counts:
+        start = time.perf_counter()
+        library = ingest(records, workers=workers)
+        elapsed = time.perf_counter() - start
+        assert len(library.books) == size
+        print(f"{f'ingest, {workers} проц.':<20} {size / elapsed:>12,.0f} записей/с  x{baseline / elapsed:4.1f}")
+
+
+if __name__ == '__main__':
+    demo_records = BOOKS_DATABASE + [
+        {"id": 3, "name": "test_name_3", "pages": -5},  # ошибочная запись
+        {"id": 1, "name": "повтор", "pages": 10},  # повторяющийся id
+        {"id": 4, "name": "test_name_4", "pages": 150},
+    ]
+    print(ingest(demo_records, workers=2, chunk_size=2).books)
+    indexed = ingest(demo_records, IndexedLibrary(), workers=1)
+    print(indexed.get_index_by_book_id(4), indexed.get_next_book_id())  # 2 5
+
+    benchmark()
@@ -0,0 +1,264 @@
+from typing import Iterable, Iterator, Optional
+
+import random
+import sys
+import threading
+import time
+
+from indexed_library import IndexedLibrary
+from main import BOOKS_DATABASE, Book, Library
+
+
+class _Shard:
+    """ Книги с id_ из одного класса вычетов по модулю количества разделов и блокировка их изменения. """
+    __slots__ = ('books', 'lock')
+
+    def __init__(self):
+        self.books: dict[int, Book] = {}
+        self.lock = threading.Lock()
+
+
+class ShardedLibrary:
+    """
+    Потокобезопасная библиотека, разделённая на shards разделов по id_ % shards.
+
+    Изменения берут блокировку только своего раздела, поэтому потоки, добавляющие и удаляющие книги с разными
+    id_, не ждут друг друга. Чтение книги по id_ - одна операция со словарём раздела, которая атомарна и под GIL,
+    и в сборках CPython без GIL, поэтому читатели блокировок не берут.
+
+    Идентификаторы новых книг выдаются счётчиком под отдельной блокировкой, а не поиском максимального id_:
+    два потока никогда не получат один и тот же id_. Счётчик только растёт, поэтому id_ удалённых книг повторно
+    не выдаются.
+    """
+    def __init__(self, books: Optional[Iterable[Book]] = None, shards: int = 64):
+        """
+        Инициализирует объект "Разделённая библиотека"
+
+        :param books: Последовательность объектов класса Book
+        :param shards: Количество разделов
+        """
+        if not isinstance(shards, int) or shards < 1:
+            raise ValueError("Ошибка. shards должен быть целым числом больше либо равным 1")
+        self._shards = [_Shard() for _ in range(shards)]
+        self._next_id = 1
+        self._id_lock = threading.Lock()
+        if books is not None:
+            for book in books:
+                self.add_book(book)
+
+    def _shard(self, id_: int) -> _Shard:
+        return self._shards[id_ % len(self._shards)]
+
+    def reserve_ids(self, count: int = 1) -> range:
+        """
+        Метод атомарно выделяет count подряд идущих идентификаторов. Поток, добавляющий много книг, может выделить
+        их одним вызовом и не обращаться к общему счётчику на каждую книгу
+
+        :param count: Количество идентификаторов
+        :return: Диапазон выделенных идентификаторов
+        """
+        if not isinstance(count, int) or count < 1:
+            raise ValueError("Ошибка. count должен быть целым числом больше либо равным 1")
+        with self._id_lock:
+            start = self._next_id
+            self._next_id = start + count
+        return range(start, start + count)
+
+    def get_next_book_id(self) -> int:
+        """
+        Метод возвращает идентификатор, который получит следующая книга. Идентификатор не резервируется:
+        для добавления книги из нескольких потоков нужно использовать reserve_ids или new_book
+
+        :return: Идентификатор, следующий по порядку после выданных
+        """
+        return self._next_id
+
+    def add_book(self, book: Book) -> None:
+        """
+        Метод добавляет книгу с уже назначенным id_. Счётчик идентификаторов сдвигается за id_ книги
+
+        :param book: Добавляемая книга
+        :return: None
+        """
+        if not isinstance(book, Book):
+            raise TypeError("Ошибка. book должен быть объектом класса Book")
+        with self._id_lock:
+            if book.id_ >= self._next_id:
+                self._next_id = book.id_ + 1
+        shard = self._shard(book.id_)
+        with shard.lock:
+            if book.id_ in shard.books:
+                raise ValueError(f"Ошибка. Книга с id_={book.id_} уже есть в библиотеке")
+            shard.books[book.id_] = book
+
+    def new_book(self, name: str, pages: int) -> Book:
+        """
+        Метод создаёт книгу с новым идентификатором и добавляет её в библиотеку
+
+        :param name: Наименование книги
+        :param pages: Количество страниц
+        :return: Добавленная книга
+        """
+        while True:
+            book = Book(self.reserve_ids()[0], name, pages)
+            shard = self._shard(book.id_)
+            with shard.lock:
+                # id_ мог занять add_book, вызванный между выделением идентификатора и этой проверкой
+                if book.id_ not in shard.books:
+                    shard.books[book.id_] = book
+                    return book
+
+    def remove_book(self, id_: int) -> Book:
+        """
+        Метод удаляет книгу с требуемым id_
+
+        :param id_: Идентификатор книги
+        :return: Удалённая книга
+        """
+        if not isinstance(id_, int):
+            raise TypeError("Ошибка. Идентификатор книги должен быть целым числом")
+        shard = self._shard(id_)
+        with shard.lock:
+            try:
+                return shard.books.pop(id_)
+            except KeyError:
+                raise ValueError("Книги с запрашиваемым id не существует") from None
+
+    def get_book(self, id_: int) -> Book:
+        """
+        Метод возвращает книгу с требуемым id_ без блокировок
+
+        :param id_: Идентификатор книги
+        :return: Книга
+        """
+        if not isinstance(id_, int):
+            raise TypeError("Ошибка. Идентификатор книги должен быть целым числом")
+        try:
+            return self._shard(id_).books[id_]
+        except KeyError:
+            raise ValueError("Книги с запрашиваемым id не существует") from None
+
+    def __contains__(self, id_: int) -> bool:
+        return id_ in self._shard(id_).books
+
+    def __len__(self) -> int:
+        return sum(len(shard.books) for shard in self._shards)
+
+    def __iter__(self) -> Iterator[Book]:
+        """ Книги в порядке возрастания id_. Каждый раздел копируется под своей блокировкой. """
+        books = []
+        for shard in self._shards:
+            with shard.lock:
+                books.extend(shard.books.values())
+        books.sort(key=lambda book: book.id_)
+        return iter(books)
+
+    def to_library(self) -> Library:
+        """
+        Метод собирает объект Library из книг в порядке возрастания id_
+
+        :return: Библиотека
+        """
+        return Library(list(self))
+
+
+class LockedLibrary(IndexedLibrary):
+    """ IndexedLibrary под одной общей блокировкой - точка отсчёта для сравнения с ShardedLibrary. """
+    def __init__(self, books: Optional[list[Book]] = None):
+        self._lock = threading.Lock()
+        super().__init__(books)
+
+    def new_book(self, name: str, pages: int) -> Book:
+        with self._lock:
+            book = Book(self.get_next_book_id(), name, pages)
+            self.add_book(book)
+            return book
+
+    def get_book(self, id_: int) -> Book:
+        with self._lock:
+            return self.books[self.get_index_by_book_id(id_)]
+
+
+def stress(library, threads: int, operations: int, write_share: float) -> float:
+    """
+    Выполняет operations операций в threads потоках: доля write_share - добавление книги, остальное - чтение
+    случайной из первых книг
+
+    :param library: ShardedLibrary или LockedLibrary
+    :param threads: Количество потоков
+    :param operations: Общее количество операций
+    :param write_share: Доля записей
+    :return: Операций в секунду
+    """
+    per_thread = operations // threads
+    known = 1000
+    barrier = threading.Barrier(threads + 1)
+    added: list[list[int]] = [[] for _ in range(threads)]
+
+    def work(index: int) -> None:
+        rng = random.Random(index)
+        plan = [rng.random() < write_share for _ in range(per_thread)]
+        ids = [rng.randint(1, known) for _ in range(per_thread)]
+        new_book, get_book, own = library.new_book, library.get_book, added[index]
+        barrier.wait()
+        for write, id_ in zip(plan, ids):
+            if write:
+                own.append(new_book("new", 1).id_)
+            else:
+                get_book(id_)
+
+    pool = [threading.Thread(target=work, args=(index,)) for index in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    new_ids = [id_ for own in added for id_ in own]
+    assert len(new_ids) == len(set(new_ids)), "один id_ выдан дважды"
+    return per_thread * threads / elapsed
+
+
+def benchmark(thread_counts: Iterable[int] = (1, 2, 4, 8), operations: int = 400_000) -> None:
+    """
+    Сравнивает пропускную способность ShardedLibrary и IndexedLibrary под общей блокировкой при разном количестве
+    потоков, для нагрузки только из чтений и для смешанной нагрузки с 20% записей
+
+    :param thread_counts: Количество потоков
+    :param operations: Общее количество операций в замере
+    :return: None
+    """
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"GIL {'включён' if gil else 'выключен'}, операций/с:")
+    print(f"{'потоков':>8} | {'чтение, общая':>14} {'чтение, разделы':>16} | {'20% записей, общая':>19} "
+          f"{'20% записей, разделы':>21}")
+    for threads in thread_counts:
+        row = []
+        for write_share in (0.0, 0.2):
+            for make in (LockedLibrary, ShardedLibrary):
+                books = [Book(id_, f"book_{id_}", 100) for id_ in range(1, 1001)]
+                row.append(stress(make(books), threads, operations, write_share))
+        print(f"{threads:>8} | {row[0]:>14,.0f} {row[1]:>16,.0f} | {row[2]:>19,.0f} {row[3]:>21,.0f}")
+
+
+if __name__ == '__main__':
+    list_books = [
+        Book(id_=book_dict["id"], name=book_dict["name"], pages=book_dict["pages"]) for book_dict in BOOKS_DATABASE
+    ]
+    library = ShardedLibrary(books=list_books)
+    print(library.get_next_book_id())  # 3
+    print(library.new_book("test_name_3", 150))  # Книга "test_name_3"
+    print(library.remove_book(1).id_, len(library))  # 1 2
+    print(library.get_next_book_id())  # 4 - id_ удалённых книг не выдаются повторно
+
+    # Восемь потоков одновременно добавляют книги: все id_ различны
+    shared = ShardedLibrary()
+    workers = [threading.Thread(target=lambda: [shared.new_book("new", 1) for _ in range(10_000)]) for _ in range(8)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    print(len(shared), shared.get_next_book_id())  # 80000 80001
+
+    benchmark()
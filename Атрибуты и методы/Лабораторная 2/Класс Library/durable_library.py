@@ -0,0 +1,471 @@
+from typing import Iterable, Optional
+
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+
+from indexed_library import IndexedLibrary
+from main import BOOKS_DATABASE, Book
+from snapshot import MappedLibrary, write_snapshot
+
+
+# Журнал изменений состоит из сегментов wal-<поколение>.log. Каждая запись (все числа little-endian):
+#   рамка       - длина тела и его CRC32;
+#   тело        - код операции, id_, pages и наименование в UTF-8 (у удаления pages = 0 и пустое наименование).
+# Снимок snapshot-<поколение>.snap содержит состояние после всех сегментов с номером не больше своего.
+FRAME = struct.Struct("<II")
+PAYLOAD = struct.Struct("<Bqq")
+ADD, REMOVE, UPDATE = 1, 2, 3
+
+SEGMENT_PREFIX, SEGMENT_SUFFIX = "wal-", ".log"
+SNAPSHOT_PREFIX, SNAPSHOT_SUFFIX = "snapshot-", ".snap"
+
+_sync = getattr(os, "fdatasync", os.fsync)
+
+
+def _encode(operation: int, book: Book) -> bytes:
+    payload = PAYLOAD.pack(operation, book.id_, book.pages) + book.name.encode("utf-8")
+    return FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _generations(directory: str, prefix: str, suffix: str) -> list[int]:
+    return sorted(int(name[len(prefix):-len(suffix)]) for name in os.listdir(directory)
+                  if name.startswith(prefix) and name.endswith(suffix) and name[len(prefix):-len(suffix)].isdigit())
+
+
+def _sync_directory(directory: str) -> None:
+    # Без fsync каталога создание и переименование файлов может не пережить сбой питания
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class DurableLibrary(IndexedLibrary):
+    """
+    Библиотека, изменения которой сохраняются в журнал предзаписи (write-ahead log).
+
+    Каждое добавление, удаление и замена книги дописывает в конец журнала одну короткую запись, поэтому
+    стоимость записи не зависит от размера каталога. fsync выполняется группами: при durable=True метод
+    возвращается после того, как его запись попала на диск, но одновременные вызовы из разных потоков делят один
+    fsync; при durable=False записи сбрасываются фоновым потоком раз в flush_interval секунд или методом flush.
+
+    Когда сегмент журнала вырастает до compact_bytes, запись переключается на новый сегмент, а фоновый поток
+    записывает снимок состояния и удаляет старые сегменты. При открытии каталога загружается последний снимок и
+    повторяются записи журнала после него; недописанная последняя запись отбрасывается.
+
+    Книги не изменяются на месте: update_book заменяет объект, поэтому копия списка books, с которой работает
+    фоновое сжатие, остаётся согласованной.
+
+    Если запись журнала или fsync не удались, часть записей могла не попасть на диск, а изменения в памяти уже
+    сделаны. Ошибка запоминается: любое следующее изменение, flush, compact и close поднимают OSError с этой
+    ошибкой в качестве причины, а библиотека больше ничего не пишет. Фоновый поток сброса при ошибке завершается.
+    """
+    def __init__(self, directory: str, durable: bool = True, flush_interval: float = 0.005,
+                 compact_bytes: int = 64 * 2 ** 20):
+        """
+        Открывает или создаёт библиотеку в каталоге
+
+        :param directory: Каталог журнала и снимков
+        :param durable: Дожидаться ли fsync при каждом изменении
+        :param flush_interval: Период фонового сброса журнала при durable=False, в секундах
+        :param compact_bytes: Размер сегмента журнала, после которого запускается сжатие
+        """
+        if not isinstance(compact_bytes, int) or compact_bytes <= 0:
+            raise ValueError("Ошибка. compact_bytes должен быть целым числом больше 0")
+        if flush_interval <= 0:
+            raise ValueError("Ошибка. flush_interval должен быть больше 0")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.durable = durable
+        self.compact_bytes = compact_bytes
+
+        self._lock = threading.RLock()  # состояние в памяти и буфер журнала
+        self._io_lock = threading.Lock()  # запись в файл сегмента и fsync
+        self._buffer: list[bytes] = []
+        self._buffered_bytes = 0
+        self._sequence = 0  # номер последней записи в буфере
+        self._flushed = 0  # номер последней записи на диске
+        self._logging = True
+        self._compactor: Optional[threading.Thread] = None
+        self._compaction_error: Optional[BaseException] = None
+        self._write_error: Optional[BaseException] = None  # ошибка записи журнала, после которой запись запрещена
+        self._closed = False
+
+        snapshot = self._recover()
+        segments = [generation for generation in _generations(directory, SEGMENT_PREFIX, SEGMENT_SUFFIX)
+                    if generation > snapshot]
+        self._generation = segments[-1] if segments else snapshot + 1
+        self._fd = self._open_segment(self._generation)
+        self._segment_bytes = os.fstat(self._fd).st_size
+
+        self._stop = threading.Event()
+        self._flusher = None
+        if not durable:
+            self._flusher = threading.Thread(target=self._flush_periodically, args=(flush_interval,), daemon=True)
+            self._flusher.start()
+
+    def _path(self, prefix: str, generation: int, suffix: str) -> str:
+        return os.path.join(self.directory, f"{prefix}{generation:08d}{suffix}")
+
+    def _open_segment(self, generation: int) -> int:
+        path = self._path(SEGMENT_PREFIX, generation, SEGMENT_SUFFIX)
+        created = not os.path.exists(path)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if created:
+            _sync_directory(self.directory)
+        return fd
+
+    def _recover(self) -> int:
+        """ Загружает последний снимок, повторяет журнал после него и возвращает поколение снимка (0 - нет). """
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):
+                os.unlink(os.path.join(self.directory, name))  # недописанный снимок
+        snapshots = _generations(self.directory, SNAPSHOT_PREFIX, SNAPSHOT_SUFFIX)
+        snapshot = snapshots[-1] if snapshots else 0
+        books = []
+        if snapshots:
+            with MappedLibrary(self._path(SNAPSHOT_PREFIX, snapshot, SNAPSHOT_SUFFIX)) as mapped:
+                books = list(mapped)
+        super().__init__(books)
+
+        segments = _generations(self.directory, SEGMENT_PREFIX, SEGMENT_SUFFIX)
+        for generation in segments:
+            path = self._path(SEGMENT_PREFIX, generation, SEGMENT_SUFFIX)
+            if generation <= snapshot:
+                os.unlink(path)  # сбой между записью снимка и удалением сегментов
+            else:
+                self._replay(path, last=generation == segments[-1])
+        for generation in snapshots[:-1]:
+            os.unlink(self._path(SNAPSHOT_PREFIX, generation, SNAPSHOT_SUFFIX))
+        return snapshot
+
+    def _replay(self, path: str, last: bool) -> None:
+        with open(path, "rb") as file:
+            data = file.read()
+        offset = 0
+        self._logging = False
+        try:
+            while offset + FRAME.size <= len(data):
+                length, checksum = FRAME.unpack_from(data, offset)
+                start, end = offset + FRAME.size, offset + FRAME.size + length
+                payload = data[start:end]
+                if end > len(data) or length < PAYLOAD.size or zlib.crc32(payload) != checksum:
+                    break
+                operation, id_, pages = PAYLOAD.unpack_from(payload)
+                # Записи проверены перед попаданием в журнал, поэтому книга собирается без повторной проверки
+                book = Book.__new__(Book)
+                book.id_ = id_
+                book.name = payload[PAYLOAD.size:].decode("utf-8")
+                book.pages = pages
+                if operation == ADD:
+                    self.add_book(book)
+                elif operation == REMOVE:
+                    self.remove_book(id_)
+                elif operation == UPDATE:
+                    self._replace(book)
+                else:
+                    break
+                offset = end
+        finally:
+            self._logging = True
+        if offset < len(data):
+            if not last:
+                raise ValueError(f"Ошибка. Сегмент журнала {os.path.basename(path)} повреждён")
+            # Сбой во время записи оставляет недописанную последнюю запись: её изменение не было подтверждено
+            os.truncate(path, offset)
+
+    def _append(self, operation: int, book: Book) -> int:
+        record = _encode(operation, book)
+        self._buffer.append(record)
+        self._buffered_bytes += len(record)
+        self._sequence += 1
+        return self._sequence
+
+    def _commit(self, sequence: int) -> None:
+        if self.durable or self._buffered_bytes >= 2 ** 20:
+            self._flush(sequence)
+
+    def _flush(self, upto: Optional[int] = None) -> None:
+        # Групповая фиксация: поток, получивший _io_lock, сбрасывает весь буфер, включая записи потоков,
+        # которые ждут блокировку; после него им остаётся только убедиться, что их запись уже на диске
+        with self._io_lock:
+            self._check_writable()  # запись ожидающего потока могла быть в буфере, запись которого не удалась
+            with self._lock:
+                if upto is not None and self._flushed >= upto or not self._buffer:
+                    return
+                data = b"".join(self._buffer)
+                self._buffer.clear()
+                self._buffered_bytes = 0
+                sequence, fd = self._sequence, self._fd
+            self._write_log(fd, data)
+            self._flushed = sequence
+            self._segment_bytes += len(data)
+            rotate = self._segment_bytes >= self.compact_bytes
+        if rotate and not (self._compactor and self._compactor.is_alive()):
+            self.compact()
+
+    def _write_log(self, fd: int, data: bytes) -> None:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            _sync(fd)
+        except BaseException as error:
+            self._write_error = error
+            raise
+
+    def _check_writable(self) -> None:
+        if self._write_error is not None:
+            message = "Ошибка. Запись журнала не удалась, библиотека больше не сохраняет изменения"
+            raise OSError(message) from self._write_error
+
+    def _flush_periodically(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self._flush()
+            except BaseException:
+                return  # ошибка запомнена и будет поднята в потоке, который обратится к библиотеке
+
+    def flush(self) -> None:
+        """
+        Метод дожидается, пока все сделанные изменения окажутся на диске
+
+        :return: None
+        """
+        self._flush()
+
+    def add_book(self, book: Book) -> None:
+        """
+        Метод добавляет книгу в конец списка books и в журнал
+
+        :param book: Добавляемая книга
+        :return: None
+        """
+        with self._lock:
+            self._check_writable()
+            super().add_book(book)
+            if not self._logging:
+                return
+            sequence = self._append(ADD, book)
+        self._commit(sequence)
+
+    def extend(self, books: Iterable[Book]) -> None:
+        """
+        Метод добавляет книги из последовательности одной группой записей журнала. Если среди книг встретится
+        неподходящий объект или повторяющийся id_, ни библиотека, ни журнал не изменятся
+
+        :param books: Последовательность объектов класса Book
+        :return: None
+        """
+        with self._lock:
+            self._check_writable()
+            start = len(self.books)
+            logging, self._logging = self._logging, False
+            try:
+                super().extend(books)
+            finally:
+                self._logging = logging
+            if not logging or len(self.books) == start:
+                return
+            for book in self.books[start:]:
+                sequence = self._append(ADD, book)
+        self._commit(sequence)
+
+    def remove_book(self, id_: int) -> Book:
+        """
+        Метод удаляет книгу с требуемым id_ и записывает удаление в журнал
+
+        :param id_: Идентификатор книги
+        :return: Удалённая книга
+        """
+        with self._lock:
+            self._check_writable()
+            book = super().remove_book(id_)
+            if not self._logging:
+                return book
+            sequence = self._append(REMOVE, book)
+        self._commit(sequence)
+        return book
+
+    def _replace(self, book: Book) -> Book:
+        index = self.get_index_by_book_id(book.id_)
+        previous, self.books[index] = self.books[index], book
+        return previous
+
+    def update_book(self, id_: int, name: Optional[str] = None, pages: Optional[int] = None) -> Book:
+        """
+        Метод заменяет книгу с требуемым id_ новым объектом с изменёнными полями
+
+        :param id_: Идентификатор книги
+        :param name: Новое наименование, None - оставить прежнее
+        :param pages: Новое количество страниц, None - оставить прежнее
+        :return: Новая книга
+        """
+        with self._lock:
+            self._check_writable()
+            current = self.books[self.get_index_by_book_id(id_)]
+            book = Book(id_, current.name if name is None else name, current.pages if pages is None else pages)
+            self._replace(book)
+            sequence = self._append(UPDATE, book)
+        self._commit(sequence)
+        return book
+
+    def compact(self, wait: bool = False) -> None:
+        """
+        Метод переключает запись на новый сегмент журнала и запускает фоновую запись снимка, после которой старые
+        сегменты удаляются. Изменения библиотеки во время записи снимка не блокируются
+
+        :param wait: Дождаться окончания записи снимка
+        :return: None
+        """
+        self._raise_compaction_error()
+        with self._io_lock:
+            self._check_writable()
+            if self._compactor is not None and self._compactor.is_alive():
+                compactor = self._compactor
+            else:
+                with self._lock:
+                    data = b"".join(self._buffer)
+                    self._buffer.clear()
+                    self._buffered_bytes = 0
+                    sequence, books = self._sequence, list(self.books)
+                    generation, old_fd = self._generation, self._fd
+                    self._generation += 1
+                    self._fd = self._open_segment(self._generation)
+                    self._segment_bytes = 0
+                try:
+                    if data:
+                        self._write_log(old_fd, data)
+                finally:
+                    os.close(old_fd)
+                self._flushed = sequence
+                compactor = self._compactor = threading.Thread(target=self._compact, args=(books, generation))
+                compactor.start()
+        if wait:
+            compactor.join()
+            self._raise_compaction_error()
+
+    def _compact(self, books: list[Book], generation: int) -> None:
+        try:
+            write_snapshot(books, self._path(SNAPSHOT_PREFIX, generation, SNAPSHOT_SUFFIX))
+            _sync_directory(self.directory)
+            for old in _generations(self.directory, SEGMENT_PREFIX, SEGMENT_SUFFIX):
+                if old <= generation:
+                    os.unlink(self._path(SEGMENT_PREFIX, old, SEGMENT_SUFFIX))
+            for old in _generations(self.directory, SNAPSHOT_PREFIX, SNAPSHOT_SUFFIX):
+                if old < generation:
+                    os.unlink(self._path(SNAPSHOT_PREFIX, old, SNAPSHOT_SUFFIX))
+        except BaseException as error:
+            self._compaction_error = error
+
+    def _raise_compaction_error(self) -> None:
+        error, self._compaction_error = self._compaction_error, None
+        if error is not None:
+            raise error
+
+    def close(self) -> None:
+        """
+        Метод сбрасывает журнал, дожидается фонового сжатия и закрывает файлы
+
+        :return: None
+        """
+        if self._closed:
+            return
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        try:
+            self._flush()
+        finally:
+            if self._compactor is not None:
+                self._compactor.join()
+            os.close(self._fd)
+            self._closed = True
+        self._raise_compaction_error()
+
+    def __enter__(self) -> "DurableLibrary":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def benchmark(sizes: Iterable[int] = (10 ** 3, 10 ** 5, 10 ** 6), writes: int = 20_000, threads: int = 8) -> None:
+    """
+    Сравнивает пропускную способность записи при сохранении всего списка books после каждого изменения и при
+    записи в журнал: с фоновым сбросом, с fsync на каждое изменение и с групповой фиксацией из нескольких потоков
+
+    :param sizes: Размеры каталога
+    :param writes: Количество добавлений при записи в журнал
+    :param threads: Количество потоков для групповой фиксации
+    :return: None
+    """
+    print(f"{'книг':>8} | {'снимок на изменение':>20} | {'журнал, фон':>12} | {'fsync, 1 поток':>14} | "
+          f"{f'fsync, {threads} потоков':>18}   (изменений/с)")
+    for size in sizes:
+        books = [Book(id_=id_, name=f"book_{id_}", pages=100 + id_ % 500) for id_ in range(1, size + 1)]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "library.snapshot")
+            dumps = max(3, 10 ** 6 // (size * 10))
+            start = time.perf_counter()
+            for _ in range(dumps):
+                write_snapshot(books, path)
+            naive = dumps / (time.perf_counter() - start)
+
+            rates = []
+            for durable, workers, count in ((False, 1, writes), (True, 1, writes // 20), (True, threads, writes // 4)):
+                with DurableLibrary(os.path.join(directory, f"{durable}-{workers}"), durable=durable) as library:
+                    library.extend(books)
+                    library.compact(wait=True)
+                    first = library.get_next_book_id()
+                    per_worker = count // workers
+
+                    def work(offset: int) -> None:
+                        for id_ in range(first + offset, first + offset + per_worker):
+                            library.add_book(Book(id_=id_, name="new", pages=1))
+
+                    pool = [threading.Thread(target=work, args=(index * per_worker,)) for index in range(workers)]
+                    start = time.perf_counter()
+                    for thread in pool:
+                        thread.start()
+                    for thread in pool:
+                        thread.join()
+                    library.flush()
+                    rates.append(per_worker * workers / (time.perf_counter() - start))
+        print(f"{size:>8} | {naive:>20,.0f} | {rates[0]:>12,.0f} | {rates[1]:>14,.0f} | {rates[2]:>18,.0f}")
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        list_books = [
+            Book(id_=book_dict["id"], name=book_dict["name"], pages=book_dict["pages"]) for book_dict in BOOKS_DATABASE
+        ]
+        with DurableLibrary(tmp_dir) as library:
+            library.extend(list_books)
+            library.add_book(Book(id_=library.get_next_book_id(), name="test_name_3", pages=150))
+            library.compact(wait=True)
+            library.remove_book(1)
+            library.update_book(3, pages=300)
+
+        with DurableLibrary(tmp_dir) as recovered:
+            print(recovered.books)  # [Book(id_=2, ...), Book(id_=3, name='test_name_3', pages=300)]
+            print(recovered.get_next_book_id())  # 4
+
+        # Недописанная запись в конце журнала отбрасывается при восстановлении
+        segment = os.path.join(tmp_dir, max(name for name in os.listdir(tmp_dir) if name.startswith(SEGMENT_PREFIX)))
+        with open(segment, "ab") as wal:
+            wal.write(_encode(ADD, Book(id_=4, name="torn", pages=1))[:-2])
+        with DurableLibrary(tmp_dir) as recovered:
+            print(len(recovered.books))  # 2
+
+    benchmark()
@@ -0,0 +1,164 @@
+from typing import Iterable, KeysView, Optional
+
+import timeit
+
+from main import BOOKS_DATABASE, Book, Library
+
+
+class IndexedLibrary(Library):
+    """
+    Библиотека с индексом id_ -> позиция в списке books и поддерживаемым максимальным id_.
+
+    Поиск индекса книги и выдача следующего id_ выполняются за O(1). Список books изменяется только через методы
+    add_book, extend и remove_book, иначе индекс перестанет соответствовать списку.
+    """
+    def __init__(self, books: Optional[list[Book]] = None):
+        """
+        Инициализирует объект "Индексированная библиотека"
+
+        :param books: Список книг, состоящий из объектов класса Book
+        """
+        super().__init__(books)
+        self._positions: dict[int, int] = {}
+        self._max_id = 0
+        self._max_id_is_stale = False
+        for index, book in enumerate(self.books):
+            self._register(book, index)
+
+    def _register(self, book: Book, index: int) -> None:
+        if book.id_ in self._positions:
+            raise ValueError(f"Ошибка. Книга с id_={book.id_} уже есть в библиотеке")
+        self._positions[book.id_] = index
+        if book.id_ > self._max_id:
+            self._max_id = book.id_
+
+    def add_book(self, book: Book) -> None:
+        """
+        Метод добавляет книгу в конец списка books
+
+        :param book: Добавляемая книга
+        :return: None
+        """
+        if not isinstance(book, Book):
+            raise TypeError("Ошибка. book должен быть объектом класса Book")
+        self._register(book, len(self.books))
+        self.books.append(book)
+
+    def extend(self, books: Iterable[Book]) -> None:
+        """
+        Метод добавляет в конец списка books все книги из переданной последовательности. Если среди книг встретится
+        неподходящий объект или повторяющийся id_, библиотека останется в исходном состоянии
+
+        :param books: Последовательность объектов класса Book
+        :return: None
+        """
+        start = len(self.books)
+        try:
+            for book in books:
+                self.add_book(book)
+        except (TypeError, ValueError):
+            for book in self.books[start:]:
+                del self._positions[book.id_]
+            del self.books[start:]
+            self._max_id_is_stale = True
+            raise
+
+    def remove_book(self, id_: int) -> Book:
+        """
+        Метод удаляет книгу с требуемым id_. Индексы книг, стоявших после удалённой, сдвигаются на единицу, поэтому
+        удаление из середины списка стоит O(n - index)
+
+        :param id_: Идентификатор книги
+        :return: Удалённая книга
+        """
+        index = self.get_index_by_book_id(id_)
+        book = self.books.pop(index)
+        del self._positions[id_]
+        for position in range(index, len(self.books)):
+            self._positions[self.books[position].id_] = position
+        if id_ == self._max_id:
+            self._max_id_is_stale = True
+        return book
+
+    def get_next_book_id(self) -> int:
+        """
+        Метод возвращает значение на единицу больше максимального id_ книги в библиотеке
+
+        :return: Идентификатор, следующий по порядку после максимального
+        """
+        if self._max_id_is_stale:
+            # Пересчёт нужен только после удаления книги с максимальным id_
+            self._max_id = max(self._positions, default=0)
+            self._max_id_is_stale = False
+        return self._max_id + 1
+
+    def get_index_by_book_id(self, id_: int) -> int:
+        """
+        Метод возвращает индекс книги с требуемым id_ в списке books
+
+        :param id_: Идентификатор книги
+        :return: Индекс элемента с требуемым id_ в списке books
+        """
+        if not isinstance(id_, int):
+            raise TypeError("Ошибка. Идентификатор книги должен быть целым числом")
+        try:
+            return self._positions[id_]
+        except KeyError:
+            raise ValueError("Книги с запрашиваемым id не существует") from None
+
+    def get_indices_by_book_ids(self, ids: Iterable[int]) -> dict[int, int]:
+        """
+        Метод находит индексы нескольких книг одним вызовом
+
+        :param ids: Идентификаторы книг
+        :return: id_ -> индекс книги в списке books; отсутствующих id_ в словаре нет
+        """
+        positions = self._positions
+        return {id_: positions[id_] for id_ in ids if id_ in positions}
+
+    def book_ids(self) -> KeysView[int]:
+        """
+        Метод возвращает идентификаторы всех книг библиотеки без копирования. Представление отражает дальнейшие
+        изменения библиотеки
+
+        :return: Представление множества id_
+        """
+        return self._positions.keys()
+
+
+def benchmark(sizes: Iterable[int] = (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6), number: int = 1000) -> None:
+    """
+    Сравнивает время поиска индекса последней книги и выдачи следующего id_ у Library и IndexedLibrary
+
+    :param sizes: Размеры каталога
+    :param number: Количество повторов каждого вызова
+    :return: None
+    """
+    print(f"{'книг':>10} | {'Library, мкс':>24} | {'IndexedLibrary, мкс':>24}")
+    print(f"{'':>10} | {'index':>11} {'next_id':>12} | {'index':>11} {'next_id':>12}")
+    for size in sizes:
+        books = [Book(id_=id_, name=f"book_{id_}", pages=100) for id_ in range(1, size + 1)]
+        row = []
+        # Линейный поиск на больших каталогах повторяем реже, чтобы замер не длился часами
+        measurements = ((Library(books), max(1, number * 10 ** 3 // size)), (IndexedLibrary(books), number))
+        for library, repeats in measurements:
+            lookup = timeit.timeit(lambda: library.get_index_by_book_id(size), number=repeats)
+            next_id = timeit.timeit(library.get_next_book_id, number=repeats)
+            row.append(f"{lookup / repeats * 1e6:>11.3f} {next_id / repeats * 1e6:>12.3f}")
+        print(f"{size:>10} | {row[0]} | {row[1]}")
+
+
+if __name__ == '__main__':
+    list_books = [
+        Book(id_=book_dict["id"], name=book_dict["name"], pages=book_dict["pages"]) for book_dict in BOOKS_DATABASE
+    ]
+    library = IndexedLibrary(books=list_books)
+    print(library.get_next_book_id())  # 3
+    print(library.get_index_by_book_id(2))  # 1
+
+    library.add_book(Book(id_=library.get_next_book_id(), name="test_name_3", pages=150))
+    library.remove_book(1)
+    print(library.get_index_by_book_id(3))  # 1
+    print(library.get_next_book_id())  # 4
+
+    benchmark()
@@ -0,0 +1,406 @@
+from typing import Optional
+
+import asyncio
+import itertools
+import os
+import random
+import struct
+import tempfile
+import time
+
+from indexed_library import IndexedLibrary
+from main import BOOKS_DATABASE, Book, Library
+
+
+# Протокол (все числа little-endian). Запросы фиксированной длины, поэтому клиент может отправлять их подряд, не
+# дожидаясь ответов; ответы несут номер запроса и могут приходить в любом порядке.
+#   запрос  - номер запроса, операция, id_;
+#   ответ   - номер запроса, статус, индекс книги, pages, длина наименования и наименование в UTF-8.
+REQUEST = struct.Struct("<IBq")
+REPLY = struct.Struct("<IBqqI")
+INDEX, GET = 1, 2
+OK, NOT_FOUND, BAD_REQUEST = 0, 1, 2
+
+
+def multi_get(library: Library, ids: list[int]) -> dict[int, int]:
+    """
+    Функция находит индексы книг с требуемыми id_ за один проход по списку books. У IndexedLibrary индексы
+    берутся из её словаря
+
+    :param library: Библиотека
+    :param ids: Идентификаторы книг
+    :return: id_ -> индекс первой книги с этим id_; отсутствующих id_ в словаре нет
+    """
+    if isinstance(library, IndexedLibrary):
+        return library.get_indices_by_book_ids(ids)
+    wanted = set(ids)
+    found: dict[int, int] = {}
+    for index, book in enumerate(library.books):
+        if book.id_ in wanted and book.id_ not in found:
+            found[book.id_] = index
+            if len(found) == len(wanted):
+                break
+    return found
+
+
+class LookupServer:
+    """
+    asyncio-сервер поиска книг в библиотеке по id_.
+
+    Запросы всех соединений, пришедшие в течение window секунд, обрабатываются одним вызовом multi_get: для
+    Library это один проход по списку books на всю группу вместо прохода на каждый запрос. Ответы одной группы
+    для одного соединения отправляются одной записью в сокет.
+
+    Соединение не читает следующие запросы, пока ответы на прочитанные не записаны в сокет и буфер записи не
+    опустел до нижней отметки (drain), поэтому клиент, который отправляет запросы и не читает ответы, упирается в
+    собственный сокет, а память сервера на соединение ограничена одним чтением.
+    """
+    def __init__(self, library: Library, window: float = 0.0002, max_batch: int = 4096):
+        """
+        Инициализирует объект "Сервер поиска"
+
+        :param library: Библиотека
+        :param window: Время накопления группы запросов, в секундах
+        :param max_batch: Размер группы, при котором она обрабатывается не дожидаясь окончания window
+        """
+        if not isinstance(library, Library):
+            raise TypeError("Ошибка. library должен быть объектом класса Library")
+        if not isinstance(max_batch, int) or max_batch < 1:
+            raise ValueError("Ошибка. max_batch должен быть целым числом больше либо равным 1")
+        if window < 0:
+            raise ValueError("Ошибка. window не может быть отрицательным")
+        self.library = library
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.requests = 0
+        self._pending: list[tuple[asyncio.StreamWriter, int, int, int]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushed: Optional[asyncio.Future] = None  # завершается следующим _flush
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> tuple[str, int]:
+        """
+        Запускает сервер на TCP-сокете
+
+        :param host: Адрес, по умолчанию только локальный
+        :param port: Порт, 0 - любой свободный
+        :return: Фактические адрес и порт
+        """
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def start_unix(self, path: str) -> None:
+        """
+        Запускает сервер на Unix-сокете
+
+        :param path: Путь к сокету
+        :return: None
+        """
+        self._server = await asyncio.start_unix_server(self._handle, path)
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        buffer = bytearray()
+        try:
+            while True:
+                data = await reader.read(2 ** 16)
+                if not data:
+                    break
+                buffer += data
+                usable = len(buffer) - len(buffer) % REQUEST.size
+                self._pending.extend((writer, *request) for request in REQUEST.iter_unpack(buffer[:usable]))
+                del buffer[:usable]
+                if len(self._pending) >= self.max_batch:
+                    self._flush()
+                elif self._timer is None and self._pending:
+                    self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+                if self._pending:
+                    # Ответы на прочитанные запросы записываются при сбросе группы: drain должен их учитывать
+                    if self._flushed is None:
+                        self._flushed = asyncio.get_running_loop().create_future()
+                    await asyncio.shield(self._flushed)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        books = self.library.books
+        replies: dict[asyncio.StreamWriter, bytearray] = {}
+        for start in range(0, len(pending), self.max_batch):
+            self._answer(pending[start:start + self.max_batch], books, replies)
+        for writer, out in replies.items():
+            if not writer.is_closing():
+                writer.write(out)
+        flushed, self._flushed = self._flushed, None
+        if flushed is not None:
+            flushed.set_result(None)
+
+    def _answer(self, batch: list[tuple[asyncio.StreamWriter, int, int, int]], books: list[Book],
+                replies: dict[asyncio.StreamWriter, bytearray]) -> None:
+        self.batches += 1
+        self.requests += len(batch)
+        found = multi_get(self.library, [id_ for _, _, _, id_ in batch])
+        for writer, request_id, operation, id_ in batch:
+            out = replies.get(writer)
+            if out is None:
+                out = replies[writer] = bytearray()
+            index = found.get(id_)
+            if operation not in (INDEX, GET):
+                out += REPLY.pack(request_id, BAD_REQUEST, -1, 0, 0)
+            elif index is None:
+                out += REPLY.pack(request_id, NOT_FOUND, -1, 0, 0)
+            elif operation == INDEX:
+                out += REPLY.pack(request_id, OK, index, 0, 0)
+            else:
+                book = books[index]
+                name = book.name.encode("utf-8")
+                out += REPLY.pack(request_id, OK, index, book.pages, len(name))
+                out += name
+
+
+class _Connection:
+    """ Одно соединение клиента: запросы отправляются без ожидания, ответы сопоставляются по номеру. """
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.pending: dict[int, asyncio.Future] = {}
+        self._numbers = itertools.count()
+        self._reader = asyncio.create_task(self._read(reader))
+
+    @property
+    def closed(self) -> bool:
+        return self._reader.done()
+
+    def request(self, operation: int, id_: int) -> asyncio.Future:
+        if self.closed:
+            # После завершения _read ответы больше не читаются, и зарегистрированный запрос ждал бы вечно
+            raise ConnectionError("Ошибка. Соединение с сервером закрыто")
+        request_id = next(self._numbers) & 0xFFFFFFFF
+        try:
+            request = REQUEST.pack(request_id, operation, id_)
+        except struct.error:
+            raise ValueError("Ошибка. Идентификатор книги должен помещаться в 64-битное целое со знаком") from None
+        future = self.pending[request_id] = asyncio.get_running_loop().create_future()
+        self.writer.write(request)
+        return future
+
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        buffer = bytearray()
+        try:
+            while True:
+                data = await reader.read(2 ** 16)
+                if not data:
+                    break
+                buffer += data
+                offset = 0
+                while len(buffer) - offset >= REPLY.size:
+                    request_id, status, index, pages, name_length = REPLY.unpack_from(buffer, offset)
+                    end = offset + REPLY.size + name_length
+                    if end > len(buffer):
+                        break
+                    name = buffer[offset + REPLY.size:end].decode("utf-8")
+                    future = self.pending.pop(request_id, None)
+                    if future is not None and not future.done():
+                        future.set_result((status, index, pages, name))
+                    offset = end
+                del buffer[:offset]
+        except ConnectionError:
+            pass
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Ошибка. Соединение с сервером закрыто"))
+            self.pending.clear()
+
+    async def close(self) -> None:
+        self.writer.close()
+        await self._reader
+
+
+class LookupClient:
+    """
+    Клиент сервера поиска с пулом соединений. Запросы распределяются по соединениям по кругу и отправляются
+    конвейером: много сопрограмм могут ждать ответов по одному соединению одновременно. Соединения, закрытые
+    сервером, убираются из пула; когда закрыты все, запросы завершаются ConnectionError.
+    """
+    def __init__(self, connections: list[_Connection]):
+        self._connections = connections
+        self._turns = itertools.count()
+
+    def _connection(self) -> _Connection:
+        while self._connections:
+            slot = next(self._turns) % len(self._connections)
+            connection = self._connections[slot]
+            if not connection.closed:
+                return connection
+            del self._connections[slot]
+            connection.writer.close()
+        raise ConnectionError("Ошибка. Все соединения с сервером закрыты")
+
+    @classmethod
+    async def connect(cls, host: str = "127.0.0.1", port: Optional[int] = None, path: Optional[str] = None,
+                      connections: int = 4) -> "LookupClient":
+        """
+        Открывает пул соединений
+
+        :param host: Адрес TCP-сервера
+        :param port: Порт TCP-сервера
+        :param path: Путь к Unix-сокету, если сервер запущен через start_unix
+        :param connections: Количество соединений в пуле
+        :return: Клиент
+        """
+        if (port is None) == (path is None):
+            raise ValueError("Ошибка. Нужно указать либо port, либо path")
+        pool = []
+        for _ in range(connections):
+            if path is not None:
+                reader, writer = await asyncio.open_unix_connection(path)
+            else:
+                reader, writer = await asyncio.open_connection(host, port)
+            pool.append(_Connection(reader, writer))
+        return cls(pool)
+
+    async def _call(self, operation: int, id_: int) -> tuple[int, int, str]:
+        if not isinstance(id_, int):
+            raise TypeError("Ошибка. Идентификатор книги должен быть целым числом")
+        status, index, pages, name = await self._connection().request(operation, id_)
+        if status == NOT_FOUND:
+            raise ValueError("Книги с запрашиваемым id не существует")
+        if status != OK:
+            raise ValueError("Ошибка. Сервер не принял запрос")
+        return index, pages, name
+
+    async def get_index_by_book_id(self, id_: int) -> int:
+        """
+        Метод возвращает индекс книги с требуемым id_ в библиотеке сервера
+
+        :param id_: Идентификатор книги
+        :return: Индекс книги
+        """
+        return (await self._call(INDEX, id_))[0]
+
+    async def get_book(self, id_: int) -> Book:
+        """
+        Метод возвращает копию книги с требуемым id_
+
+        :param id_: Идентификатор книги
+        :return: Книга
+        """
+        _, pages, name = await self._call(GET, id_)
+        return Book(id_, name, pages)
+
+    async def close(self) -> None:
+        for connection in self._connections:
+            await connection.close()
+
+    async def __aenter__(self) -> "LookupClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+async def load_test(library: Library, clients: int = 2000, requests: int = 5, connections: int = 8,
+                    window: float = 0.0002, max_batch: int = 4096, unix_path: Optional[str] = None) -> dict:
+    """
+    Запускает сервер и clients сопрограмм, каждая из которых последовательно выполняет requests поисков
+    случайных книг через общий пул соединений
+
+    :param library: Библиотека
+    :param clients: Количество одновременных клиентов
+    :param requests: Количество запросов каждого клиента
+    :param connections: Размер пула соединений
+    :param window: Время накопления группы запросов
+    :param max_batch: Максимальный размер группы, 1 - без группировки
+    :param unix_path: Путь к Unix-сокету, по умолчанию - TCP
+    :return: Пропускная способность, задержки (p50, p99, p99.9, максимум) и средний размер группы
+    """
+    server = LookupServer(library, window, max_batch)
+    if unix_path is None:
+        host, port = await server.start()
+        client = await LookupClient.connect(host, port, connections=connections)
+    else:
+        await server.start_unix(unix_path)
+        client = await LookupClient.connect(path=unix_path, connections=connections)
+    ids = [book.id_ for book in library.books]
+    latencies: list[float] = []
+
+    async def user(seed: int) -> None:
+        rng = random.Random(seed)
+        for _ in range(requests):
+            start = time.perf_counter()
+            await client.get_index_by_book_id(rng.choice(ids))
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(seed) for seed in range(clients)))
+    elapsed = time.perf_counter() - start
+    await client.close()
+    await server.close()
+    latencies.sort()
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[int(len(latencies) * 0.99)],
+        "p999": latencies[int(len(latencies) * 0.999)],
+        "max": latencies[-1],
+        "batch": server.requests / server.batches,
+    }
+
+
+def benchmark(size: int = 20_000, clients: int = 2000) -> None:
+    """
+    Сравнивает сервер без группировки (max_batch=1) и с группировкой запросов для Library и IndexedLibrary
+
+    :param size: Количество книг
+    :param clients: Количество одновременных клиентов
+    :return: None
+    """
+    books = [Book(id_=id_, name=f"book_{id_}", pages=100 + id_ % 500) for id_ in range(1, size + 1)]
+    print(f"{size} книг, {clients} клиентов")
+    print(f"{'библиотека':<15} {'группы':<7} {'запросов/с':>11} {'p50, мс':>8} {'p99, мс':>8} {'p99.9, мс':>10} "
+          f"{'группа':>7}")
+    with tempfile.TemporaryDirectory() as directory:
+        for library_class in (Library, IndexedLibrary):
+            library = library_class(books)
+            for max_batch, socket_kind in ((1, "tcp"), (4096, "tcp"), (4096, "unix")):
+                path = os.path.join(directory, "lookup.sock") if socket_kind == "unix" else None
+                result = asyncio.run(load_test(library, clients, max_batch=max_batch, unix_path=path))
+                mode = "нет" if max_batch == 1 else socket_kind
+                print(f"{library_class.__name__:<15} {mode:<7} {result['throughput']:>11,.0f} "
+                      f"{result['p50'] * 1e3:>8.2f} {result['p99'] * 1e3:>8.2f} {result['p999'] * 1e3:>10.2f} "
+                      f"{result['batch']:>7.0f}")
+
+
+async def _demo() -> None:
+    list_books = [
+        Book(id_=book_dict["id"], name=book_dict["name"], pages=book_dict["pages"]) for book_dict in BOOKS_DATABASE
+    ]
+    server = LookupServer(Library(books=list_books))
+    host, port = await server.start()
+    async with await LookupClient.connect(host, port, connections=2) as client:
+        print(await client.get_index_by_book_id(2))  # 1
+        print(repr(await client.get_book(1)))  # Book(id_=1, name='test_name_1', pages=200)
+        print(await asyncio.gather(*(client.get_index_by_book_id(id_) for id_ in (1, 2, 1))))  # [0, 1, 0]
+        for missing_id in (3, 2 ** 63):
+            try:
+                await client.get_index_by_book_id(missing_id)
+            except ValueError as error:
+                print(error)  # Книги с запрашиваемым id не существует; id_ вне 64 бит
+    await server.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(_demo())
+    benchmark()
@@ -1,4 +1,6 @@
-from typing import Optional
+from typing import Iterable, Optional, Sequence
+
+from schema import Check, Field, Schema
 
 
 BOOKS_DATABASE = [
@@ -16,6 +18,16 @@ BOOKS_DATABASE = [
 
 
 class Book:
+    _schema = Schema(
+        Field('id_', int, "Ошибка. Идентификатор книги должен быть целым числом", [
+            Check('id_ < 0', ValueError, "Ошибка. Идентификатор книги должен быть больше 0"),
+        ]),
+        Field('name', str, "Ошибка. Имя должно быть строковым значением"),
+        Field('pages', int, "Ошибка. Количество страниц должно быть целым числом", [
+            Check('pages < 0', ValueError, "Ошибка. Количество страниц должно быть больше 0"),
+        ]),
+    )
+
     def __init__(self, id_: int, name: str, pages: int):
         """
         Инициализирует объект "Книга"
@@ -24,21 +36,18 @@ class Book:
         :param name: Наименование книги
         :param pages: Количество страниц
         """
-        if not isinstance(id_, int):
-            raise TypeError("Ошибка. Идентификатор книги должен быть целым числом")
-        if id_ < 0:
-            raise ValueError("Ошибка. Идентификатор книги должен быть больше 0")
-        self.id_ = id_
-
-        if not isinstance(name, str):
-            raise TypeError("Ошибка. Имя должно быть строковым значением")
-        self.name = name
-
-        if not isinstance(pages, int):
-            raise TypeError("Ошибка. Количество страниц должно быть целым числом")
-        if pages < 0:
-            raise ValueError("Ошибка. Количество страниц должно быть больше 0")
-        self.pages = pages
+        self._schema.init(self, id_, name, pages)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence]) -> list["Book"]:
+        """
+        Создаёт книги из строк (id_, name, pages). Строки проверяются по столбцам теми же правилами, что и в
+        __init__, после чего объекты создаются без повторных проверок
+
+        :param rows: Строки со значениями аргументов __init__
+        :return: Список книг
+        """
+        return cls._schema.from_rows(cls, rows)
 
     def __str__(self) -> str:
         return f'Книга "{self.name}"'
@@ -0,0 +1,203 @@
+from typing import Iterable, Iterator, Union
+
+import mmap
+import os
+import struct
+import tempfile
+import time
+
+from main import BOOKS_DATABASE, Book, Library
+
+
+# Формат снимка (все числа little-endian):
+#   заголовок   - сигнатура, версия формата, количество книг, максимальный id_ (-1 для пустой библиотеки);
+#   записи      - по одной на книгу в порядке Library.books: id_, pages, смещение и длина наименования в куче строк;
+#   индекс      - пары (id_, индекс записи), отсортированные по id_, для двоичного поиска;
+#   куча строк  - наименования в UTF-8 подряд.
+MAGIC = b"LIBSNAP\x00"
+VERSION = 1
+HEADER = struct.Struct("<8sIQq")
+RECORD = struct.Struct("<qqQI")
+INDEX_ENTRY = struct.Struct("<qQ")
+
+
+def write_snapshot(books: Union[Library, Iterable[Book]], path: str) -> None:
+    """
+    Функция записывает книги в файл снимка. Файл заменяется атомарно, поэтому читатели никогда не видят
+    недописанный снимок
+
+    :param books: Библиотека или последовательность объектов Book
+    :param path: Путь к файлу снимка
+    :return: None
+    """
+    if isinstance(books, Library):
+        books = books.books
+
+    records = bytearray()
+    heap = bytearray()
+    index = []
+    for position, book in enumerate(books):
+        if not isinstance(book, Book):
+            raise TypeError("Ошибка. Элементы должны быть объектами класса Book")
+        name = book.name.encode("utf-8")
+        records += RECORD.pack(book.id_, book.pages, len(heap), len(name))
+        heap += name
+        index.append((book.id_, position))
+    index.sort()
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, len(index), index[-1][0] if index else -1))
+            file.write(records)
+            file.write(b"".join(INDEX_ENTRY.pack(id_, position) for id_, position in index))
+            file.write(heap)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class MappedLibrary:
+    """
+    Библиотека только для чтения, отображённая из файла снимка через mmap.
+
+    Открытие не зависит от размера каталога: записи читаются с диска по мере обращения к ним, а поиск по id_
+    выполняется двоичным поиском по индексу прямо в отображённом файле.
+    """
+    def __init__(self, path: str):
+        """
+        Открывает файл снимка
+
+        :param path: Путь к файлу, созданному функцией write_snapshot
+        """
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < HEADER.size:
+            self._mmap.close()
+            raise ValueError("Ошибка. Файл слишком мал для снимка библиотеки")
+        magic, version, self._count, self._max_id = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError("Ошибка. Файл не является снимком библиотеки поддерживаемой версии")
+        self._records_offset = HEADER.size
+        self._index_offset = self._records_offset + self._count * RECORD.size
+        self._heap_offset = self._index_offset + self._count * INDEX_ENTRY.size
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __enter__(self) -> "MappedLibrary":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> Book:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("Ошибка. Индекс книги вне диапазона")
+        id_, pages, name_offset, name_length = RECORD.unpack_from(
+            self._mmap, self._records_offset + index * RECORD.size
+        )
+        start = self._heap_offset + name_offset
+        # Данные проверены при записи снимка, поэтому объект собирается без повторной проверки
+        book = Book.__new__(Book)
+        book.id_ = id_
+        book.name = self._mmap[start:start + name_length].decode("utf-8")
+        book.pages = pages
+        return book
+
+    def __iter__(self) -> Iterator[Book]:
+        for index in range(self._count):
+            yield self[index]
+
+    def get_next_book_id(self) -> int:
+        """
+        Метод возвращает значение на единицу больше максимального id_ книги, сохранённого в заголовке снимка
+
+        :return: Идентификатор, следующий по порядку после максимального
+        """
+        if not self._count:
+            return 1
+        return self._max_id + 1
+
+    def get_index_by_book_id(self, id_: int) -> int:
+        """
+        Метод возвращает индекс книги с требуемым id_ двоичным поиском по индексу снимка. Если книг с таким id_
+        несколько, возвращается наименьший индекс, как и у Library
+
+        :param id_: Идентификатор книги
+        :return: Индекс книги с требуемым id_
+        """
+        if not isinstance(id_, int):
+            raise TypeError("Ошибка. Идентификатор книги должен быть целым числом")
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if INDEX_ENTRY.unpack_from(self._mmap, self._index_offset + middle * INDEX_ENTRY.size)[0] < id_:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count:
+            found_id, position = INDEX_ENTRY.unpack_from(self._mmap, self._index_offset + low * INDEX_ENTRY.size)
+            if found_id == id_:
+                return position
+        raise ValueError("Книги с запрашиваемым id не существует")
+
+    def to_library(self) -> Library:
+        """
+        Метод полностью загружает снимок в объект Library
+
+        :return: Библиотека
+        """
+        return Library(list(self))
+
+
+def measure_startup(size: int) -> tuple[float, float]:
+    """
+    Сравнивает время от старта до первого поиска по id_: сборка Library из словарей против открытия снимка
+
+    :param size: Количество книг
+    :return: Время в секундах для сборки из словарей и для открытия снимка
+    """
+    records = [{"id": id_, "name": f"book_{id_}", "pages": 100 + id_ % 500} for id_ in range(1, size + 1)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "library.snapshot")
+        start = time.perf_counter()
+        library = Library([Book(id_=record["id"], name=record["name"], pages=record["pages"]) for record in records])
+        library.get_index_by_book_id(size // 2)
+        rebuild_time = time.perf_counter() - start
+
+        write_snapshot(library, path)
+        del library
+        start = time.perf_counter()
+        with MappedLibrary(path) as mapped:
+            mapped.get_index_by_book_id(size // 2)
+        open_time = time.perf_counter() - start
+    return rebuild_time, open_time
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        snapshot_path = os.path.join(tmp_dir, "library.snapshot")
+        list_books = [
+            Book(id_=book_dict["id"], name=book_dict["name"], pages=book_dict["pages"]) for book_dict in BOOKS_DATABASE
+        ]
+        write_snapshot(Library(books=list_books), snapshot_path)
+        with MappedLibrary(snapshot_path) as mapped_library:
+            print(list(mapped_library))
+            print(mapped_library.get_next_book_id())  # 3
+            print(mapped_library.get_index_by_book_id(2))  # 1
+
+    for catalog_size in (10 ** 4, 10 ** 5, 10 ** 6):
+        rebuild, open_ = measure_startup(catalog_size)
+        print(f"{catalog_size:>8} книг: сборка из словарей {rebuild * 1e3:.1f} мс, "
+              f"открытие снимка {open_ * 1e3:.3f} мс")
@@ -0,0 +1,268 @@
+from bisect import bisect_left, bisect_right, insort
+from itertools import chain, islice
+from operator import attrgetter
+from typing import Iterable, Iterator, Optional
+
+import random
+import time
+
+from indexed_library import IndexedLibrary
+from main import BOOKS_DATABASE, Book
+
+
+class SortedKeys:
+    """
+    Упорядоченный набор ключей, разбитый на блоки не длиннее 2 * load. Поиск места ключа - двоичный поиск по
+    максимумам блоков и внутри блока, вставка и удаление сдвигают элементы только одного блока.
+    """
+    def __init__(self, keys: Iterable[tuple] = (), load: int = 512):
+        self.load = load
+        keys = sorted(keys)
+        self._blocks = [keys[start:start + load] for start in range(0, len(keys), load)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._len = len(keys)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[tuple]:
+        return chain.from_iterable(self._blocks)
+
+    def add(self, key: tuple) -> None:
+        blocks, maxes = self._blocks, self._maxes
+        self._len += 1
+        if not blocks:
+            blocks.append([key])
+            maxes.append(key)
+            return
+        index = bisect_left(maxes, key)
+        if index == len(blocks):
+            index -= 1
+            blocks[index].append(key)
+            maxes[index] = key
+        else:
+            insort(blocks[index], key)
+        block = blocks[index]
+        if len(block) > 2 * self.load:
+            blocks.insert(index + 1, block[self.load:])
+            del block[self.load:]
+            maxes[index] = block[-1]
+            maxes.insert(index + 1, blocks[index + 1][-1])
+
+    def remove(self, key: tuple) -> None:
+        blocks, maxes = self._blocks, self._maxes
+        index = bisect_left(maxes, key)
+        if index < len(blocks):
+            block = blocks[index]
+            position = bisect_left(block, key)
+            if block[position] == key:
+                del block[position]
+                self._len -= 1
+                if block:
+                    maxes[index] = block[-1]
+                else:
+                    del blocks[index], maxes[index]
+                return
+        raise ValueError("Ошибка. Ключа нет в наборе")
+
+    def after(self, key: Optional[tuple]) -> Iterator[tuple]:
+        """ Ключи больше key по возрастанию; key=None - с начала. """
+        if key is None:
+            return iter(self)
+        index = bisect_right(self._maxes, key)
+        if index == len(self._blocks):
+            return iter(())
+        first = self._blocks[index]
+        return chain(islice(first, bisect_right(first, key), None), chain.from_iterable(self._blocks[index + 1:]))
+
+    def before(self, key: Optional[tuple]) -> Iterator[tuple]:
+        """ Ключи меньше key по убыванию; key=None - с конца. """
+        blocks = self._blocks
+        if key is None:
+            return chain.from_iterable(map(reversed, reversed(blocks)))
+        index = min(bisect_left(self._maxes, key), len(blocks) - 1)
+        if index < 0:
+            return iter(())
+        last = blocks[index]
+        head = reversed(last[:bisect_left(last, key)])
+        return chain(head, chain.from_iterable(map(reversed, reversed(blocks[:index]))))
+
+
+class SortedLibrary(IndexedLibrary):
+    """
+    Библиотека с поддерживаемыми упорядоченными представлениями по полям id_, pages и name.
+
+    Представление хранит ключи (значение поля, id_): id_ делает ключи уникальными и задаёт порядок книг
+    с одинаковым значением поля. add_book и remove_book обновляют представления за O(log n + load), а page
+    выдаёт страницу после курсора - ключа последней книги предыдущей страницы - за O(log n + limit), на какой бы
+    глубине ни находилась страница.
+
+    Представления упорядочены по значениям полей на момент добавления книги, которые библиотека хранит сама.
+    Поля книги, уже стоящей в библиотеке, меняются только через update_book: прямое присваивание book.pages
+    не переставит книгу в представлениях, хотя remove_book и update_book по сохранённым значениям по-прежнему
+    найдут её ключи.
+    """
+    FIELDS = ('id_', 'pages', 'name')
+
+    def __init__(self, books: Optional[list[Book]] = None):
+        """
+        Инициализирует объект "Библиотека с упорядоченными представлениями"
+
+        :param books: Список книг, состоящий из объектов класса Book
+        """
+        self._row = attrgetter(*self.FIELDS)
+        self._values: dict[int, tuple] = {}  # id_ -> значения полей FIELDS, под которыми книга стоит в представлениях
+        self._views: dict[str, SortedKeys] = {}
+        super().__init__(books)
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        self._values = {book.id_: self._row(book) for book in self.books}
+        self._views = {field: SortedKeys((row[position], id_) for id_, row in self._values.items())
+                       for position, field in enumerate(self.FIELDS)}
+
+    def _insert(self, book: Book) -> None:
+        row = self._values[book.id_] = self._row(book)
+        for view, value in zip(self._views.values(), row):
+            view.add((value, book.id_))
+
+    def _unindex(self, id_: int) -> None:
+        for view, value in zip(self._views.values(), self._values.pop(id_)):
+            view.remove((value, id_))
+
+    def add_book(self, book: Book) -> None:
+        """
+        Метод добавляет книгу в конец списка books и во все представления
+
+        :param book: Добавляемая книга
+        :return: None
+        """
+        super().add_book(book)
+        if self._views:  # во время extend представления отключены и обновляются после добавления всех книг
+            self._insert(book)
+
+    def extend(self, books: Iterable[Book]) -> None:
+        """
+        Метод добавляет книги из последовательности. Если книг больше, чем уже есть в библиотеке, представления
+        строятся заново одной сортировкой, иначе книги вставляются в них по одной
+
+        :param books: Последовательность объектов класса Book
+        :return: None
+        """
+        start = len(self.books)
+        views, self._views = self._views, {}  # на время проверки и добавления представления не обновляются
+        try:
+            super().extend(books)
+        finally:
+            self._views = views
+        added = self.books[start:]
+        if len(added) > start:
+            self._rebuild()
+            return
+        for book in added:
+            self._insert(book)
+
+    def remove_book(self, id_: int) -> Book:
+        """
+        Метод удаляет книгу с требуемым id_ из списка books и из всех представлений
+
+        :param id_: Идентификатор книги
+        :return: Удалённая книга
+        """
+        book = super().remove_book(id_)
+        self._unindex(id_)  # ключи берутся из сохранённых значений, поэтому удаление из представлений не падает
+        return book
+
+    def update_book(self, id_: int, name: Optional[str] = None, pages: Optional[int] = None) -> Book:
+        """
+        Метод заменяет книгу с требуемым id_ новым объектом с изменёнными полями и переставляет её в представлениях.
+        Новая книга проверяется конструктором Book до изменения библиотеки
+
+        :param id_: Идентификатор книги
+        :param name: Новое наименование, None - оставить прежнее
+        :param pages: Новое количество страниц, None - оставить прежнее
+        :return: Новая книга
+        """
+        index = self.get_index_by_book_id(id_)
+        current = self.books[index]
+        book = Book(id_, current.name if name is None else name, current.pages if pages is None else pages)
+        self._unindex(id_)
+        self.books[index] = book
+        self._insert(book)
+        return book
+
+    def page(self, field: str = 'id_', limit: int = 20, after: Optional[tuple] = None,
+             descending: bool = False) -> tuple[list[Book], Optional[tuple]]:
+        """
+        Метод возвращает страницу книг, упорядоченных по полю, начиная после курсора
+
+        :param field: Поле упорядочивания: 'id_', 'pages' или 'name'
+        :param limit: Количество книг на странице
+        :param after: Курсор, полученный с предыдущей страницей; None - первая страница
+        :param descending: Упорядочить по убыванию
+        :return: Книги страницы и курсор следующей страницы (None, если страница последняя)
+        """
+        if field not in self._views:
+            raise ValueError(f"Ошибка. Упорядочивание возможно по полям {', '.join(self.FIELDS)}")
+        if not isinstance(limit, int) or limit < 1:
+            raise ValueError("Ошибка. limit должен быть целым числом больше либо равным 1")
+        if after is not None and not (isinstance(after, tuple) and len(after) == 2):
+            raise TypeError("Ошибка. Курсор должен быть значением, полученным от page")
+        view = self._views[field]
+        # Ключ на один больше limit показывает, есть ли следующая страница
+        keys = list(islice(view.before(after) if descending else view.after(after), limit + 1))
+        cursor = keys[limit - 1] if len(keys) > limit else None
+        books, positions = self.books, self._positions
+        return [books[positions[id_]] for _, id_ in keys[:limit]], cursor
+
+
+def benchmark(size: int = 10 ** 6, limit: int = 20, requests: int = 20) -> None:
+    """
+    Сравнивает выдачу страницы по pages сортировкой всего списка с переходом по смещению и по курсору
+    SortedLibrary на разной глубине
+
+    :param size: Количество книг
+    :param limit: Размер страницы
+    :param requests: Количество запросов каждой глубины для SortedLibrary
+    :return: None
+    """
+    rng = random.Random(0)
+    books = [Book(id_, f"book_{rng.randrange(size)}", rng.randint(1, 1000)) for id_ in range(1, size + 1)]
+    start = time.perf_counter()
+    library = SortedLibrary(books)
+    print(f"{size} книг, построение представлений {time.perf_counter() - start:.2f} с")
+    ordered = sorted(library.books, key=attrgetter('pages', 'id_'))
+    for depth in (0, size // 2, size - limit):
+        start = time.perf_counter()
+        expected = sorted(library.books, key=attrgetter('pages', 'id_'))[depth:depth + limit]
+        offset_time = time.perf_counter() - start
+        cursor = None if depth == 0 else (ordered[depth - 1].pages, ordered[depth - 1].id_)
+        start = time.perf_counter()
+        for _ in range(requests):
+            found, _ = library.page('pages', limit, cursor)
+        keyset_time = (time.perf_counter() - start) / requests
+        assert found == expected
+        print(f"страница с позиции {depth:>8}: сортировка и смещение {offset_time * 1e3:8.1f} мс, "
+              f"курсор {keyset_time * 1e6:6.1f} мкс")
+    next_id = library.get_next_book_id()
+    start = time.perf_counter()
+    for id_ in range(next_id, next_id + 10_000):
+        library.add_book(Book(id_, "new", rng.randint(1, 1000)))
+    print(f"добавление с обновлением трёх представлений {(time.perf_counter() - start) / 10_000 * 1e6:.1f} мкс")
+
+
+if __name__ == '__main__':
+    list_books = [
+        Book(id_=book_dict["id"], name=book_dict["name"], pages=book_dict["pages"]) for book_dict in BOOKS_DATABASE
+    ]
+    library = SortedLibrary(books=list_books)
+    library.extend([Book(3, "a_book", 50), Book(4, "z_book", 300)])
+    first, next_cursor = library.page('pages', limit=2)
+    print(first, next_cursor)  # книги 3 и 1, курсор (200, 1)
+    print(library.page('pages', limit=2, after=next_cursor))  # книги 4 и 2, последняя страница
+    library.remove_book(3)
+    print(library.page('name', limit=10, descending=True)[0])  # книги 4, 2, 1
+    library.update_book(4, pages=10)
+    print(library.page('pages', limit=1)[0])  # книга 4 с 10 страницами
+
+    benchmark()
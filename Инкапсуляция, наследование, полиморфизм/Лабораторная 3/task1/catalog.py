@@ -0,0 +1,286 @@
+from array import array
+from bisect import bisect_left
+from itertools import chain, compress
+from operator import and_, attrgetter
+from typing import Iterable, Iterator, Optional, Sequence, Union
+
+import math
+import random
+import time
+
+from frozen_books import FrozenAudioBook, FrozenBook, FrozenPaperBook, mutable_class
+from main import AudioBook, Book, PaperBook
+
+
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+class _Partition:
+    """
+    Книги одного класса: сами объекты и по колонке array на каждое числовое поле класса. stale - колонки
+    устарели, потому что поле одной из книг изменили через сеттер, и перед чтением их нужно построить заново.
+    members - id() изменяемых книг раздела, чтобы изменение книги из другого каталога колонки не сбрасывало.
+    """
+    def __init__(self, book_class: type, columns: dict[str, str]):
+        self.book_class = book_class
+        self.books: list[Union[Book, FrozenBook]] = []
+        self.columns = {name: array(typecode) for name, typecode in columns.items()}
+        self.stale = False
+        self.members: Optional[set[int]] = set() if issubclass(book_class, Book) else None
+
+    def matches(self, book_class: Optional[type]) -> bool:
+        # Как в search_index: фильтр PaperBook находит и FrozenPaperBook
+        return (book_class is None or issubclass(self.book_class, book_class)
+                or issubclass(mutable_class(self.book_class), book_class))
+
+    def refresh(self) -> None:
+        if self.stale:
+            for name, column in list(self.columns.items()):
+                self.columns[name] = array(column.typecode, map(attrgetter(name), self.books))
+            self.stale = False
+
+    def append(self, book: Union[Book, FrozenBook]) -> None:
+        values = [(column, getattr(book, name)) for name, column in self.columns.items()]
+        for column, value in values:
+            column.append(value)
+        self.books.append(book)
+        if self.members is not None:
+            self.members.add(id(book))
+
+
+class Catalog:
+    """
+    Смешанный каталог книг, разделённый по классам: у каждого класса свой раздел с колонками его числовых полей
+    (pages у PaperBook, duration у AudioBook). Суммы, средние, гистограммы и выборки по диапазону считаются по
+    колонкам разделов, без isinstance и вызова свойства для каждой книги.
+
+    Новый класс книг регистрирует свои колонки через Catalog.register. Незарегистрированный подкласс получает
+    собственный раздел с колонками ближайшего зарегистрированного предка.
+
+    Каталог подписан на Book.observers: сеттеры pages и duration изменяемых книг сообщают об изменении, и колонки
+    раздела этого класса строятся заново при следующем запросе. Сеттер числового поля нового изменяемого класса
+    должен так же вызывать Book._notify, иначе его колонка устареет. Неизменяемые книги из frozen_books
+    колонок не сбрасывают.
+    """
+    registry: dict[type, dict[str, str]] = {}  # класс книги -> имя числового поля -> код типа array
+
+    def __init__(self, books: Optional[Iterable[Union[Book, FrozenBook]]] = None):
+        self._partitions: dict[type, _Partition] = {}
+        Book.observers.add(self)
+        if books is not None:
+            self.extend(books)
+
+    @classmethod
+    def register(cls, book_class: type, **columns: str) -> None:
+        """
+        Регистрирует числовые поля класса книг
+
+        :param book_class: Класс книг
+        :param columns: Имя поля -> код типа array ('q' для целых, 'd' для дробных)
+        :return: None
+        """
+        if not isinstance(book_class, type) or not issubclass(book_class, (Book, FrozenBook)):
+            raise TypeError("Ошибка. book_class должен быть подклассом Book или FrozenBook")
+        for name, typecode in columns.items():
+            if typecode not in ('q', 'd'):
+                raise ValueError(f"Ошибка. Код типа колонки {name} должен быть 'q' или 'd'")
+        cls.registry[book_class] = dict(columns)
+
+    def book_changed(self, book: Book, field: str) -> None:
+        """
+        Метод вызывается из сеттеров числовых полей книг и помечает колонки раздела класса книги устаревшими,
+        если книга стоит в этом каталоге
+
+        :param book: Изменённая книга
+        :param field: Имя изменённого поля
+        :return: None
+        """
+        partition = self._partitions.get(type(book))
+        if partition is not None and field in partition.columns and id(book) in partition.members:
+            partition.stale = True
+
+    def _partition(self, book_class: type) -> _Partition:
+        partition = self._partitions.get(book_class)
+        if partition is None:
+            for klass in book_class.__mro__:
+                if klass in self.registry:
+                    break
+            else:
+                raise TypeError("Ошибка. Элементы должны быть объектами класса Book или FrozenBook")
+            partition = self._partitions[book_class] = _Partition(book_class, self.registry[klass])
+        return partition
+
+    def add(self, book: Union[Book, FrozenBook]) -> None:
+        """
+        Добавляет книгу в раздел её класса
+
+        :param book: Книга
+        :return: None
+        """
+        self._partition(type(book)).append(book)
+
+    def extend(self, books: Iterable[Union[Book, FrozenBook]]) -> None:
+        for book in books:
+            self._partition(type(book)).append(book)
+
+    def __len__(self) -> int:
+        return sum(len(partition.books) for partition in self._partitions.values())
+
+    def __iter__(self) -> Iterator[Union[Book, FrozenBook]]:
+        for partition in list(self._partitions.values()):
+            yield from partition.books
+
+    def _columns(self, column: str, book_class: Optional[type]) -> list[tuple[_Partition, array]]:
+        partitions = [partition for partition in self._partitions.values()
+                      if column in partition.columns and partition.matches(book_class)]
+        for partition in partitions:
+            partition.refresh()
+        selected = [(partition, partition.columns[column]) for partition in partitions]
+        if not selected and not any(column in columns for columns in self.registry.values()):
+            raise ValueError(f"Ошибка. Колонки {column} нет ни у одного зарегистрированного класса")
+        return selected
+
+    def count(self, book_class: Optional[type] = None) -> int:
+        """
+        Метод считает книги указанного класса и его подклассов; неизменяемые книги считаются по их изменяемому
+        классу, как в search_index
+
+        :param book_class: Класс книг, по умолчанию - все книги
+        :return: Количество книг
+        """
+        return sum(len(partition.books) for partition in self._partitions.values() if partition.matches(book_class))
+
+    def total(self, column: str, book_class: Optional[type] = None) -> Union[int, float]:
+        """
+        Метод возвращает сумму числового поля по всем книгам, у которых оно есть
+
+        :param column: Имя поля, например 'pages' или 'duration'
+        :param book_class: Класс книг, по умолчанию - все разделы с этим полем
+        :return: Сумма
+        """
+        columns = [values for _, values in self._columns(column, book_class)]
+        if any(values.typecode == 'd' for values in columns):
+            return math.fsum(chain.from_iterable(columns))
+        return sum(sum(values) for values in columns)
+
+    def mean(self, column: str, book_class: Optional[type] = None) -> float:
+        """
+        Метод возвращает среднее значение числового поля
+
+        :param column: Имя поля
+        :param book_class: Класс книг, по умолчанию - все разделы с этим полем
+        :return: Среднее значение
+        """
+        count = sum(len(values) for _, values in self._columns(column, book_class))
+        if not count:
+            raise ValueError(f"Ошибка. В каталоге нет книг с полем {column}")
+        return self.total(column, book_class) / count
+
+    def histogram(self, column: str, edges: Sequence[Union[int, float]],
+                  book_class: Optional[type] = None) -> list[int]:
+        """
+        Метод считает книги по интервалам [edges[i], edges[i + 1]) значений числового поля. Колонка сортируется
+        один раз, границы интервалов находятся двоичным поиском
+
+        :param column: Имя поля
+        :param edges: Возрастающие границы интервалов
+        :param book_class: Класс книг, по умолчанию - все разделы с этим полем
+        :return: Количество книг в каждом интервале
+        """
+        if any(left >= right for left, right in zip(edges, edges[1:])):
+            raise ValueError("Ошибка. Границы интервалов edges должны возрастать")
+        counts = [0] * max(len(edges) - 1, 0)
+        for _, values in self._columns(column, book_class):
+            ordered = sorted(values)
+            positions = [bisect_left(ordered, edge) for edge in edges]
+            for index, (start, end) in enumerate(zip(positions, positions[1:])):
+                counts[index] += end - start
+        return counts
+
+    def select(self, column: str, low: Union[int, float], high: Union[int, float],
+               book_class: Optional[type] = None) -> list[Union[Book, FrozenBook]]:
+        """
+        Метод возвращает книги, значение поля которых лежит в отрезке [low, high]
+
+        :param column: Имя поля
+        :param low: Нижняя граница
+        :param high: Верхняя граница
+        :param book_class: Класс книг, по умолчанию - все разделы с этим полем
+        :return: Список книг в порядке разделов и добавления
+        """
+        for bound in (low, high):
+            if not isinstance(bound, (int, float)):
+                raise TypeError("Ошибка. Границы low и high должны быть int или float")
+            if math.isnan(bound):
+                raise ValueError("Ошибка. Границы low и high не могут быть NaN")
+        found = []
+        for partition, values in self._columns(column, book_class):
+            if values.typecode == 'd':
+                lower, upper = float(low), float(high)
+            else:
+                # int.__le__ с float возвращает NotImplemented, поэтому границы приводятся к int. Бесконечные
+                # границы сначала ограничиваются пределами колонки 'q', которые не пропускают ни одного значения
+                lower = math.ceil(min(max(low, INT64_MIN), INT64_MAX + 1))
+                upper = math.floor(max(min(high, INT64_MAX), INT64_MIN - 1))
+            # Сравнения выполняются методами границ внутри map, без цикла Python по книгам
+            mask = map(and_, map(lower.__le__, values), map(upper.__ge__, values))
+            found.extend(compress(partition.books, mask))
+        return found
+
+
+Catalog.register(Book)
+Catalog.register(PaperBook, pages='q')
+Catalog.register(AudioBook, duration='d')
+Catalog.register(FrozenBook)
+Catalog.register(FrozenPaperBook, pages='q')
+Catalog.register(FrozenAudioBook, duration='d')
+
+
+def benchmark(sizes: Iterable[int] = (10 ** 5, 10 ** 6), repeats: int = 5) -> None:
+    """
+    Сравнивает время ответа на вопросы "сколько всего страниц у бумажных книг" и "сколько длятся аудиокниги
+    в сумме" перебором смешанного списка и через Catalog
+
+    :param sizes: Количество книг
+    :param repeats: Количество повторов замера
+    :return: None
+    """
+    rng = random.Random(0)
+    for size in sizes:
+        books = [PaperBook(f"Книга {index}", "Автор", rng.randint(1, 1000)) if rng.random() < 0.5
+                 else AudioBook(f"Книга {index}", "Автор", rng.uniform(1, 100)) for index in range(size)]
+        catalog = Catalog(books)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            scan = (sum(book.pages for book in books if isinstance(book, PaperBook)),
+                    math.fsum(book.duration for book in books if isinstance(book, AudioBook)))
+        scan_time = (time.perf_counter() - start) / repeats
+        start = time.perf_counter()
+        for _ in range(repeats):
+            columns = (catalog.total('pages'), catalog.total('duration'))
+        catalog_time = (time.perf_counter() - start) / repeats
+        assert scan == columns
+        start = time.perf_counter()
+        selected = catalog.select('pages', 100, 200)
+        select_time = time.perf_counter() - start
+        print(f"{size:>8} книг: перебор {scan_time * 1e3:7.1f} мс, Catalog {catalog_time * 1e3:6.2f} мс, "
+              f"select {len(selected)} книг {select_time * 1e3:6.1f} мс")
+
+
+if __name__ == '__main__':
+    catalog = Catalog([
+        PaperBook('У лукоморья', 'Пушкин', 26),
+        PaperBook('Сказка о рыбаке и рыбке', 'Пушкин', 8),
+        AudioBook('Пиковая дама', 'Пушкин', 120.5),
+        AudioBook('Герой нашего времени', 'Лермонтов', 54.97),
+        FrozenPaperBook('Руслан и Людмила', 'Пушкин', 120),
+    ])
+    print(catalog.total('pages'), catalog.total('pages', PaperBook), catalog.mean('duration'))
+    print(catalog.count(PaperBook), catalog.count(FrozenBook))  # FrozenPaperBook входит в оба фильтра
+    print(catalog.histogram('pages', [0, 10, 100, 1000]))
+    print(catalog.select('duration', 50, 100))
+    catalog.select('pages', 10, math.inf)[0].pages = 300  # колонка pages раздела PaperBook сбрасывается
+    print(catalog.total('pages', PaperBook), catalog.select('pages', -math.inf, 10), end='\n\n')
+
+    benchmark()
@@ -0,0 +1,214 @@
+import random
+import sys
+import time
+import tracemalloc
+
+from main import AudioBook, Book, PaperBook
+
+
+class FrozenBook:
+    """
+    Неизменяемая книга. Атрибуты хранятся в __slots__, строка автора интернируется (повторяющиеся авторы
+    хранятся в памяти один раз), хэш вычисляется при создании, а str и repr - при первом обращении.
+    Проверки значений такие же, как у Book.
+    """
+    __slots__ = ('_name', '_author', '_hash', '_str', '_repr')
+    _mutable = Book
+    _fields = ('name', 'author')
+
+    def __init__(self, name: str, author: str):
+        Book._schema.validate(name, author)
+        self._freeze(name, author)
+
+    def _freeze(self, name: str, author: str, *values) -> None:
+        set_attribute = object.__setattr__
+        set_attribute(self, '_name', name)
+        set_attribute(self, '_author', sys.intern(author))
+        set_attribute(self, '_str', None)
+        set_attribute(self, '_repr', None)
+        for field, value in zip(self._fields[2:], values):
+            set_attribute(self, '_' + field, value)
+        set_attribute(self, '_hash', hash(self._key()))
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def author(self):
+        return self._author
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Ошибка. Объект {self.__class__.__name__} нельзя изменить")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Ошибка. Объект {self.__class__.__name__} нельзя изменить")
+
+    def _key(self) -> tuple:
+        return (self._name, self._author)
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._hash == other._hash and self._key() == other._key()
+
+    def __reduce__(self):
+        return self.__class__, self._key()
+
+    def _make_str(self) -> str:
+        return f"Книга {self._name!r}. Автор {self._author!r}."
+
+    def _make_repr(self) -> str:
+        return f"{self.__class__.__name__}(name={self._name!r}, author={self._author!r})"
+
+    def __str__(self):
+        if self._str is None:
+            object.__setattr__(self, '_str', self._make_str())
+        return self._str
+
+    def __repr__(self):
+        if self._repr is None:
+            object.__setattr__(self, '_repr', self._make_repr())
+        return self._repr
+
+    def to_book(self) -> Book:
+        """ Создаёт изменяемую книгу соответствующего класса из main. """
+        return self._mutable(*self._key())
+
+
+class FrozenPaperBook(FrozenBook):
+    __slots__ = ('_pages',)
+    _mutable = PaperBook
+    _fields = ('name', 'author', 'pages')
+
+    def __init__(self, name: str, author: str, pages: int):
+        PaperBook._schema.validate(name, author, pages)
+        self._freeze(name, author, pages)
+
+    @property
+    def pages(self):
+        return self._pages
+
+    def _key(self) -> tuple:
+        return (self._name, self._author, self._pages)
+
+    def _make_str(self) -> str:
+        return f"Бумажная книга {self._name!r}. Автор {self._author!r}. Количество страниц {self._pages}."
+
+    def _make_repr(self) -> str:
+        return f"{self.__class__.__name__}(name={self._name!r}, author={self._author!r}, pages={self._pages})"
+
+
+class FrozenAudioBook(FrozenBook):
+    __slots__ = ('_duration',)
+    _mutable = AudioBook
+    _fields = ('name', 'author', 'duration')
+
+    def __init__(self, name: str, author: str, duration: float):
+        AudioBook._schema.validate(name, author, duration)
+        self._freeze(name, author, duration)
+
+    @property
+    def duration(self):
+        return self._duration
+
+    def _key(self) -> tuple:
+        return (self._name, self._author, self._duration)
+
+    def _make_str(self) -> str:
+        return (f"Аудиокнига {self._name!r}. Автор {self._author!r}. "
+                f"Длительность {round(self._duration, 2)}.")
+
+    def _make_repr(self) -> str:
+        return (f"{self.__class__.__name__}(name={self._name!r}, author={self._author!r}, "
+                f"duration={round(self._duration, 2)})")
+
+
+FROZEN_CLASSES = {Book: FrozenBook, PaperBook: FrozenPaperBook, AudioBook: FrozenAudioBook}
+
+
+def mutable_class(book_class: type) -> type:
+    """
+    Возвращает класс из main, которому соответствует класс книги: для неизменяемых книг - их изменяемый вариант,
+    для остальных классов - сам класс. Нужен фильтрам по классу, чтобы (PaperBook,) находил и FrozenPaperBook
+
+    :param book_class: Класс книги
+    :return: Класс из main или сам book_class
+    """
+    return book_class._mutable if issubclass(book_class, FrozenBook) else book_class
+
+
+def freeze(book: Book) -> FrozenBook:
+    """
+    Создаёт неизменяемую копию книги из main
+
+    :param book: Объект Book, PaperBook или AudioBook
+    :return: Неизменяемая книга соответствующего класса
+    """
+    frozen_class = FROZEN_CLASSES.get(type(book))
+    if frozen_class is None:
+        raise TypeError("Ошибка. book должен быть объектом класса Book, PaperBook или AudioBook")
+    return frozen_class(*[getattr(book, field) for field in frozen_class._fields])
+
+
+def measure(size: int, authors: int = 1000) -> None:
+    """
+    Сравнивает память и время удаления дубликатов для смешанного каталога из изменяемых книг (ключ - кортеж
+    полей, как пришлось бы делать без __hash__) и из неизменяемых книг
+
+    :param size: Количество книг
+    :param authors: Количество различных авторов
+    :return: None
+    """
+    rng = random.Random(0)
+    # Половина строк каталога - повторы. Автор приходит номером и превращается в строку при разборе строки,
+    # как при чтении из файла, поэтому у изменяемых книг одинаковые авторы - разные объекты str
+    specs = [(f"Книга {index}", rng.randrange(authors), rng.randint(1, 1000), rng.random() < 0.5)
+             for index in range(size // 2)]
+    rows = rng.choices(specs, k=size)
+
+    def make_book(row):
+        if row[3]:
+            return PaperBook(row[0], f"Автор {row[1]}", row[2])
+        return AudioBook(row[0], f"Автор {row[1]}", row[2] / 10)
+
+    def make_frozen(row):
+        if row[3]:
+            return FrozenPaperBook(row[0], f"Автор {row[1]}", row[2])
+        return FrozenAudioBook(row[0], f"Автор {row[1]}", row[2] / 10)
+
+    def unique_books(books):
+        return {(type(book), book.name, book.author, getattr(book, 'pages', None),
+                 getattr(book, 'duration', None)): book for book in books}
+
+    for title, make, unique in (("main", make_book, unique_books), ("frozen", make_frozen, set)):
+        tracemalloc.start()
+        books = [make(row) for row in rows]
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        start = time.perf_counter()
+        unique_count = len(unique(books))
+        elapsed = time.perf_counter() - start
+        print(f"{title:>6}: {memory / size:6.1f} байт/книга, удаление дубликатов {elapsed * 1e3:7.1f} мс, "
+              f"уникальных {unique_count}")
+
+
+if __name__ == '__main__':
+    paper = FrozenPaperBook('У лукоморья', 'Пушкин', 26)
+    print(paper)
+    print(repr(paper))
+    print(paper == freeze(PaperBook('У лукоморья', 'Пушкин', 26)),
+          len({paper, FrozenPaperBook('У лукоморья', 'Пушкин', 26)}))
+    try:
+        paper.pages = 30
+    except AttributeError as error:
+        print(error)
+    print(repr(freeze(AudioBook('Герой нашего времени', 'Лермонтов', 54.97)).to_book()) + '\n')
+
+    for books_count in (10 ** 5, 10 ** 6):
+        measure(books_count)
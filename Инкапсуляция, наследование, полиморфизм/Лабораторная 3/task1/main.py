@@ -1,13 +1,34 @@
+from typing import Iterable, Sequence
+
+import weakref
+
+from schema import Check, Field, Schema
+
+
 class Book:
     """ Базовый класс книги. """
-    def __init__(self, name: str, author: str):
-        if not isinstance(name, str):
-            raise TypeError("Ошибка. name должен быть str")
-        self.__name = name
+    observers = weakref.WeakSet()  # Объекты с методом book_changed(book, field), например Catalog
+    _schema = Schema(
+        Field('name', str, "Ошибка. name должен быть str", attribute='_Book__name'),
+        Field('author', str, "Ошибка. author должен быть str", attribute='_Book__author'),
+    )
 
-        if not isinstance(author, str):
-            raise TypeError("Ошибка. author должен быть str")
-        self.__author = author
+    def __init__(self, name: str, author: str):
+        Book._schema.init(self, name, author)  # self._schema у наследников описывает больше полей
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence]) -> list["Book"]:
+        """
+        Создаёт книги класса cls из строк со значениями аргументов __init__. Строки проверяются по столбцам
+        схемой класса, после чего объекты создаются без повторных проверок, без вызова __init__ и сеттеров:
+        схема наследника должна повторять проверки его сеттеров
+        """
+        return cls._schema.from_rows(cls, rows)
+
+    def _notify(self, field: str) -> None:
+        """ Сообщает подписчикам observers, что числовое поле field уже созданной книги изменилось. """
+        for observer in list(Book.observers):
+            observer.book_changed(self, field)
 
     @property
     def name(self):
@@ -25,6 +46,13 @@ class Book:
 
 
 class PaperBook(Book):
+    _schema = Schema(
+        *Book._schema.fields,
+        Field('pages', int, "Ошибка. pages должен быть int", [
+            Check('pages <= 0', ValueError, "Ошибка. pages должен быть больше 0"),
+        ], attribute='_PaperBook__pages'),
+    )
+
     def __init__(self, name: str, author: str, pages: int):
         super().__init__(name, author)
         self.pages = pages
@@ -39,7 +67,10 @@ class PaperBook(Book):
             raise TypeError("Ошибка. pages должен быть int")
         if pages <= 0:
             raise ValueError("Ошибка. pages должен быть больше 0")
+        initialized = '_PaperBook__pages' in vars(self)
         self.__pages = pages
+        if initialized:  # присваивание в __init__ подписчикам не сообщается: книги ещё нет ни в одном каталоге
+            self._notify('pages')
 
     def __str__(self):
         return "Бумажная к" + super().__str__()[1:] + f" Количество страниц {self.pages}."
@@ -49,6 +80,13 @@ class PaperBook(Book):
 
 
 class AudioBook(Book):
+    _schema = Schema(
+        *Book._schema.fields,
+        Field('duration', float, "Ошибка. duration должен быть float", [
+            Check('duration <= 0', ValueError, "Ошибка. duration должен быть больше 0"),
+        ], attribute='_AudioBook__duration'),
+    )
+
     def __init__(self, name: str, author: str, duration: float):
         super().__init__(name, author)
         self.duration = duration
@@ -63,7 +101,10 @@ class AudioBook(Book):
             raise TypeError("Ошибка. duration должен быть float")
         if duration <= 0:
             raise ValueError("Ошибка. duration должен быть больше 0")
+        initialized = '_AudioBook__duration' in vars(self)
         self.__duration = duration
+        if initialized:
+            self._notify('duration')
 
     def __str__(self):
         # Перегрузка без обращения через super к методу родительского класса
@@ -85,4 +126,6 @@ if __name__ == '__main__':
 
     audio = AudioBook('Герой нашего времени', 'Лермонтов', 54.97)
     print(audio)
-    print(repr(audio))
+    print(repr(audio) + '\n')
+
+    print(PaperBook.from_rows([('Сказка о рыбаке и рыбке', 'Пушкин', 8), ('Руслан и Людмила', 'Пушкин', 120)]))
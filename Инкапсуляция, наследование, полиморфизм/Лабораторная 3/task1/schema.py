@@ -0,0 +1,168 @@
+"""
+Компилируемые описания полей классов лабораторных.
+
+Копия модуля лежит в папке каждой лабораторной, которая его использует, чтобы папки оставались самостоятельными.
+Копии должны совпадать байт в байт: python tools/lab_loader.py проверяет это.
+"""
+from typing import Any, Iterable, Optional, Sequence, Union
+
+
+class Check:
+    def __init__(self, condition: str, error: type, message: str):
+        """
+        Инициализация правила проверки поля
+
+        :param condition: Выражение Python над именами полей и контекста, истинное для ошибочного значения
+        :param error: Класс исключения
+        :param message: Сообщение об ошибке. Может содержать подстановки {имя_поля}
+        """
+        self.condition = condition
+        self.error = error
+        self.message = message
+
+
+class Field:
+    def __init__(self, name: str, types: Union[type, tuple[type, ...]], type_message: str,
+                 checks: Sequence[Check] = (), attribute: Optional[str] = None):
+        """
+        Инициализация описания поля
+
+        :param name: Имя аргумента конструктора
+        :param types: Допустимый тип или кортеж типов
+        :param type_message: Сообщение TypeError для значения неподходящего типа
+        :param checks: Правила проверки значения, выполняемые после проверки типа
+        :param attribute: Имя атрибута объекта. По умолчанию совпадает с name
+        """
+        self.name = name
+        self.types = types
+        self.type_message = type_message
+        self.checks = tuple(checks)
+        self.attribute = attribute or name
+
+
+class Schema:
+    """
+    Декларативное описание полей класса. По описанию один раз генерируется исходный код специализированных
+    функций, которые затем компилируются:
+
+    - validate(*values, *context) - все проверки полей подряд, в порядке полей;
+    - init(obj, *values, *context) - проверки и присваивание атрибутов, для использования в __init__;
+    - validate_columns(*columns, *context) - проверки целых столбцов партии строк;
+    - build(cls, rows) - создание объектов из уже проверенных строк без повторных проверок.
+
+    context - имена дополнительных значений, доступных в условиях проверок (например, снимок базы данных).
+    """
+    def __init__(self, *fields: Field, context: Sequence[str] = ()):
+        self.fields = fields
+        self.context = tuple(context)
+        self._namespace: dict[str, Any] = {}
+        names = [field.name for field in fields]
+        context_arguments = "".join(f", {name}" for name in self.context)
+        arguments = ", ".join(names) + context_arguments
+        format_arguments = ", ".join(f"{name}={name}" for name in names + list(self.context))
+
+        checks = []
+        for field_index, field in enumerate(fields):
+            checks.append(self._field_checks(field_index, field, format_arguments))
+        checks = [line for field_lines in checks for line in field_lines]
+        assignments = [f"    obj.{field.attribute} = {field.name}" for field in fields]
+
+        column_names = [f"_column_{index}" for index in range(len(fields))]
+        column_checks = []
+        for field_index, field in enumerate(fields):
+            # Проверка типов столбца целиком: если все типы значений перечислены в описании поля, цикла нет.
+            # Иначе (например, подклассы) столбец проходится isinstance, как в конструкторе
+            prefix, column = f"_{field_index}", column_names[field_index]
+            self._namespace[f"{prefix}_exact_types"] = frozenset(
+                field.types if isinstance(field.types, tuple) else (field.types,))
+            field_lines = self._field_checks(field_index, field, format_arguments)
+            column_checks.extend([
+                f"    if not {prefix}_exact_types.issuperset(map(type, {column})):",
+                f"        for {field.name} in {column}:",
+                *("        " + line for line in field_lines[:2]),
+            ])
+            if not field.checks:
+                continue
+            dependencies = self._dependencies(field, names)
+            if dependencies:
+                loop_names = [field.name] + dependencies
+                loop_columns = [column_names[names.index(name)] for name in loop_names]
+                column_checks.append(f"    for {', '.join(loop_names)}, in zip({', '.join(loop_columns)}):")
+            else:
+                column_checks.append(f"    for {field.name} in {column}:")
+            column_checks.extend("    " + line for line in field_lines[2:])
+
+        source = "\n".join([
+            f"def validate({arguments}):",
+            *checks,
+            "    return None",
+            f"def init(obj, {arguments}):",
+            *checks,
+            *assignments,
+            f"def validate_columns({', '.join(column_names)}{context_arguments}):",
+            *column_checks,
+            "    return None",
+            "def build(cls, rows):",
+            "    new = cls.__new__",
+            "    objects = []",
+            "    append = objects.append",
+            f"    for {', '.join(names)}, in rows:",
+            "        obj = new(cls)",
+            *("    " + line for line in assignments),
+            "        append(obj)",
+            "    return objects",
+        ])
+        exec(compile(source, f"<schema {', '.join(names)}>", "exec"), self._namespace)
+        self.source = source
+        self.validate = self._namespace["validate"]
+        self.init = self._namespace["init"]
+        self.validate_columns = self._namespace["validate_columns"]
+        self.build = self._namespace["build"]
+
+    @staticmethod
+    def _dependencies(field: Field, names: list[str]) -> list[str]:
+        used = set()
+        for check in field.checks:
+            used.update(compile(check.condition, "<check>", "eval").co_names)
+        return [name for name in names if name in used and name != field.name]
+
+    def _field_checks(self, field_index: int, field: Field, format_arguments: str) -> list[str]:
+        prefix = f"_{field_index}"
+        self._namespace[f"{prefix}_types"] = field.types
+        self._namespace[f"{prefix}_type_message"] = field.type_message
+        lines = [
+            f"    if not isinstance({field.name}, {prefix}_types):",
+            f"        raise TypeError({prefix}_type_message)",
+        ]
+        for check_index, check in enumerate(field.checks):
+            error, message = f"{prefix}_error_{check_index}", f"{prefix}_message_{check_index}"
+            self._namespace[error] = check.error
+            self._namespace[message] = check.message
+            formatted = f"{message}.format({format_arguments})" if "{" in check.message else message
+            lines.append(f"    if {check.condition}:")
+            lines.append(f"        raise {error}({formatted})")
+        return lines
+
+    def from_rows(self, cls: type, rows: Iterable[Sequence], *context: Any,
+                  attributes: Optional[dict[str, Any]] = None) -> list:
+        """
+        Метод проверяет партию строк по столбцам и создаёт объекты без повторных проверок каждого поля.
+        Сообщения об ошибках совпадают с сообщениями конструктора
+
+        :param cls: Класс создаваемых объектов
+        :param rows: Строки - последовательности значений в порядке полей
+        :param context: Значения контекста в порядке Schema.context
+        :param attributes: Атрибуты, одинаковые для всех созданных объектов
+        :return: Список объектов
+        """
+        rows = rows if isinstance(rows, list) else list(rows)
+        for row in rows:
+            if len(row) != len(self.fields):
+                raise ValueError(f"Ошибка. Строка должна содержать {len(self.fields)} значений")
+        columns = list(zip(*rows)) if rows else [()] * len(self.fields)
+        self.validate_columns(*columns, *context)
+        objects = self.build(cls, rows)
+        if attributes:
+            for obj in objects:
+                obj.__dict__.update(attributes)
+        return objects
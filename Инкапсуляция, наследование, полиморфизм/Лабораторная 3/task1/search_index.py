@@ -0,0 +1,268 @@
+from heapq import heapify, heappop, nsmallest
+from typing import Iterable, Optional, Union
+
+import random
+import time
+
+from frozen_books import FrozenBook, FrozenPaperBook, mutable_class
+from main import AudioBook, Book, PaperBook
+
+
+FIELDS = ('name', 'author')
+GRAM = 3
+
+
+def normalize(text: str) -> str:
+    return text.casefold()
+
+
+def grams(value: str) -> set[str]:
+    return {value[index:index + GRAM] for index in range(len(value) - GRAM + 1)}
+
+
+def word_prefixes(value: str) -> set[str]:
+    return {word[:length] for word in value.split() for length in range(1, GRAM)}
+
+
+class _FieldIndex:
+    """
+    Индекс одного поля. Значения нормализуются, и каждое различное значение индексируется один раз: многие книги
+    одного автора дают одну запись в индексе триграмм и одно множество идентификаторов книг.
+    """
+    def __init__(self):
+        self.books: dict[str, set[int]] = {}  # нормализованное значение -> идентификаторы книг
+        self.grams: dict[str, set[str]] = {}  # триграмма -> значения, в которых она встречается
+        self.prefixes: dict[str, set[str]] = {}  # первые 1-2 символа слова -> значения
+
+    def add(self, value: str, book_id: int) -> None:
+        ids = self.books.get(value)
+        if ids is not None:
+            ids.add(book_id)
+            return
+        self.books[value] = {book_id}
+        for key in grams(value):
+            self.grams.setdefault(key, set()).add(value)
+        for key in word_prefixes(value):
+            self.prefixes.setdefault(key, set()).add(value)
+
+    def remove(self, value: str, book_id: int) -> None:
+        ids = self.books[value]
+        ids.discard(book_id)
+        if ids:
+            return
+        del self.books[value]
+        for index, keys in ((self.grams, grams(value)), (self.prefixes, word_prefixes(value))):
+            for key in keys:
+                values = index[key]
+                values.discard(value)
+                if not values:
+                    del index[key]
+
+    def match(self, query: str) -> set[str]:
+        if len(query) < GRAM:
+            return self.prefixes.get(query, set())
+        postings = []
+        for key in grams(query):
+            values = self.grams.get(key)
+            if values is None:
+                return set()
+            postings.append(values)
+        postings.sort(key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        if len(query) == GRAM:
+            return candidates
+        # Все триграммы запроса есть в значении, но подряд ли они идут - проверяется подстрокой
+        return {value for value in candidates if query in value}
+
+
+class SearchIndex:
+    """
+    Поиск книг по фрагменту названия или автора: инвертированный индекс триграмм для фрагментов от трёх символов
+    и индекс начал слов для запросов из одного-двух символов. Поддерживает добавление и удаление книг, фильтр по
+    классу книги и выдачу k лучших результатов.
+
+    Результаты ранжируются по совпавшему значению поля: полное совпадение, затем начало значения, затем начало
+    слова, затем любая подстрока; при равенстве название важнее автора, а короткое значение - длинного.
+    """
+    def __init__(self, books: Optional[Iterable[Union[Book, FrozenBook]]] = None):
+        self._books: dict[int, Union[Book, FrozenBook]] = {}
+        self._keys: dict[int, tuple[str, str]] = {}  # нормализованные значения на момент добавления
+        self._by_type: dict[type, set[int]] = {}
+        self._fields = {field: _FieldIndex() for field in FIELDS}
+        self._next_id = 1
+        if books is not None:
+            for book in books:
+                self.add(book)
+
+    def __len__(self) -> int:
+        return len(self._books)
+
+    def __getitem__(self, book_id: int) -> Union[Book, FrozenBook]:
+        return self._books[book_id]
+
+    def add(self, book: Union[Book, FrozenBook]) -> int:
+        """
+        Добавляет книгу в индекс
+
+        :param book: Объект Book, PaperBook, AudioBook или их неизменяемый вариант из frozen_books
+        :return: Идентификатор книги в индексе
+        """
+        if not isinstance(book, (Book, FrozenBook)):
+            raise TypeError("Ошибка. book должен быть объектом класса Book или FrozenBook")
+        book_id = self._next_id
+        self._next_id += 1
+        keys = (normalize(book.name), normalize(book.author))
+        self._books[book_id] = book
+        self._keys[book_id] = keys
+        self._by_type.setdefault(type(book), set()).add(book_id)
+        for field, value in zip(FIELDS, keys):
+            self._fields[field].add(value, book_id)
+        return book_id
+
+    def remove(self, book_id: int) -> None:
+        """
+        Удаляет книгу из индекса
+
+        :param book_id: Идентификатор книги, который вернул add
+        :return: None
+        """
+        book = self._books.pop(book_id, None)
+        if book is None:
+            raise KeyError("Ошибка. Книги с таким идентификатором нет в индексе")
+        keys = self._keys.pop(book_id)
+        ids = self._by_type[type(book)]
+        ids.discard(book_id)
+        if not ids:
+            del self._by_type[type(book)]
+        for field, value in zip(FIELDS, keys):
+            self._fields[field].remove(value, book_id)
+
+    def _allowed(self, types: Optional[Iterable[type]]) -> Optional[list[set[int]]]:
+        if types is None:
+            return None
+        types = tuple(types)
+        return [ids for book_type, ids in self._by_type.items()
+                if issubclass(book_type, types) or issubclass(mutable_class(book_type), types)]
+
+    def search(self, query: str, k: int = 10, field: Optional[str] = None,
+               types: Optional[Iterable[type]] = None) -> list[Union[Book, FrozenBook]]:
+        """
+        Ищет книги, в названии или авторе которых есть фрагмент query (без учёта регистра)
+
+        :param query: Фрагмент. Запрос из одного-двух символов ищется только в начале слов
+        :param k: Количество лучших результатов
+        :param field: 'name' или 'author', по умолчанию - оба поля
+        :param types: Классы книг, например (PaperBook,) - вместе с FrozenPaperBook; по умолчанию - все книги
+        :return: До k книг в порядке убывания релевантности
+        """
+        if not isinstance(query, str):
+            raise TypeError("Ошибка. query должен быть str")
+        if not isinstance(k, int) or k <= 0:
+            raise ValueError("Ошибка. k должен быть целым положительным числом")
+        if field is not None and field not in FIELDS:
+            raise ValueError(f"Ошибка. field должен быть одним из {FIELDS}")
+        query = normalize(query).strip()
+        if not query:
+            return []
+        allowed = self._allowed(types)
+
+        # Сортируются различные совпавшие значения, а не книги: куча разбирается, пока не набрано k книг
+        heap = []
+        for weight, name in enumerate(FIELDS):
+            if field is not None and name != field:
+                continue
+            index = self._fields[name]
+            for value in index.match(query):
+                if value == query:
+                    rank = 0
+                elif value.startswith(query):
+                    rank = 1
+                elif f" {query}" in value:
+                    rank = 2
+                else:
+                    rank = 3
+                heap.append((rank, weight, len(value), value, name))
+        heapify(heap)
+
+        found: list[int] = []
+        seen = set()
+        while heap and len(found) < k:
+            *_, value, name = heappop(heap)
+            ids = self._fields[name].books[value]
+            if allowed is not None:
+                # Пересечение стоит O(len(ids)), множества классов целиком не объединяются
+                ids = set().union(*[ids & type_ids for type_ids in allowed])
+            # Из множества книг одного значения нужны только наименьшие идентификаторы
+            for book_id in nsmallest(k + len(seen), ids) if len(ids) > k else sorted(ids):
+                if book_id not in seen:
+                    seen.add(book_id)
+                    found.append(book_id)
+                    if len(found) == k:
+                        break
+        return [self._books[book_id] for book_id in found]
+
+
+def benchmark(sizes: Iterable[int] = (10 ** 5, 10 ** 6), queries: int = 1000) -> None:
+    """
+    Сравнивает время поиска по фрагменту названия или автора перебором списка и через SearchIndex
+
+    :param sizes: Количество книг
+    :param queries: Количество запросов в замере
+    :return: None
+    """
+    rng = random.Random(0)
+    syllables = [consonant + vowel for consonant in 'бвгдзклмнпрстфхцчш' for vowel in 'аеиоуыяю']
+    for size in sizes:
+        authors = [''.join(rng.choices(syllables, k=4)).capitalize() for _ in range(max(size // 200, 10))]
+        words = [''.join(rng.choices(syllables, k=rng.randint(2, 5))) for _ in range(max(size // 10, 100))]
+        books = []
+        for _ in range(size):
+            name, author = ' '.join(rng.choices(words, k=3)).capitalize(), rng.choice(authors)
+            books.append(FrozenPaperBook(name, author, rng.randint(1, 1000)) if rng.random() < 0.5
+                         else AudioBook(name, author, rng.uniform(1, 100)))
+        start = time.perf_counter()
+        index = SearchIndex(books)
+        build_time = time.perf_counter() - start
+
+        fragments = []
+        for book in rng.sample(books, queries):
+            value = book.name if rng.random() < 0.7 else book.author
+            length = rng.randint(4, 8)
+            position = rng.randrange(max(len(value) - length, 1))
+            fragments.append(value[position:position + length])
+
+        start = time.perf_counter()
+        for fragment in fragments[:10]:
+            fragment = normalize(fragment)
+            [book for book in books if fragment in normalize(book.name) or fragment in normalize(book.author)]
+        scan_time = (time.perf_counter() - start) / 10
+        start = time.perf_counter()
+        for fragment in fragments:
+            index.search(fragment, k=10)
+        index_time = (time.perf_counter() - start) / queries
+        start = time.perf_counter()
+        for fragment in fragments:
+            index.search(fragment, k=10, types=(AudioBook,))
+        filtered_time = (time.perf_counter() - start) / queries
+        print(f"{size:>8} книг: построение {build_time:5.1f} с, перебор {scan_time * 1e3:8.1f} мс, "
+              f"SearchIndex {index_time * 1e3:6.3f} мс, с фильтром AudioBook {filtered_time * 1e3:6.3f} мс")
+
+
+if __name__ == '__main__':
+    catalog = SearchIndex([
+        PaperBook('У лукоморья', 'Пушкин', 26),
+        PaperBook('Сказка о рыбаке и рыбке', 'Пушкин', 8),
+        AudioBook('Пиковая дама', 'Пушкин', 120.5),
+        AudioBook('Герой нашего времени', 'Лермонтов', 54.97),
+    ])
+    print(catalog.search('пушкин', k=2))
+    print(catalog.search('ры', types=(PaperBook,)))
+    catalog.add(FrozenPaperBook('Руслан и Людмила', 'Пушкин', 120))
+    print(catalog.search('ру', types=(PaperBook,)))  # неизменяемая бумажная книга тоже проходит фильтр
+    print(catalog.search('мон', field='author'))
+    audio_id = catalog.add(AudioBook('Евгений Онегин', 'Пушкин', 300.0))
+    print(catalog.search('онег'))
+    catalog.remove(audio_id)
+    print(catalog.search('онег'), end='\n\n')
+
+    benchmark()
@@ -0,0 +1,258 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Union
+
+import doctest
+import os
+import random
+import time
+
+from main import GameCharacter
+
+
+Template = tuple[str, Union[int, float], Union[int, float], Union[int, float]]
+
+
+class UniformDamage:
+    """ Урон, равномерно распределённый на отрезке [low, high]. """
+    def __init__(self, low: Union[int, float], high: Union[int, float]):
+        """
+        Инициализация равномерного распределения урона
+
+        :param low: Минимальный урон
+        :param high: Максимальный урон
+
+        Примеры:
+        >>> damage = UniformDamage(5, 15)
+        >>> damage = UniformDamage(0, 15)
+        Traceback (most recent call last):
+        ValueError: Ошибка. low должен быть строго положительным и не больше high
+        """
+        if not isinstance(low, (int, float)) or not isinstance(high, (int, float)):
+            raise TypeError("Ошибка. low и high должны быть int или float")
+        if not 0 < low <= high:
+            raise ValueError("Ошибка. low должен быть строго положительным и не больше high")
+        self.low = low
+        self.high = high
+
+    def sample(self, rng: random.Random) -> float:
+        return rng.uniform(self.low, self.high)
+
+
+class NormalDamage:
+    """ Нормально распределённый урон, ограниченный снизу значением minimum, чтобы урон оставался положительным. """
+    def __init__(self, mean: Union[int, float], sigma: Union[int, float], minimum: Union[int, float] = 0.01):
+        """
+        Инициализация нормального распределения урона
+
+        :param mean: Средний урон
+        :param sigma: Стандартное отклонение урона
+        :param minimum: Минимальный урон
+
+        Примеры:
+        >>> damage = NormalDamage(10, 3)
+        >>> damage = NormalDamage(10, -3)
+        Traceback (most recent call last):
+        ValueError: Ошибка. sigma должен быть больше либо равен нулю, minimum - строго положительным
+        """
+        if not all(isinstance(value, (int, float)) for value in (mean, sigma, minimum)):
+            raise TypeError("Ошибка. mean, sigma и minimum должны быть int или float")
+        if sigma < 0 or minimum <= 0:
+            raise ValueError("Ошибка. sigma должен быть больше либо равен нулю, minimum - строго положительным")
+        self.mean = mean
+        self.sigma = sigma
+        self.minimum = minimum
+
+    def sample(self, rng: random.Random) -> float:
+        return max(self.minimum, rng.gauss(self.mean, self.sigma))
+
+
+Damage = Union[UniformDamage, NormalDamage]
+
+
+class BattleStats:
+    """ Сводная статистика серии боёв двух персонажей. Статистики отдельных частей складываются методом merge. """
+    def __init__(self):
+        self.fights = 0
+        self.wins = [0, 0]
+        self.draws = 0
+        self.timeouts = 0
+        self.deaths = [0, 0]
+        self.death_turns = [0, 0]
+        self.min_death_turn: list[Optional[int]] = [None, None]
+        self.max_death_turn: list[Optional[int]] = [None, None]
+
+    def record(self, first_died_at: Optional[int], second_died_at: Optional[int]) -> None:
+        """
+        Метод учитывает результат одного боя
+
+        :param first_died_at: Ход гибели первого персонажа или None, если он выжил
+        :param second_died_at: Ход гибели второго персонажа или None, если он выжил
+        :return: None
+        """
+        self.fights += 1
+        for side, turn in enumerate((first_died_at, second_died_at)):
+            if turn is None:
+                continue
+            self.deaths[side] += 1
+            self.death_turns[side] += turn
+            if self.min_death_turn[side] is None or turn < self.min_death_turn[side]:
+                self.min_death_turn[side] = turn
+            if self.max_death_turn[side] is None or turn > self.max_death_turn[side]:
+                self.max_death_turn[side] = turn
+        if first_died_at is None and second_died_at is None:
+            self.timeouts += 1
+        elif first_died_at is not None and second_died_at is not None:
+            self.draws += 1
+        else:
+            self.wins[0 if first_died_at is None else 1] += 1
+
+    def merge(self, other: "BattleStats") -> None:
+        """
+        Метод добавляет к статистике результаты другой серии боёв
+
+        :param other: Статистика другой серии
+        :return: None
+        """
+        self.fights += other.fights
+        self.draws += other.draws
+        self.timeouts += other.timeouts
+        for side in (0, 1):
+            self.wins[side] += other.wins[side]
+            self.deaths[side] += other.deaths[side]
+            self.death_turns[side] += other.death_turns[side]
+            for own, theirs, pick in ((self.min_death_turn, other.min_death_turn, min),
+                                      (self.max_death_turn, other.max_death_turn, max)):
+                if theirs[side] is not None:
+                    own[side] = theirs[side] if own[side] is None else pick(own[side], theirs[side])
+
+    def survival_rate(self, side: int) -> float:
+        """
+        Метод возвращает долю боёв, в которых персонаж выжил
+
+        :param side: 0 - первый персонаж, 1 - второй
+        :return: Доля боёв от 0 до 1
+        """
+        return (self.fights - self.deaths[side]) / self.fights if self.fights else 0.0
+
+    def mean_time_to_death(self, side: int) -> Optional[float]:
+        """
+        Метод возвращает среднее количество ходов до гибели персонажа среди боёв, в которых он погиб
+
+        :param side: 0 - первый персонаж, 1 - второй
+        :return: Среднее количество ходов или None, если персонаж ни разу не погиб
+        """
+        return self.death_turns[side] / self.deaths[side] if self.deaths[side] else None
+
+
+def _template(character: Union[GameCharacter, Template]) -> Template:
+    if isinstance(character, GameCharacter):
+        return character.name, character.max_health, character.health, character.armor
+    GameCharacter(*character)  # проверяем шаблон теми же правилами, что и персонажа
+    return tuple(character)
+
+
+def simulate_fight(first: Template, second: Template, damage: Damage, rng: random.Random,
+                   max_turns: int) -> tuple[Optional[int], Optional[int]]:
+    """
+    Функция проводит один бой: каждый ход оба персонажа одновременно получают урон из распределения damage через
+    GameCharacter.take_damage, пока кто-то не погибнет или не закончатся ходы
+
+    :param first: Шаблон первого персонажа (name, max_health, health, armor)
+    :param second: Шаблон второго персонажа
+    :param damage: Распределение урона
+    :param rng: Генератор случайных чисел
+    :param max_turns: Максимальное количество ходов
+    :return: Ходы гибели первого и второго персонажа (None - выжил)
+
+    Примеры:
+    >>> simulate_fight(('Шарик', 100, 100, 0), ('Матроскин', 100, 50, 0), UniformDamage(10, 10), random.Random(1), 100)
+    (None, 5)
+    """
+    fighters = (GameCharacter(*first), GameCharacter(*second))
+    for turn in range(1, max_turns + 1):
+        for fighter in fighters:
+            fighter.take_damage(damage.sample(rng))
+        first_dead, second_dead = fighters[0].health == 0, fighters[1].health == 0
+        if first_dead or second_dead:
+            return (turn if first_dead else None), (turn if second_dead else None)
+    return None, None
+
+
+def _run_shard(first: Template, second: Template, damage: Damage, fights: int, seed: str,
+               max_turns: int) -> BattleStats:
+    rng = random.Random(seed)
+    stats = BattleStats()
+    for _ in range(fights):
+        stats.record(*simulate_fight(first, second, damage, rng, max_turns))
+    return stats
+
+
+def simulate_battles(first: Union[GameCharacter, Template], second: Union[GameCharacter, Template], damage: Damage,
+                     fights: int, workers: Optional[int] = None, seed: int = 0, shard_size: int = 10_000,
+                     max_turns: int = 1000) -> BattleStats:
+    """
+    Функция проводит серию независимых боёв, распределяя их частями по shard_size между процессами. Каждая часть
+    получает собственное зерно, зависящее только от seed и номера части, поэтому результат воспроизводим и не
+    зависит от количества процессов
+
+    :param first: Первый персонаж или его шаблон (name, max_health, health, armor)
+    :param second: Второй персонаж или его шаблон
+    :param damage: Распределение урона
+    :param fights: Количество боёв
+    :param workers: Количество процессов. По умолчанию - количество ядер, 1 - без пула процессов
+    :param seed: Зерно серии
+    :param shard_size: Количество боёв в одной части
+    :param max_turns: Максимальное количество ходов в бою
+    :return: Сводная статистика
+
+    Примеры:
+    >>> stats = simulate_battles(GameCharacter('Шарик', 100, 100, 10), ('Матроскин', 100, 100, 0),
+    ...                          UniformDamage(5, 15), fights=200, workers=1, seed=42, shard_size=50)
+    >>> stats.fights, stats.survival_rate(0) > stats.survival_rate(1)
+    (200, True)
+    >>> stats.wins == simulate_battles(GameCharacter('Шарик', 100, 100, 10), ('Матроскин', 100, 100, 0),
+    ...                                UniformDamage(5, 15), fights=200, workers=2, seed=42, shard_size=50).wins
+    True
+    """
+    for name, value in (("fights", fights), ("shard_size", shard_size), ("max_turns", max_turns)):
+        if not isinstance(value, int):
+            raise TypeError(f"Ошибка. {name} должен быть int")
+        if value <= 0:
+            raise ValueError(f"Ошибка. {name} должен быть строго положительным")
+    first, second = _template(first), _template(second)
+
+    shards = [min(shard_size, fights - start) for start in range(0, fights, shard_size)]
+    arguments = [(first, second, damage, count, f"{seed}:{index}", max_turns) for index, count in enumerate(shards)]
+
+    stats = BattleStats()
+    if workers == 1:
+        for shard_arguments in arguments:
+            stats.merge(_run_shard(*shard_arguments))
+        return stats
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for shard_stats in executor.map(_run_shard, *zip(*arguments)):
+            stats.merge(shard_stats)
+    return stats
+
+
+def benchmark(fights: int = 100_000) -> None:
+    """
+    Измеряет количество боёв в секунду при разном количестве процессов
+
+    :param fights: Количество боёв в каждом замере
+    :return: None
+    """
+    first, second, damage = ('Шарик', 100, 100, 10), ('Матроскин', 120, 120, 5), UniformDamage(5, 15)
+    workers_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    base = None
+    for workers in workers_counts:
+        start = time.perf_counter()
+        simulate_battles(first, second, damage, fights, workers=workers, shard_size=fights // 32 or 1)
+        throughput = fights / (time.perf_counter() - start)
+        base = base or throughput
+        print(f"{workers:>3} процессов: {throughput:>10.0f} боёв/с, ускорение {throughput / base:.2f}")
+
+
+if __name__ == "__main__":
+    doctest.testmod()
+    benchmark()
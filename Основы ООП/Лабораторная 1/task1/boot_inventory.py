@@ -0,0 +1,279 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Iterable, Iterator, Optional, Union
+
+import doctest
+import random
+import time
+
+from main import Boot
+
+
+INFINITY = float('inf')
+
+
+class BootInventory:
+    """
+    Склад ботинков с индексами. Для каждой пары (boot_type, color) хранится отсортированный список (size, id),
+    а для всего склада - общий отсортированный по размеру список, поэтому запросы по типу, цвету и диапазону
+    размеров выполняются двоичным поиском и стоят O(log n + размер результата).
+
+    Склад подписывается на Boot.observers и сам обновляет индексы, когда Boot.delta_size меняет размер ботинка
+    или Boot.remove_boot_type выводит тип из базы: ботинки выведенного типа убираются со склада. Прямое
+    присваивание boot.size склад не замечает: размер нужно менять через delta_size или после присваивания
+    вызвать update(boot).
+
+    add и перенос ботинка на новый размер вставляют запись в отсортированные списки со сдвигом хвоста - O(n),
+    но это один memmove; extend (и конструктор) добавляет партию и сортирует списки один раз.
+    """
+    def __init__(self, boots: Optional[Iterable[Boot]] = None):
+        """
+        Инициализация объекта "Склад ботинков"
+
+        :param boots: Последовательность объектов Boot
+
+        Примеры:
+        >>> inventory = BootInventory([Boot('кроссовки', 40, 'красный'), Boot('кеды', 38, 'синий')])
+        >>> len(inventory)
+        2
+        """
+        self._boots: dict[int, Boot] = {}
+        self._sizes: dict[int, Union[int, float]] = {}  # размер, под которым ботинок стоит в индексах
+        self._by_type_color: dict[tuple[str, str], list[tuple[Union[int, float], int]]] = {}
+        self._by_size: list[tuple[Union[int, float], int]] = []
+        Boot.add_observer(self)
+        if boots is not None:
+            self.extend(boots)
+
+    def __len__(self) -> int:
+        return len(self._boots)
+
+    def __contains__(self, boot: object) -> bool:
+        return id(boot) in self._boots
+
+    def __iter__(self) -> Iterator[Boot]:
+        return iter(list(self._boots.values()))
+
+    def add(self, boot: Boot) -> None:
+        """
+        Метод добавляет ботинок на склад
+
+        :param boot: Добавляемый ботинок
+        :return: None
+        """
+        self._check_new(boot)
+        self._boots[id(boot)] = boot
+        self._index(boot)
+
+    def extend(self, boots: Iterable[Boot]) -> None:
+        """
+        Метод добавляет на склад партию ботинков. Все ботинки проверяются до изменения склада, записи дописываются
+        в конец индексов, и каждый список сортируется один раз
+
+        :param boots: Последовательность объектов Boot
+        :return: None
+
+        Примеры:
+        >>> boot = Boot('кеды', 40, 'синий')
+        >>> inventory = BootInventory([Boot('кеды', 42, 'синий')])
+        >>> inventory.extend([boot, boot])
+        Traceback (most recent call last):
+        ValueError: Ошибка. Этот ботинок уже есть на складе
+        >>> inventory.extend([boot, Boot('кеды', 38, 'синий')])
+        >>> [boot.size for boot in inventory.query('кеды', 'синий')]
+        [38, 40, 42]
+        """
+        boots = list(boots)
+        added = set()
+        for boot in boots:
+            self._check_new(boot)
+            if id(boot) in added:
+                raise ValueError("Ошибка. Этот ботинок уже есть на складе")
+            added.add(id(boot))
+        buckets = set()
+        for boot in boots:
+            key = id(boot)
+            self._boots[key] = boot
+            self._sizes[key] = boot.size
+            entry = (boot.size, key)
+            bucket_key = (boot.boot_type, boot.color)
+            self._by_type_color.setdefault(bucket_key, []).append(entry)
+            buckets.add(bucket_key)
+            self._by_size.append(entry)
+        for bucket_key in buckets:
+            self._by_type_color[bucket_key].sort()
+        self._by_size.sort()
+
+    def _check_new(self, boot: Boot) -> None:
+        if not isinstance(boot, Boot):
+            raise TypeError("Ошибка. boot должен быть объектом класса Boot")
+        if id(boot) in self._boots:
+            raise ValueError("Ошибка. Этот ботинок уже есть на складе")
+
+    def _index(self, boot: Boot) -> None:
+        key = id(boot)
+        self._sizes[key] = boot.size
+        entry = (boot.size, key)
+        insort(self._by_type_color.setdefault((boot.boot_type, boot.color), []), entry)
+        insort(self._by_size, entry)
+
+    def remove(self, boot: Boot) -> None:
+        """
+        Метод убирает ботинок со склада
+
+        :param boot: Убираемый ботинок
+        :return: None
+
+        Примеры:
+        >>> boot = Boot('кроссовки', 40, 'красный')
+        >>> inventory = BootInventory([boot])
+        >>> inventory.remove(boot)
+        >>> inventory.remove(boot)
+        Traceback (most recent call last):
+        ValueError: Ошибка. Этого ботинка нет на складе
+        """
+        if id(boot) not in self._boots:
+            raise ValueError("Ошибка. Этого ботинка нет на складе")
+        del self._boots[id(boot)]
+        self._unindex(boot)
+
+    def _unindex(self, boot: Boot) -> None:
+        entry = (self._sizes.pop(id(boot)), id(boot))
+        key = (boot.boot_type, boot.color)
+        bucket = self._by_type_color[key]
+        del bucket[bisect_left(bucket, entry)]
+        if not bucket:
+            del self._by_type_color[key]
+        del self._by_size[bisect_left(self._by_size, entry)]
+
+    def boot_size_changed(self, boot: Boot, old_size: Union[int, float]) -> None:
+        """
+        Метод вызывается из Boot.delta_size и переносит ботинок в индексах на новый размер
+
+        :param boot: Ботинок, размер которого изменился
+        :param old_size: Прежний размер
+        :return: None
+
+        Примеры:
+        >>> boot = Boot('кроссовки', 40, 'красный')
+        >>> inventory = BootInventory([boot])
+        >>> boot.delta_size(10)
+        >>> inventory.query(min_size=45) == [boot]
+        True
+        """
+        self.update(boot)
+
+    def update(self, boot: Boot) -> None:
+        """
+        Метод переносит ботинок в индексах на его текущий размер. Нужен после прямого присваивания boot.size;
+        ботинок, которого нет на складе, пропускается
+
+        :param boot: Ботинок
+        :return: None
+
+        Примеры:
+        >>> boot = Boot('кроссовки', 40, 'красный')
+        >>> inventory = BootInventory([boot])
+        >>> boot.size = 20
+        >>> inventory.query(max_size=30)
+        []
+        >>> inventory.update(boot)
+        >>> inventory.query(max_size=30) == [boot]
+        True
+        """
+        if id(boot) not in self._boots or self._sizes[id(boot)] == boot.size:
+            return
+        self._unindex(boot)
+        self._index(boot)
+
+    def boot_type_removed(self, boot_type: str) -> None:
+        """
+        Метод вызывается из Boot.remove_boot_type и убирает со склада ботинки выведенного типа
+
+        :param boot_type: Выведенный тип обуви
+        :return: None
+
+        Примеры:
+        >>> Boot.add_boot_type('мокасины')
+        >>> inventory = BootInventory([Boot('мокасины', 40, 'синий'), Boot('кеды', 40, 'синий')])
+        >>> Boot.remove_boot_type('мокасины')
+        >>> [boot.boot_type for boot in inventory]
+        ['кеды']
+        """
+        retired_keys = [key for key in self._by_type_color if key[0] == boot_type]
+        if not retired_keys:
+            return
+        for key in retired_keys:
+            for _, boot_id in self._by_type_color.pop(key):
+                del self._boots[boot_id], self._sizes[boot_id]
+        self._by_size = [entry for entry in self._by_size if entry[1] in self._boots]
+
+    @staticmethod
+    def _size_range(entries: list, min_size: Optional[Union[int, float]],
+                    max_size: Optional[Union[int, float]]) -> list:
+        start = 0 if min_size is None else bisect_left(entries, (min_size, -1))
+        end = len(entries) if max_size is None else bisect_right(entries, (max_size, INFINITY))
+        return entries[start:end]
+
+    def query(self, boot_type: Optional[str] = None, color: Optional[str] = None,
+              min_size: Optional[Union[int, float]] = None, max_size: Optional[Union[int, float]] = None) -> list[Boot]:
+        """
+        Метод возвращает ботинки с указанными типом и цветом в диапазоне размеров [min_size, max_size],
+        упорядоченные по размеру. Не заданный параметр не ограничивает выборку
+
+        :param boot_type: Тип обуви
+        :param color: Цвет
+        :param min_size: Минимальный размер
+        :param max_size: Максимальный размер
+        :return: Список ботинков
+
+        Примеры:
+        >>> inventory = BootInventory([Boot('кроссовки', size, 'красный') for size in range(36, 46)])
+        >>> [boot.size for boot in inventory.query('кроссовки', 'красный', 38, 42)]
+        [38, 39, 40, 41, 42]
+        >>> inventory.query('кеды', 'красный')
+        []
+        """
+        if boot_type is None and color is None:
+            entries = self._size_range(self._by_size, min_size, max_size)
+        elif boot_type is not None and color is not None:
+            entries = self._size_range(self._by_type_color.get((boot_type, color), []), min_size, max_size)
+        else:
+            # Типов и цветов в базах единицы, поэтому подходящих корзин немного
+            entries = []
+            for (bucket_type, bucket_color), bucket in self._by_type_color.items():
+                if boot_type in (None, bucket_type) and color in (None, bucket_color):
+                    entries.extend(self._size_range(bucket, min_size, max_size))
+            entries.sort()
+        return [self._boots[boot_id] for _, boot_id in entries]
+
+
+def benchmark(sizes: Iterable[int] = (10 ** 3, 10 ** 4, 10 ** 5), queries: int = 1000) -> None:
+    """
+    Сравнивает время запроса "красные кроссовки размеров 38-42" перебором списка и через BootInventory
+
+    :param sizes: Количество ботинков на складе
+    :param queries: Количество запросов в замере
+    :return: None
+    """
+    rng = random.Random(0)
+    types, colors = sorted(Boot.boots_database), sorted(Boot.color_database)
+    for size in sizes:
+        boots = [Boot(rng.choice(types), rng.randint(16, 60), rng.choice(colors)) for _ in range(size)]
+        inventory = BootInventory(boots)
+
+        start = time.perf_counter()
+        for _ in range(queries):
+            found = [boot for boot in boots
+                     if boot.boot_type == 'кроссовки' and boot.color == 'красный' and 38 <= boot.size <= 42]
+        scan_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(queries):
+            found = inventory.query('кроссовки', 'красный', 38, 42)
+        index_time = time.perf_counter() - start
+        print(f"{size:>7} ботинков, найдено {len(found):>5}: перебор {scan_time / queries * 1e6:>9.1f} мкс, "
+              f"BootInventory {index_time / queries * 1e6:>7.1f} мкс")
+
+
+if __name__ == "__main__":
+    doctest.testmod()
+    benchmark()
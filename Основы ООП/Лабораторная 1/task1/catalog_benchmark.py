@@ -0,0 +1,77 @@
+from typing import Iterable
+
+import threading
+import time
+
+from main import Boot, VersionedCatalog
+
+
+class LockedCatalog:
+    """ Каталог для сравнения: множество, каждое чтение и изменение которого выполняются под общей блокировкой. """
+    def __init__(self, values: Iterable[str]):
+        self._values = set(values)
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> tuple[int, set]:
+        with self._lock:
+            return self._version, self._values
+
+    def add(self, value: str) -> None:
+        with self._lock:
+            self._values.add(value)
+            self._version += 1
+
+    def remove(self, value: str) -> None:
+        with self._lock:
+            self._values.remove(value)
+            self._version += 1
+
+
+def measure(catalog_class: type, readers: int, duration: float) -> float:
+    """
+    Измеряет количество созданных объектов Boot в секунду, пока readers потоков создают ботинки, а один поток
+    постоянно добавляет и удаляет тип обуви
+
+    :param catalog_class: Класс каталога типов обуви
+    :param readers: Количество потоков, создающих ботинки
+    :param duration: Длительность замера в секундах
+    :return: Количество созданных ботинков в секунду
+    """
+    original = Boot.boots_database
+    Boot.boots_database = catalog_class(original)
+    stop = threading.Event()
+    counts = [0] * readers
+
+    def reader(slot: int) -> None:
+        created = 0
+        while not stop.is_set():
+            for _ in range(100):
+                Boot('кроссовки', 42, 'красный')
+            created += 100
+        counts[slot] = created
+
+    def writer() -> None:
+        while not stop.is_set():
+            Boot.add_boot_type('мокасины')
+            Boot.remove_boot_type('мокасины')
+
+    threads = [threading.Thread(target=reader, args=(slot,)) for slot in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    try:
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        Boot.boots_database = original
+    return sum(counts) / duration
+
+
+if __name__ == "__main__":
+    for readers_count in (1, 2, 4, 8, 16):
+        results = {catalog: measure(catalog, readers_count, 1.0) for catalog in (LockedCatalog, VersionedCatalog)}
+        print(f"{readers_count:>3} читателей: LockedCatalog {results[LockedCatalog]:>10.0f} Boot/с, "
+              f"VersionedCatalog {results[VersionedCatalog]:>10.0f} Boot/с")
@@ -0,0 +1,320 @@
+from array import array
+from typing import Iterable, Optional, Sequence, Union
+
+import doctest
+import time
+
+from main import GameCharacter
+
+
+Number = Union[int, float]
+
+
+def armor_reduction(armor: Number) -> float:
+    """
+    Функция возвращает снижение урона в долях в зависимости от брони по той же формуле, что и
+    GameCharacter.take_damage
+
+    :param armor: Количество брони
+    :return: Снижение урона, округлённое до сотых
+
+    Примеры:
+    >>> armor_reduction(10)
+    0.37
+    >>> armor_reduction(0)
+    0.0
+    """
+    return round((armor * 0.06) / (1 + armor * 0.06), 2)
+
+
+class CombatEngine:
+    """
+    Пакетный движок боя. Здоровье, максимальное здоровье, броня и снижение урона всех персонажей хранятся в массивах
+    array('d'), и урон или лечение применяются к группе персонажей за один вызов.
+    """
+    def __init__(self):
+        """
+        Инициализация объекта "Движок боя"
+
+        Примеры:
+        >>> engine = CombatEngine()
+        >>> len(engine)
+        0
+        """
+        self.names: list[Optional[str]] = []
+        self.max_health = array('d')
+        self.health = array('d')
+        self.armor = array('d')
+        self.reduction = array('d')
+
+    def __len__(self) -> int:
+        return len(self.health)
+
+    def add_character(self, name: str, max_health: Number, health: Number, armor: Number) -> "CharacterView":
+        """
+        Метод добавляет персонажа в движок с проверками GameCharacter и возвращает представление на него
+
+        :param name: Имя игрового персонажа
+        :param max_health: Максимальное здоровье
+        :param health: Текущее здоровье
+        :param armor: Количество брони
+        :return: Персонаж, данные которого хранятся в движке
+
+        Примеры:
+        >>> engine = CombatEngine()
+        >>> man = engine.add_character('Шарик', 100, 80, 10)
+        >>> print(man.health)
+        80.0
+        >>> engine.add_character('Матроскин', 10, 80, 30)
+        Traceback (most recent call last):
+        ValueError: Ошибка. health должен быть больше либо равен нулю и меньше max_health
+        >>> len(engine)
+        1
+        >>> engine.add_character('Матроскин', 10 ** 400, 5, 1)
+        Traceback (most recent call last):
+        OverflowError: int too large to convert to float
+        >>> len(engine), engine.names
+        (1, ['Шарик'])
+        """
+        self.names.append(None)
+        self.max_health.append(0)
+        self.health.append(0)
+        self.armor.append(0)
+        self.reduction.append(0)
+        character = CharacterView(self, len(self.health) - 1)
+        try:
+            character.init_name(name)
+            character.init_max_health(max_health)
+            character.init_health(health)
+            character.init_armor(armor)
+        except Exception:  # OverflowError при записи в array('d') тоже не должен оставлять недостроенную строку
+            for column in (self.names, self.max_health, self.health, self.armor, self.reduction):
+                column.pop()
+            raise
+        return character
+
+    def character(self, index: int) -> "CharacterView":
+        """
+        Метод возвращает представление персонажа с указанным индексом
+
+        :param index: Индекс персонажа в движке
+        :return: Персонаж, данные которого хранятся в движке
+        """
+        if not 0 <= index < len(self.health):
+            raise IndexError("Ошибка. Персонажа с таким индексом нет в движке")
+        return CharacterView(self, index)
+
+    def _indices(self, indices: Optional[Iterable[int]]) -> Sequence[int]:
+        if indices is None:
+            return range(len(self.health))
+        indices = list(indices)
+        count = len(self.health)
+        for index in indices:
+            if not isinstance(index, int):
+                raise TypeError("Ошибка. Индекс персонажа должен быть целым числом")
+            if not 0 <= index < count:
+                raise IndexError("Ошибка. Персонажа с таким индексом нет в движке")
+        return indices
+
+    @staticmethod
+    def _amounts(amounts: Union[Number, Sequence[Number]], count: int, name: str, title: str) -> Sequence[Number]:
+        if isinstance(amounts, (int, float)):
+            values = (amounts,)
+        else:
+            values = amounts
+            if len(values) != count:
+                raise ValueError(f"Ошибка. Количество значений {name} должно совпадать с количеством персонажей")
+        for value in values:
+            if not isinstance(value, (int, float)):
+                raise TypeError(f"Ошибка. Значение {title} {name} должно быть int или float")
+            if value <= 0:
+                raise ValueError(f"Ошибка. Значение {title} {name} должно быть строго положительным")
+            float(value)  # OverflowError до изменения здоровья, а не посреди группы
+        return [amounts] * count if isinstance(amounts, (int, float)) else values
+
+    def take_damage(self, enemy_damage: Union[Number, Sequence[Number]],
+                    indices: Optional[Iterable[int]] = None) -> None:
+        """
+        Метод уменьшает здоровье группы персонажей в зависимости от урона и брони каждого из них, как
+        GameCharacter.take_damage. Все значения проверяются до изменения здоровья, поэтому при ошибке ни один
+        персонаж не пострадает
+
+        :param enemy_damage: Полученный урон: одно значение для всех или по значению на каждого персонажа
+        :param indices: Индексы персонажей. По умолчанию - все персонажи движка
+        :return: None
+
+        Примеры:
+        >>> engine = CombatEngine()
+        >>> man = engine.add_character('Шарик', 100, 80, 10)
+        >>> cat = engine.add_character('Матроскин', 100, 50, 0)
+        >>> engine.take_damage(10)
+        >>> print(man.health, cat.health)
+        73.7 40.0
+        >>> engine.take_damage([15, 100], indices=[0, 1])
+        >>> print(man.health, cat.health)
+        64.25 0.0
+        >>> engine.take_damage(-15)
+        Traceback (most recent call last):
+        ValueError: Ошибка. Значение урона enemy_damage должно быть строго положительным
+        >>> engine.take_damage(5, indices=[1, -1])
+        Traceback (most recent call last):
+        IndexError: Ошибка. Персонажа с таким индексом нет в движке
+        >>> engine.take_damage(5, indices=[1, 2])
+        Traceback (most recent call last):
+        IndexError: Ошибка. Персонажа с таким индексом нет в движке
+        >>> print(man.health, cat.health)
+        64.25 0.0
+        """
+        indices = self._indices(indices)
+        damages = self._amounts(enemy_damage, len(indices), "enemy_damage", "урона")
+        reduction = self.reduction
+        self._reduce(indices, [damage - damage * reduction[index] for index, damage in zip(indices, damages)])
+
+    def reduce_health(self, health_damage: Union[Number, Sequence[Number]],
+                      indices: Optional[Iterable[int]] = None) -> None:
+        """
+        Метод уменьшает здоровье группы персонажей на указанные величины с ограничением снизу нулём, как
+        GameCharacter.reduce_health
+
+        :param health_damage: Итоговое уменьшение здоровья: одно значение для всех или по значению на каждого
+        :param indices: Индексы персонажей. По умолчанию - все персонажи движка
+        :return: None
+
+        Примеры:
+        >>> engine = CombatEngine()
+        >>> man = engine.add_character('Шарик', 100, 80, 10)
+        >>> engine.reduce_health(7.2)
+        >>> print(man.health)
+        72.8
+        >>> engine.reduce_health([90])
+        >>> print(man.health)
+        0.0
+        """
+        indices = self._indices(indices)
+        self._reduce(indices, self._amounts(health_damage, len(indices), "health_damage", "полученного урона"))
+
+    def _reduce(self, indices: Sequence[int], damages: Sequence[Number]) -> None:
+        health = self.health
+        for index, damage in zip(indices, damages):
+            remaining = health[index] - damage
+            health[index] = remaining if 0 < remaining else 0
+
+    def increase_health(self, health_increment: Union[Number, Sequence[Number]],
+                        indices: Optional[Iterable[int]] = None) -> None:
+        """
+        Метод увеличивает здоровье группы персонажей на указанные величины с ограничением сверху max_health, как
+        GameCharacter.increase_health
+
+        :param health_increment: Увеличение здоровья: одно значение для всех или по значению на каждого персонажа
+        :param indices: Индексы персонажей. По умолчанию - все персонажи движка
+        :return: None
+
+        Примеры:
+        >>> engine = CombatEngine()
+        >>> man = engine.add_character('Шарик', 100, 80, 10)
+        >>> engine.increase_health(7)
+        >>> print(man.health)
+        87.0
+        >>> engine.increase_health(30)
+        >>> print(man.health)
+        100.0
+        """
+        indices = self._indices(indices)
+        increments = self._amounts(health_increment, len(indices), "health_increment", "увеличения здоровья")
+        health, max_health = self.health, self.max_health
+        for index, increment in zip(indices, increments):
+            increased = health[index] + increment
+            health[index] = increased if increased < max_health[index] else max_health[index]
+
+
+class CharacterView(GameCharacter):
+    """
+    Игровой персонаж, данные которого хранятся в CombatEngine. Все методы GameCharacter работают без изменений,
+    а атрибуты читаются из массивов движка и записываются в них. Числовые атрибуты возвращаются как float.
+    """
+    def __init__(self, engine: CombatEngine, index: int):
+        """
+        Инициализация представления персонажа. Создаётся методами CombatEngine.add_character и
+        CombatEngine.character
+
+        :param engine: Движок, в котором хранятся данные персонажа
+        :param index: Индекс персонажа в движке
+
+        Примеры:
+        >>> engine = CombatEngine()
+        >>> man = engine.add_character('Шарик', 100, 80, 10)
+        >>> man.take_damage(10)
+        >>> print(engine.character(0).health)
+        73.7
+        """
+        self._engine = engine
+        self._index = index
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def name(self) -> Optional[str]:
+        return self._engine.names[self._index]
+
+    @name.setter
+    def name(self, name: str) -> None:
+        self._engine.names[self._index] = name
+
+    @property
+    def max_health(self) -> float:
+        return self._engine.max_health[self._index]
+
+    @max_health.setter
+    def max_health(self, max_health: Number) -> None:
+        self._engine.max_health[self._index] = max_health
+
+    @property
+    def health(self) -> float:
+        return self._engine.health[self._index]
+
+    @health.setter
+    def health(self, health: Number) -> None:
+        self._engine.health[self._index] = health
+
+    @property
+    def armor(self) -> float:
+        return self._engine.armor[self._index]
+
+    @armor.setter
+    def armor(self, armor: Number) -> None:
+        self._engine.armor[self._index] = armor
+        self._engine.reduction[self._index] = armor_reduction(armor)
+
+
+def benchmark(sizes: Iterable[int] = (10 ** 3, 10 ** 4, 10 ** 5), ticks: int = 10) -> None:
+    """
+    Сравнивает время нанесения урона всем персонажам: цикл по объектам GameCharacter против CombatEngine.take_damage
+
+    :param sizes: Количество персонажей
+    :param ticks: Количество ударов по каждому персонажу
+    :return: None
+    """
+    for size in sizes:
+        characters = [GameCharacter('Шарик', 100, 100, index % 50) for index in range(size)]
+        start = time.perf_counter()
+        for _ in range(ticks):
+            for character in characters:
+                character.take_damage(1)
+        objects_time = time.perf_counter() - start
+
+        engine = CombatEngine()
+        for index in range(size):
+            engine.add_character('Шарик', 100, 100, index % 50)
+        start = time.perf_counter()
+        for _ in range(ticks):
+            engine.take_damage(1)
+        engine_time = time.perf_counter() - start
+        print(f"{size:>7} персонажей: GameCharacter {objects_time * 1e3 / ticks:.2f} мс/тик, "
+              f"CombatEngine {engine_time * 1e3 / ticks:.2f} мс/тик")
+
+
+if __name__ == "__main__":
+    doctest.testmod()
+    benchmark()
@@ -0,0 +1,396 @@
+from bisect import bisect_right
+from typing import Iterable, Optional, Sequence, Union
+
+import doctest
+import mmap
+import os
+import struct
+import tempfile
+import time
+
+from main import GameCharacter
+
+
+# Журнал состоит из трёх файлов:
+#   <path>       - события фиксированной длины: код операции, id персонажа, значение;
+#   <path>.names - имена персонажей (длина и UTF-8), на которые ссылаются события INIT_NAME и снимки;
+#   <path>.snap  - снимки состояния всех персонажей: заголовок (номер события, смещение в журнале, количество
+#                  персонажей) и по записи фиксированной длины на персонажа.
+INIT_NAME, INIT_MAX_HEALTH, INIT_HEALTH, INIT_ARMOR, TAKE_DAMAGE, REDUCE_HEALTH, INCREASE_HEALTH = range(7)
+RECORD = struct.Struct("<BId")
+NAME_LENGTH = struct.Struct("<I")
+SNAPSHOT_HEADER = struct.Struct("<QQI")
+SNAPSHOT_ENTRY = struct.Struct("<Iqddd")
+NO_NAME = -1
+
+
+class CombatLog:
+    """
+    Журнал боя только на дозапись. Персонажи LoggedGameCharacter записывают в него каждый успешный вызов init_*,
+    take_damage, reduce_health и increase_health, а каждые snapshot_interval событий журнал сохраняет снимок
+    состояния всех персонажей.
+
+    flush, snapshot и close сбрасывают файлы на диск через fsync, поэтому после сбоя журнал содержит как минимум
+    все события до последнего из этих вызовов. Оборванные при сбое запись события и блок снимка отрезаются при
+    следующем открытии журнала.
+    """
+    def __init__(self, path: str, snapshot_interval: int = 100_000):
+        """
+        Открывает журнал на дозапись. Существующий журнал продолжается с сохранёнными номерами персонажей
+
+        :param path: Путь к файлу событий
+        :param snapshot_interval: Количество событий между снимками
+
+        Примеры:
+        >>> directory = tempfile.TemporaryDirectory()
+        >>> path = os.path.join(directory.name, 'fight.log')
+        >>> with CombatLog(path, snapshot_interval=4) as log:
+        ...     man = LoggedGameCharacter(log, 'Шарик', 100, 80, 10)
+        >>> with open(path, 'ab') as events, open(path + '.snap', 'ab') as snapshots:  # запись оборвана сбоем
+        ...     _ = events.write(bytes(2)), snapshots.write(SNAPSHOT_HEADER.pack(4, 52, 1) + bytes(5))
+        >>> with CombatLog(path, snapshot_interval=4) as log:
+        ...     cat = LoggedGameCharacter(log, 'Матроскин', 50, 50, 0)
+        ...     cat.take_damage(10)
+        >>> with CombatLogReader(path) as reader:
+        ...     print(reader.event_count, reader.state_at(cat.character_id).health)
+        9 40.0
+        >>> directory.cleanup()
+        """
+        if not isinstance(snapshot_interval, int):
+            raise TypeError("Ошибка. snapshot_interval должен быть int")
+        if snapshot_interval <= 0:
+            raise ValueError("Ошибка. snapshot_interval должен быть строго положительным")
+        self.snapshot_interval = snapshot_interval
+        self._states: dict[int, list] = {}
+        if os.path.exists(path):
+            with CombatLogReader(path) as reader:
+                self._states = reader.replay_states()
+                event_bytes, snapshot_bytes = reader.event_count * RECORD.size, reader.snapshot_bytes
+            # Оборванные хвосты отрезаются, чтобы новые записи не сместились относительно границ записей
+            os.truncate(path, event_bytes)
+            if os.path.exists(path + ".snap"):
+                os.truncate(path + ".snap", snapshot_bytes)
+        self._events = open(path, "ab")
+        self._names = open(path + ".names", "ab")
+        self._snapshots = open(path + ".snap", "ab")
+        self._name_offsets: dict[str, int] = {}
+        self.event_count = self._events.tell() // RECORD.size
+        self._since_snapshot = 0
+
+    def __enter__(self) -> "CombatLog":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def register(self) -> int:
+        """
+        Метод выдаёт номер новому персонажу
+
+        :return: Номер персонажа в журнале
+        """
+        character_id = len(self._states)
+        self._states[character_id] = [NO_NAME, 0.0, 0.0, 0.0]
+        return character_id
+
+    def _name_offset(self, name: str) -> int:
+        offset = self._name_offsets.get(name)
+        if offset is None:
+            encoded = name.encode("utf-8")
+            offset = self._name_offsets[name] = self._names.tell()
+            self._names.write(NAME_LENGTH.pack(len(encoded)) + encoded)
+        return offset
+
+    def append(self, operation: int, character_id: int, value: Union[int, float, str]) -> None:
+        """
+        Метод дописывает событие в журнал. Значение уже должно быть проверено методом персонажа
+
+        :param operation: Код операции
+        :param character_id: Номер персонажа
+        :param value: Аргумент вызова
+        :return: None
+        """
+        if operation == INIT_NAME:
+            value = self._name_offset(value)
+        self._events.write(RECORD.pack(operation, character_id, value))
+        _apply(self._states[character_id], operation, value)
+        self.event_count += 1
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_interval:
+            self.snapshot()
+
+    def snapshot(self) -> None:
+        """
+        Метод сохраняет снимок состояния всех персонажей на текущий момент журнала
+
+        :return: None
+        """
+        self.flush()
+        block = [SNAPSHOT_HEADER.pack(self.event_count, self._events.tell(), len(self._states))]
+        block.extend(SNAPSHOT_ENTRY.pack(character_id, *state) for character_id, state in self._states.items())
+        self._snapshots.write(b"".join(block))
+        self._snapshots.flush()
+        os.fsync(self._snapshots.fileno())
+        self._since_snapshot = 0
+
+    def flush(self) -> None:
+        """
+        Метод сбрасывает записанные имена и события на диск. Имена сбрасываются первыми: событие никогда не
+        ссылается на имя, которого нет в файле
+
+        :return: None
+        """
+        for file in (self._names, self._events):
+            file.flush()
+            os.fsync(file.fileno())
+
+    def close(self) -> None:
+        self.flush()
+        for file in (self._events, self._names, self._snapshots):
+            file.close()
+
+
+def _apply(state: list, operation: int, value: float) -> None:
+    # Та же арифметика, что и в методах GameCharacter; значения были проверены при записи
+    if operation == TAKE_DAMAGE:
+        armor = state[3]
+        value = value - value * round((armor * 0.06) / (1 + armor * 0.06), 2)
+        state[2] = state[2] - value if 0 < state[2] - value else 0
+    elif operation == REDUCE_HEALTH:
+        state[2] = state[2] - value if 0 < state[2] - value else 0
+    elif operation == INCREASE_HEALTH:
+        state[2] = state[2] + value if state[2] + value < state[1] else state[1]
+    else:
+        state[operation] = int(value) if operation == INIT_NAME else value
+
+
+class LoggedGameCharacter(GameCharacter):
+    """ Игровой персонаж, который записывает в журнал каждый успешный вызов своих методов. """
+    def __init__(self, log: CombatLog, name: str, max_health: Union[int, float], health: Union[int, float],
+                 armor: Union[int, float]):
+        """
+        Инициализация персонажа с журналом. Вызовы init_* из GameCharacter.__init__ тоже попадают в журнал
+
+        :param log: Журнал боя
+        :param name: Имя игрового персонажа
+        :param max_health: Максимальное здоровье
+        :param health: Текущее здоровье
+        :param armor: Количество брони
+
+        Примеры:
+        >>> directory = tempfile.TemporaryDirectory()
+        >>> log = CombatLog(os.path.join(directory.name, 'fight.log'), snapshot_interval=3)
+        >>> man = LoggedGameCharacter(log, 'Шарик', 100, 80, 10)
+        >>> man.take_damage(10)
+        >>> man.increase_health(5)
+        >>> log.close()
+        >>> with CombatLogReader(os.path.join(directory.name, 'fight.log')) as reader:
+        ...     print(reader.event_count, reader.state_at(man.character_id).health)
+        ...     print(reader.state_at(man.character_id, event_index=5).health)
+        6 78.7
+        73.7
+        >>> directory.cleanup()
+        """
+        self._schema.validate(name, max_health, health, armor)  # номер выдаётся только проверенному персонажу
+        self._log = log
+        self._in_take_damage = False
+        self.character_id = log.register()
+        super().__init__(name, max_health, health, armor)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence]) -> list["LoggedGameCharacter"]:
+        """ from_rows создаёт объекты без __init__ и init_*, поэтому персонажи с журналом им не создаются. """
+        raise TypeError("Ошибка. Персонажи с журналом создаются только конструктором")
+
+    def init_name(self, name: str) -> None:
+        super().init_name(name)
+        self._log.append(INIT_NAME, self.character_id, name)
+
+    def init_max_health(self, max_health: Union[int, float]) -> None:
+        super().init_max_health(max_health)
+        self._log.append(INIT_MAX_HEALTH, self.character_id, max_health)
+
+    def init_health(self, health: Union[int, float]) -> None:
+        super().init_health(health)
+        self._log.append(INIT_HEALTH, self.character_id, health)
+
+    def init_armor(self, armor: Union[int, float]) -> None:
+        super().init_armor(armor)
+        self._log.append(INIT_ARMOR, self.character_id, armor)
+
+    def increase_health(self, health_increment: Union[int, float]) -> None:
+        super().increase_health(health_increment)
+        self._log.append(INCREASE_HEALTH, self.character_id, health_increment)
+
+    def reduce_health(self, health_damage: Union[int, float]) -> None:
+        super().reduce_health(health_damage)
+        if not self._in_take_damage:  # внутри take_damage записывается сам вызов take_damage
+            self._log.append(REDUCE_HEALTH, self.character_id, health_damage)
+
+    def take_damage(self, enemy_damage: Union[int, float]) -> None:
+        self._in_take_damage = True
+        try:
+            super().take_damage(enemy_damage)
+        finally:
+            self._in_take_damage = False
+        self._log.append(TAKE_DAMAGE, self.character_id, enemy_damage)
+
+
+class CombatLogReader:
+    """
+    Чтение и воспроизведение журнала боя. Состояние восстанавливается от ближайшего предшествующего снимка,
+    после которого применяются только события нужного персонажа.
+    """
+    def __init__(self, path: str):
+        """
+        Открывает журнал на чтение
+
+        :param path: Путь к файлу событий
+        """
+        self._files = []
+        self._events = self._map(path)
+        self._names = self._map(path + ".names")
+        self._snapshots = self._map(path + ".snap")
+        self.event_count = len(self._events) // RECORD.size
+
+        # Индекс снимков: номер события -> смещение блока снимка. Оборванный при сбое блок и снимки событий,
+        # не попавших в файл событий, считаются отсутствующими
+        self._snapshot_events: list[int] = []
+        self._snapshot_blocks: list[int] = []
+        offset = 0
+        while offset + SNAPSHOT_HEADER.size <= len(self._snapshots):
+            event_index, _, count = SNAPSHOT_HEADER.unpack_from(self._snapshots, offset)
+            end = offset + SNAPSHOT_HEADER.size + count * SNAPSHOT_ENTRY.size
+            if end > len(self._snapshots) or event_index > self.event_count:
+                break
+            self._snapshot_events.append(event_index)
+            self._snapshot_blocks.append(offset)
+            offset = end
+        self.snapshot_bytes = offset
+
+    def _map(self, path: str) -> Union[mmap.mmap, bytes]:
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return b""
+        with open(path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._files.append(mapped)
+        return mapped
+
+    def close(self) -> None:
+        for mapped in self._files:
+            mapped.close()
+
+    def __enter__(self) -> "CombatLogReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _name(self, offset: int) -> Optional[str]:
+        if offset == NO_NAME:
+            return None
+        length, = NAME_LENGTH.unpack_from(self._names, offset)
+        start = offset + NAME_LENGTH.size
+        return bytes(self._names[start:start + length]).decode("utf-8")
+
+    def _nearest_snapshot(self, event_index: int) -> tuple[int, dict[int, list]]:
+        position = bisect_right(self._snapshot_events, event_index) - 1
+        if position < 0:
+            return 0, {}
+        block = self._snapshot_blocks[position]
+        _, log_offset, count = SNAPSHOT_HEADER.unpack_from(self._snapshots, block)
+        states = {}
+        for index in range(count):
+            character_id, *state = SNAPSHOT_ENTRY.unpack_from(
+                self._snapshots, block + SNAPSHOT_HEADER.size + index * SNAPSHOT_ENTRY.size
+            )
+            states[character_id] = state
+        return log_offset, states
+
+    def _check_event_index(self, event_index: Optional[int]) -> int:
+        if event_index is None:
+            return self.event_count
+        if not isinstance(event_index, int):
+            raise TypeError("Ошибка. event_index должен быть int")
+        if not 0 <= event_index <= self.event_count:
+            raise ValueError(f"Ошибка. event_index должен быть в пределах от 0 до {self.event_count}")
+        return event_index
+
+    def replay_states(self, event_index: Optional[int] = None) -> dict[int, list]:
+        """
+        Метод восстанавливает сырые состояния всех персонажей после первых event_index событий
+
+        :param event_index: Количество применённых событий. По умолчанию - весь журнал
+        :return: Словарь номер персонажа -> [смещение имени, max_health, health, armor]
+        """
+        event_index = self._check_event_index(event_index)
+        start, states = self._nearest_snapshot(event_index)
+        with memoryview(self._events) as view, view[start:event_index * RECORD.size] as events:
+            for operation, character_id, value in RECORD.iter_unpack(events):
+                state = states.get(character_id)
+                if state is None:
+                    state = states[character_id] = [NO_NAME, 0.0, 0.0, 0.0]
+                _apply(state, operation, value)
+        return states
+
+    def state_at(self, character_id: int, event_index: Optional[int] = None) -> GameCharacter:
+        """
+        Метод восстанавливает персонажа после первых event_index событий журнала. Числовые атрибуты
+        восстанавливаются как float
+
+        :param character_id: Номер персонажа
+        :param event_index: Количество применённых событий. По умолчанию - весь журнал
+        :return: Персонаж в восстановленном состоянии
+        """
+        event_index = self._check_event_index(event_index)
+        start, states = self._nearest_snapshot(event_index)
+        state = states.get(character_id)
+        state = list(state) if state is not None else [NO_NAME, 0.0, 0.0, 0.0]
+        found = character_id in states
+        with memoryview(self._events) as view, view[start:event_index * RECORD.size] as events:
+            for operation, event_character_id, value in RECORD.iter_unpack(events):
+                if event_character_id == character_id:
+                    found = True
+                    _apply(state, operation, value)
+        if not found:
+            raise ValueError(f"Ошибка. Персонажа с номером {character_id} нет в журнале до события {event_index}")
+
+        # Значения были проверены при записи, поэтому персонаж собирается без повторной проверки
+        character = GameCharacter.__new__(GameCharacter)
+        character.name = self._name(state[0])
+        character.max_health, character.health, character.armor = state[1:]
+        return character
+
+
+def benchmark(events: int = 10 ** 6, characters: int = 1000) -> None:
+    """
+    Пишет журнал из events событий и измеряет время восстановления персонажа на конце журнала
+
+    :param events: Количество событий
+    :param characters: Количество персонажей
+    :return: None
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "fight.log")
+        with CombatLog(path) as log:
+            heroes = [LoggedGameCharacter(log, f"Герой {index}", 10 ** 9, 10 ** 9, index % 50)
+                      for index in range(characters)]
+            start = time.perf_counter()
+            for index in range(events - log.event_count):
+                heroes[index % characters].take_damage(1)
+            write_time = time.perf_counter() - start
+        with CombatLogReader(path) as reader:
+            start = time.perf_counter()
+            reader.state_at(characters - 1)
+            snapshot_time = time.perf_counter() - start
+            reader._snapshot_events.clear()  # воспроизведение с начала журнала для сравнения
+            start = time.perf_counter()
+            reader.state_at(characters - 1)
+            full_time = time.perf_counter() - start
+    print(f"{events} событий: запись {write_time:.1f} с, восстановление от снимка {snapshot_time * 1e3:.1f} мс, "
+          f"с начала журнала {full_time:.2f} с")
+
+
+if __name__ == "__main__":
+    doctest.testmod()
+    benchmark()
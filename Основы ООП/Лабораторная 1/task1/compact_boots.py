@@ -0,0 +1,249 @@
+from array import array
+from typing import Iterable, Iterator, Optional, Union
+
+import doctest
+import random
+import tracemalloc
+
+from main import Boot
+
+
+class CodeTable:
+    def __init__(self, max_codes: int = 256):
+        """
+        Инициализация таблицы кодов. Каждому значению при первом обращении выдаётся следующий по порядку
+        небольшой целый код, коды никогда не переиспользуются
+
+        :param max_codes: Максимальное количество кодов
+
+        Примеры:
+        >>> table = CodeTable()
+        >>> table.encode('кеды'), table.encode('туфли'), table.encode('кеды')
+        (0, 1, 0)
+        >>> table.decode(1)
+        'туфли'
+        """
+        self._values: list[str] = []
+        self._codes: dict[str, int] = {}
+        self._max_codes = max_codes
+
+    def encode(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            if len(self._values) >= self._max_codes:
+                raise OverflowError(f"Ошибка. В таблице не может быть больше {self._max_codes} значений")
+            code = self._codes[value] = len(self._values)
+            self._values.append(value)
+        return code
+
+    def find(self, value: str) -> Optional[int]:
+        return self._codes.get(value)
+
+    def decode(self, code: int) -> str:
+        return self._values[code]
+
+
+BOOT_TYPE_CODES = CodeTable()
+COLOR_CODES = CodeTable()
+
+
+class CompactBoot:
+    """
+    Компактный ботинок: тип и цвет хранятся кодами из BOOT_TYPE_CODES и COLOR_CODES, атрибуты - в __slots__.
+    """
+    __slots__ = ('_type_code', '_color_code', 'size', 'catalog_version')
+
+    def __init__(self, boot_type: str, size: Union[int, float], color: str):
+        """
+        Инициализация компактного ботинка с проверками Boot.__init__
+
+        :param boot_type: Тип ботинка
+        :param size: Размер ботинка
+        :param color: Цвет ботинка
+
+        Примеры:
+        >>> boot = CompactBoot('кроссовки', 36, 'фиолетовый')
+        >>> print(boot.boot_type, boot.size, boot.color)
+        кроссовки 36 фиолетовый
+        >>> boot = CompactBoot('мокасины', 60, 'красный')
+        Traceback (most recent call last):
+        ValueError: Ошибка. Типа обуви 'мокасины' нет в базе данных (boots_database - атрибут класса)
+        """
+        Boot.__init__(self, boot_type, size, color)  # Проверки и присваивания идут через свойства ниже
+
+    @property
+    def boot_type(self) -> str:
+        return BOOT_TYPE_CODES.decode(self._type_code)
+
+    @boot_type.setter
+    def boot_type(self, boot_type: str) -> None:
+        self._type_code = BOOT_TYPE_CODES.encode(boot_type)
+
+    @property
+    def color(self) -> str:
+        return COLOR_CODES.decode(self._color_code)
+
+    @color.setter
+    def color(self, color: str) -> None:
+        self._color_code = COLOR_CODES.encode(color)
+
+    def delta_size(self, size: Union[int, float]) -> None:
+        """
+        Метод изменяет размер ботинка на указанную величину с ограничениями Boot.delta_size
+
+        :param size: Значение размера ботинка, на которое необходимо изменить текущий размер
+        :return: None
+
+        Примеры:
+        >>> boot = CompactBoot('кроссовки', 36, 'фиолетовый')
+        >>> boot.delta_size(-100)
+        >>> print(boot.size)
+        16
+        """
+        if not isinstance(size, (int, float)):
+            raise TypeError("Ошибка. Размер ботинка size должен быть int или float")
+        if size >= 0:
+            self.size = self.size + size if self.size + size <= 60 else 60
+        else:
+            self.size = self.size + size if 16 <= self.size + size else 16
+
+    def to_boot(self) -> Boot:
+        """
+        Метод создаёт обычный объект Boot с проверкой по текущим базам
+
+        :return: Ботинок
+        """
+        return Boot(self.boot_type, self.size, self.color)
+
+
+class BootBatch:
+    """
+    Партия ботинков в упакованных строках: коды типа и цвета в array('B'), размеры в array('d'). Размеры
+    хранятся как float.
+    """
+    def __init__(self, boots: Optional[Iterable[Union[Boot, CompactBoot]]] = None):
+        """
+        Инициализация партии ботинков
+
+        :param boots: Последовательность объектов Boot или CompactBoot
+
+        Примеры:
+        >>> batch = BootBatch([Boot('кроссовки', 36, 'фиолетовый'), Boot('кеды', 59, 'синий')])
+        >>> len(batch)
+        2
+        """
+        self.type_codes = array('B')
+        self.color_codes = array('B')
+        self.sizes = array('d')
+        if boots is not None:
+            for boot in boots:
+                if not isinstance(boot, (Boot, CompactBoot)):
+                    raise TypeError("Ошибка. Элементы должны быть объектами класса Boot или CompactBoot")
+                self.type_codes.append(BOOT_TYPE_CODES.encode(boot.boot_type))
+                self.color_codes.append(COLOR_CODES.encode(boot.color))
+                self.sizes.append(boot.size)
+
+    def append(self, boot_type: str, size: Union[int, float], color: str) -> None:
+        """
+        Метод добавляет в партию ботинок с проверками Boot.__init__
+
+        :param boot_type: Тип ботинка
+        :param size: Размер ботинка
+        :param color: Цвет ботинка
+        :return: None
+        """
+        boot = CompactBoot(boot_type, size, color)
+        self.type_codes.append(boot._type_code)
+        self.color_codes.append(boot._color_code)
+        self.sizes.append(size)
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def __getitem__(self, index: int) -> CompactBoot:
+        # Строки партии уже проверены, поэтому объект собирается без повторной проверки
+        boot = CompactBoot.__new__(CompactBoot)
+        boot._type_code = self.type_codes[index]
+        boot._color_code = self.color_codes[index]
+        boot.size = self.sizes[index]
+        return boot
+
+    def __iter__(self) -> Iterator[CompactBoot]:
+        for index in range(len(self.sizes)):
+            yield self[index]
+
+    def delta_size(self, size: Union[int, float]) -> None:
+        """
+        Метод изменяет размер всех ботинков партии за один проход с ограничениями Boot.delta_size
+
+        :param size: Значение размера ботинка, на которое необходимо изменить текущий размер
+        :return: None
+
+        Примеры:
+        >>> batch = BootBatch([Boot('кроссовки', 36, 'фиолетовый'), Boot('кеды', 59, 'синий')])
+        >>> batch.delta_size(5)
+        >>> list(batch.sizes)
+        [41.0, 60.0]
+        >>> batch.delta_size(-30)
+        >>> list(batch.sizes)
+        [16.0, 30.0]
+        """
+        if not isinstance(size, (int, float)):
+            raise TypeError("Ошибка. Размер ботинка size должен быть int или float")
+        if size >= 0:
+            self.sizes = array('d', [value + size if value + size <= 60 else 60 for value in self.sizes])
+        else:
+            self.sizes = array('d', [value + size if 16 <= value + size else 16 for value in self.sizes])
+
+    def count(self, boot_type: Optional[str] = None, color: Optional[str] = None) -> int:
+        """
+        Метод считает ботинки указанного типа и цвета, сравнивая коды
+
+        :param boot_type: Тип обуви
+        :param color: Цвет
+        :return: Количество ботинков
+
+        Примеры:
+        >>> batch = BootBatch([Boot('кроссовки', 36, 'фиолетовый'), Boot('кеды', 59, 'синий')])
+        >>> batch.count(boot_type='кеды'), batch.count(color='красный')
+        (1, 0)
+        """
+        type_code = None if boot_type is None else BOOT_TYPE_CODES.find(boot_type)
+        color_code = None if color is None else COLOR_CODES.find(color)
+        if (boot_type is not None and type_code is None) or (color is not None and color_code is None):
+            return 0  # Значение ещё ни разу не кодировалось, значит таких ботинков нет
+        if color_code is None:
+            return len(self) if type_code is None else self.type_codes.count(type_code)
+        if type_code is None:
+            return self.color_codes.count(color_code)
+        return sum(1 for row_type, row_color in zip(self.type_codes, self.color_codes)
+                   if row_type == type_code and row_color == color_code)
+
+
+def measure_memory(size: int) -> dict[str, float]:
+    """
+    Измеряет память на один ботинок для списка Boot, списка CompactBoot и BootBatch
+
+    :param size: Количество ботинков
+    :return: Словарь название представления -> байт на ботинок
+    """
+    rng = random.Random(0)
+    types, colors = sorted(Boot.boots_database), sorted(Boot.color_database)
+    rows = [(rng.choice(types), float(rng.randint(16, 60)), rng.choice(colors)) for _ in range(size)]
+    results = {}
+    for name, build in (("list[Boot]", lambda: [Boot(*row) for row in rows]),
+                        ("list[CompactBoot]", lambda: [CompactBoot(*row) for row in rows]),
+                        ("BootBatch", lambda: BootBatch(CompactBoot(*row) for row in rows))):
+        tracemalloc.start()
+        catalog = build()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = current / size
+        del catalog
+    return results
+
+
+if __name__ == "__main__":
+    doctest.testmod()
+    for boots_count in (10 ** 4, 10 ** 5):
+        print(boots_count, {name: round(value, 1) for name, value in measure_memory(boots_count).items()})
@@ -0,0 +1,342 @@
+from array import array
+from collections import Counter
+from typing import Iterable, Iterator, Optional
+
+import doctest
+import random
+import sys
+import time
+
+from main import Guitar
+
+
+INVERT = bytes(255 - value for value in range(256))
+INT64_MAX = 2 ** 63 - 1
+
+
+class GuitarFleet:
+    """
+    Парк гитар в колонках: is_electric - битовый набор, strings_count - array('q'), guitar_type - список
+    интернированных строк. Количество электрогитар, общее количество струн и гистограмма количества струн
+    обновляются при каждом изменении, поэтому запросы к ним выполняются за O(1).
+    """
+    def __init__(self, guitars: Optional[Iterable[Guitar]] = None):
+        """
+        Инициализация объекта "Парк гитар"
+
+        :param guitars: Последовательность объектов Guitar
+
+        Примеры:
+        >>> fleet = GuitarFleet([Guitar('балалайка', 3, True), Guitar('советская гитара', 6, False)])
+        >>> fleet.electric_count, fleet.total_strings, fleet.strings_histogram()
+        (1, 9, {3: 1, 6: 1})
+        """
+        self._types: list[str] = []
+        self._strings = array('q')
+        self._electric = bytearray()
+        self._histogram: dict[int, int] = {}
+        self.electric_count = 0
+        self.total_strings = 0
+        if guitars is not None:
+            for guitar in guitars:
+                if not isinstance(guitar, Guitar):
+                    raise TypeError("Ошибка. Элементы должны быть объектами класса Guitar")
+                self.append(guitar.guitar_type, guitar.strings_count, guitar.is_electric)
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def append(self, guitar_type: str, strings_count: int, is_electric: bool) -> None:
+        """
+        Метод добавляет гитару в парк с проверками Guitar.__init__
+
+        :param guitar_type: Тип гитары
+        :param strings_count: Количество струн
+        :param is_electric: True если гитара электрическая, False если акустическая
+        :return: None
+
+        Примеры:
+        >>> fleet = GuitarFleet()
+        >>> fleet.append('балалайка', -3, True)
+        Traceback (most recent call last):
+        ValueError: Ошибка. Количество струн strings_count должен быть больше либо равен нулю
+        >>> fleet.append('балалайка', 2 ** 63, True)
+        Traceback (most recent call last):
+        ValueError: Ошибка. Количество струн не помещается в 64 бита
+        >>> len(fleet), fleet.electric_count, fleet.acoustic_count
+        (0, 0, 0)
+        """
+        if not isinstance(guitar_type, str):
+            raise TypeError("Ошибка. Тип гитары guitar_type должен быть str")
+        if not isinstance(strings_count, int):
+            raise TypeError("Ошибка. Количество струн strings_count должен быть int")
+        if strings_count < 0:
+            raise ValueError("Ошибка. Количество струн strings_count должен быть больше либо равен нулю")
+        if not isinstance(is_electric, bool):
+            raise TypeError("Ошибка. is_electric должен быть типа bool")
+        self._check_range(strings_count)
+
+        index = len(self._strings)
+        if index % 8 == 0:
+            self._electric.append(0)
+        if is_electric:
+            self._electric[index >> 3] |= 1 << (index & 7)
+            self.electric_count += 1
+        self._types.append(sys.intern(guitar_type))
+        self._strings.append(strings_count)
+        self._histogram[strings_count] = self._histogram.get(strings_count, 0) + 1
+        self.total_strings += strings_count
+
+    def is_electric(self, index: int) -> bool:
+        self._check_index(index)
+        return bool(self._electric[index >> 3] & (1 << (index & 7)))
+
+    def strings_count(self, index: int) -> int:
+        self._check_index(index)
+        return self._strings[index]
+
+    def __getitem__(self, index: int) -> Guitar:
+        self._check_index(index)
+        # Данные уже проверены при добавлении, поэтому объект собирается без повторной проверки
+        guitar = Guitar.__new__(Guitar)
+        guitar.guitar_type = self._types[index]
+        guitar.strings_count = self._strings[index]
+        guitar.is_electric = self.is_electric(index)
+        return guitar
+
+    def __iter__(self) -> Iterator[Guitar]:
+        for index in range(len(self._strings)):
+            yield self[index]
+
+    @property
+    def acoustic_count(self) -> int:
+        return len(self._strings) - self.electric_count
+
+    def strings_histogram(self) -> dict[int, int]:
+        """
+        Метод возвращает копию гистограммы: количество струн -> количество гитар
+
+        :return: Гистограмма
+        """
+        return dict(sorted(self._histogram.items()))
+
+    def _check_index(self, index: int) -> None:
+        if not isinstance(index, int):
+            raise TypeError("Ошибка. Индекс гитары должен быть int")
+        if not 0 <= index < len(self._strings):
+            raise IndexError("Ошибка. Гитары с таким индексом нет в парке")
+
+    def _checked_indices(self, indices: Iterable[int]) -> list[int]:
+        # Все индексы проверяются до первого изменения, чтобы ошибка не оставляла группу изменённой наполовину
+        indices = list(indices)
+        for index in indices:
+            self._check_index(index)
+        return indices
+
+    @staticmethod
+    def _check_range(strings_count: int) -> None:
+        # Проверка до изменения агрегатов: иначе OverflowError при записи в array('q') рассогласовал бы их с колонкой
+        if strings_count > INT64_MAX:
+            raise ValueError("Ошибка. Количество струн не помещается в 64 бита")
+
+    def _set_strings(self, index: int, strings_count: int) -> None:
+        old = self._strings[index]
+        if old == strings_count:
+            return
+        self._check_range(strings_count)
+        self._histogram[old] -= 1
+        if not self._histogram[old]:
+            del self._histogram[old]
+        self._histogram[strings_count] = self._histogram.get(strings_count, 0) + 1
+        self.total_strings += strings_count - old
+        self._strings[index] = strings_count
+
+    @staticmethod
+    def _check_strings(strings: int, action: str) -> None:
+        if not isinstance(strings, int):
+            raise TypeError(f"Ошибка. {action}ые струны strings должны быть типа int")
+        if strings <= 0:
+            raise ValueError(f"Ошибка. {action}ое количество струн strings должно быть строго положительным")
+
+    def change_electric(self, index: int) -> None:
+        """
+        Метод меняет показатель электричности гитары с указанным индексом на противоположный
+
+        :param index: Индекс гитары
+        :return: None
+
+        Примеры:
+        >>> fleet = GuitarFleet([Guitar('балалайка', 3, True)])
+        >>> fleet.change_electric(0)
+        >>> fleet.is_electric(0), fleet.electric_count
+        (False, 0)
+        """
+        self._check_index(index)
+        self._electric[index >> 3] ^= 1 << (index & 7)
+        self.electric_count += 1 if self.is_electric(index) else -1
+
+    def add_strings(self, index: int, strings: int) -> None:
+        """
+        Метод добавляет струны гитаре с указанным индексом, как Guitar.add_strings
+
+        :param index: Индекс гитары
+        :param strings: Количество струн для добавления
+        :return: None
+
+        Примеры:
+        >>> fleet = GuitarFleet([Guitar('советская гитара', 6, False)])
+        >>> fleet.add_strings(0, 'пять')
+        Traceback (most recent call last):
+        TypeError: Ошибка. Добавляемые струны strings должны быть типа int
+        >>> fleet.add_strings(0, 2 ** 63)
+        Traceback (most recent call last):
+        ValueError: Ошибка. Количество струн не помещается в 64 бита
+        >>> fleet.total_strings, fleet.strings_count(0)
+        (6, 6)
+        """
+        self._check_index(index)
+        self._check_strings(strings, "Добавляем")
+        self._set_strings(index, self._strings[index] + strings)
+
+    def remove_strings(self, index: int, strings: int) -> None:
+        """
+        Метод убирает струны у гитары с указанным индексом с ограничением снизу нулём, как Guitar.remove_strings
+
+        :param index: Индекс гитары
+        :param strings: Количество струн для удаления
+        :return: None
+
+        Примеры:
+        >>> fleet = GuitarFleet([Guitar('советская гитара', 6, False)])
+        >>> fleet.remove_strings(0, 100)
+        >>> fleet.total_strings, fleet.strings_histogram()
+        (0, {0: 1})
+        >>> fleet.remove_strings(0, -3)
+        Traceback (most recent call last):
+        ValueError: Ошибка. Удаляемое количество струн strings должно быть строго положительным
+        """
+        self._check_index(index)
+        self._check_strings(strings, "Удаляем")
+        remaining = self._strings[index] - strings
+        self._set_strings(index, remaining if 0 <= remaining else 0)
+
+    def toggle_electric(self, indices: Optional[Iterable[int]] = None) -> None:
+        """
+        Метод меняет показатель электричности на противоположный у группы гитар
+
+        :param indices: Индексы гитар. По умолчанию - весь парк за одну операцию над битовым набором
+        :return: None
+
+        Примеры:
+        >>> fleet = GuitarFleet([Guitar('балалайка', 3, True)] + [Guitar('гитара', 6, False)] * 9)
+        >>> fleet.toggle_electric()
+        >>> fleet.electric_count, fleet.is_electric(0), fleet.is_electric(9)
+        (9, False, True)
+        >>> fleet.toggle_electric([0, 1])
+        >>> fleet.electric_count
+        9
+        >>> fleet.toggle_electric([0, 10])
+        Traceback (most recent call last):
+        IndexError: Ошибка. Гитары с таким индексом нет в парке
+        >>> fleet.electric_count, fleet.is_electric(0)
+        (9, True)
+        """
+        if indices is not None:
+            for index in self._checked_indices(indices):
+                self.change_electric(index)
+            return
+        self._electric = self._electric.translate(INVERT)
+        tail = len(self._strings) % 8
+        if tail:
+            self._electric[-1] &= (1 << tail) - 1  # неиспользуемые биты последнего байта остаются нулевыми
+        self.electric_count = len(self._strings) - self.electric_count
+
+    def add_strings_bulk(self, strings: int, indices: Optional[Iterable[int]] = None) -> None:
+        """
+        Метод добавляет одинаковое количество струн группе гитар
+
+        :param strings: Количество струн для добавления
+        :param indices: Индексы гитар. По умолчанию - весь парк за один проход
+        :return: None
+
+        Примеры:
+        >>> fleet = GuitarFleet([Guitar('балалайка', 3, True), Guitar('гитара', 6, False)])
+        >>> fleet.add_strings_bulk(2)
+        >>> fleet.total_strings, fleet.strings_histogram()
+        (13, {5: 1, 8: 1})
+        >>> fleet.add_strings_bulk(1, [0, 2])
+        Traceback (most recent call last):
+        IndexError: Ошибка. Гитары с таким индексом нет в парке
+        >>> fleet.total_strings
+        13
+        """
+        self._check_strings(strings, "Добавляем")
+        if indices is not None:
+            updates = {index: self._strings[index] + strings * repeats
+                       for index, repeats in Counter(self._checked_indices(indices)).items()}
+            for strings_count in updates.values():
+                self._check_range(strings_count)
+            for index, strings_count in updates.items():
+                self._set_strings(index, strings_count)
+            return
+        self._check_range(max(self._histogram, default=0) + strings)
+        self._strings = array('q', [value + strings for value in self._strings])
+        self._histogram = {value + strings: count for value, count in self._histogram.items()}
+        self.total_strings += strings * len(self._strings)
+
+    def remove_strings_bulk(self, strings: int, indices: Optional[Iterable[int]] = None) -> None:
+        """
+        Метод убирает одинаковое количество струн у группы гитар с ограничением снизу нулём
+
+        :param strings: Количество струн для удаления
+        :param indices: Индексы гитар. По умолчанию - весь парк за один проход
+        :return: None
+
+        Примеры:
+        >>> fleet = GuitarFleet([Guitar('балалайка', 3, True), Guitar('гитара', 6, False)])
+        >>> fleet.remove_strings_bulk(4)
+        >>> fleet.total_strings, fleet.strings_histogram()
+        (2, {0: 1, 2: 1})
+        """
+        self._check_strings(strings, "Удаляем")
+        if indices is not None:
+            for index in self._checked_indices(indices):
+                self.remove_strings(index, strings)
+            return
+        self._strings = array('q', [value - strings if 0 <= value - strings else 0 for value in self._strings])
+        histogram: dict[int, int] = {}
+        for value, count in self._histogram.items():
+            value = value - strings if 0 <= value - strings else 0
+            histogram[value] = histogram.get(value, 0) + count
+        self._histogram = histogram
+        self.total_strings = sum(value * count for value, count in histogram.items())
+
+
+def benchmark(sizes: Iterable[int] = (10 ** 4, 10 ** 5, 10 ** 6), queries: int = 100) -> None:
+    """
+    Сравнивает время ответа на вопросы "сколько электрогитар" и "сколько всего струн" перебором списка Guitar
+    и через GuitarFleet
+
+    :param sizes: Количество гитар
+    :param queries: Количество запросов в замере
+    :return: None
+    """
+    rng = random.Random(0)
+    for size in sizes:
+        guitars = [Guitar('гитара', rng.randint(4, 12), rng.random() < 0.5) for _ in range(size)]
+        fleet = GuitarFleet(guitars)
+        start = time.perf_counter()
+        for _ in range(queries):
+            sum(guitar.is_electric for guitar in guitars), sum(guitar.strings_count for guitar in guitars)
+        scan_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(queries):
+            fleet.electric_count, fleet.total_strings
+        fleet_time = time.perf_counter() - start
+        print(f"{size:>8} гитар: перебор {scan_time / queries * 1e3:>8.2f} мс, "
+              f"GuitarFleet {fleet_time / queries * 1e6:.3f} мкс")
+
+
+if __name__ == "__main__":
+    doctest.testmod()
+    benchmark()
@@ -1,9 +1,27 @@
-from typing import Union
+from typing import Iterable, Iterator, Sequence, Union
 
 import doctest
+import threading
+import weakref
+
+from schema import Check, Field, Schema
 
 
 class GameCharacter:
+    _schema = Schema(
+        Field('name', str, "Ошибка. name должен быть типа str"),
+        Field('max_health', (int, float), "Ошибка. max_health должен быть типа int или float", [
+            Check('max_health < 0', ValueError, "Ошибка. max_health должен быть больше либо равен нулю"),
+        ]),
+        Field('health', (int, float), "Ошибка. health должен быть типа int или float", [
+            Check('health < 0 or health > max_health', ValueError,
+                  "Ошибка. health должен быть больше либо равен нулю и меньше max_health"),
+        ]),
+        Field('armor', (int, float), "Ошибка. armor должен быть типа int или float", [
+            Check('armor < 0', ValueError, "Ошибка. armor должен быть больше либо равен нулю"),
+        ]),
+    )
+
     def __init__(self, name: str,  max_health: Union[int, float], health: Union[int, float], armor: Union[int, float]):
         """
         Инициализация объекта "Игровой персонаж"
@@ -29,11 +47,33 @@ class GameCharacter:
         self.health = None
         self.armor = None
 
+        # Поля присваиваются через init_*, чтобы наследники могли переопределять их (например, LoggedGameCharacter
+        # записывает каждый вызов в журнал). Быстрый путь для партий персонажей - from_rows
         self.init_name(name)
         self.init_max_health(max_health)
         self.init_health(health)
         self.init_armor(armor)
 
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence]) -> list["GameCharacter"]:
+        """
+        Классовый метод, создаёт персонажей из строк (name, max_health, health, armor). Строки проверяются по столбцам
+        теми же правилами, что и в __init__, после чего объекты создаются без повторных проверок. Ни __init__, ни
+        init_* при этом не вызываются, поэтому наследники, переопределяющие их, должны переопределить и from_rows
+
+        :param rows: Строки со значениями аргументов __init__
+        :return: Список персонажей
+
+        Примеры:
+        >>> characters = GameCharacter.from_rows([('Шарик', 100, 80, 10), ('Матроскин', 50, 50, 0)])
+        >>> print(characters[1].name, characters[1].health)
+        Матроскин 50
+        >>> characters = GameCharacter.from_rows([('Шарик', 100, 80, 10), ('Матроскин', 10, 80, 30)])
+        Traceback (most recent call last):
+        ValueError: Ошибка. health должен быть больше либо равен нулю и меньше max_health
+        """
+        return cls._schema.from_rows(cls, rows)
+
     def init_name(self, name: str) -> None:
         """
         Метод, который проверяет переданное имя игрового персонажа. Если значение подходящее, присваивает новое значение
@@ -203,10 +243,107 @@ class GameCharacter:
         self.reduce_health(health_damage)
 
 
+class VersionedCatalog:
+    def __init__(self, values: Iterable[str]):
+        """
+        Инициализация объекта "Версионируемый каталог". Текущая версия и неизменяемый набор значений хранятся одним
+        кортежем, поэтому читатели получают согласованный снимок без блокировки, а писатели публикуют новую версию
+        одной заменой атрибута
+
+        :param values: Начальные значения каталога
+
+        Примеры:
+        >>> catalog = VersionedCatalog({'кеды'})
+        >>> catalog.snapshot()
+        (0, frozenset({'кеды'}))
+        >>> 'кеды' in catalog
+        True
+        """
+        self._state = (0, frozenset(values))
+        self._write_lock = threading.Lock()  # Блокировка только между писателями, читатели её не берут
+
+    def snapshot(self) -> tuple[int, frozenset]:
+        """
+        Метод возвращает версию каталога и неизменяемый набор его значений
+
+        :return: Кортеж (версия, frozenset значений)
+        """
+        return self._state
+
+    @property
+    def version(self) -> int:
+        return self._state[0]
+
+    def __contains__(self, value: object) -> bool:
+        return value in self._state[1]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._state[1])
+
+    def __len__(self) -> int:
+        return len(self._state[1])
+
+    def add(self, value: str) -> None:
+        """
+        Метод публикует новую версию каталога с добавленным значением
+
+        :param value: Добавляемое значение
+        :return: None
+
+        Примеры:
+        >>> catalog = VersionedCatalog({'кеды'})
+        >>> catalog.add('туфли')
+        >>> catalog.version, sorted(catalog)
+        (1, ['кеды', 'туфли'])
+        """
+        with self._write_lock:
+            version, values = self._state
+            self._state = (version + 1, values | {value})
+
+    def remove(self, value: str) -> None:
+        """
+        Метод публикует новую версию каталога без указанного значения
+
+        :param value: Удаляемое значение
+        :return: None
+
+        Примеры:
+        >>> catalog = VersionedCatalog({'кеды'})
+        >>> catalog.remove('кеды')
+        >>> catalog.snapshot()
+        (1, frozenset())
+        >>> catalog.remove('кеды')
+        Traceback (most recent call last):
+        KeyError: 'кеды'
+        """
+        with self._write_lock:
+            version, values = self._state
+            if value not in values:
+                raise KeyError(value)
+            self._state = (version + 1, values - {value})
+
+
 class Boot:
-    boots_database = {'кроссовки', 'кеды', 'туфли'}
-    color_database = {'чёрный', 'синий', 'красный', 'фиолетовый'}  # Скорее всего все базы обычно пишутся за пределами
-    # класса, сделано ради эксперимента
+    boots_database = VersionedCatalog({'кроссовки', 'кеды', 'туфли'})
+    color_database = VersionedCatalog({'чёрный', 'синий', 'красный', 'фиолетовый'})  # Скорее всего все базы обычно
+    # пишутся за пределами класса, сделано ради эксперимента
+    observers = weakref.WeakSet()  # Объекты с методами boot_size_changed и boot_type_removed, например BootInventory
+    _observers_lock = threading.Lock()  # Подписка из другого потока не должна менять набор во время обхода
+    _schema = Schema(
+        Field('boot_type', str, "Ошибка. Тип обуви boot_type должен быть str", [
+            Check('boot_type not in boot_types', ValueError,
+                  "Ошибка. Типа обуви '{boot_type}' нет в базе данных (boots_database - атрибут класса)"),
+        ]),
+        Field('size', (int, float), "Ошибка. Размер ботинка size должен быть int или float", [
+            Check('not (16 <= size <= 60)', ValueError,
+                  "Ошибка. Размер ботинка size должен быть в пределах от 16 до 60"),
+        ]),  # Допустим, что продаются только такие размеры
+        Field('color', str, "Ошибка. color должен быть str", [
+            Check('color not in colors', ValueError,
+                  "Ошибка. Цвета  '{color}' нет в базе данных (color_database - атрибут класса)"),
+        ]),
+        context=('boot_types', 'colors'),
+    )
 
     def __init__(self, boot_type: str, size: Union[int, float], color: str):
         """
@@ -216,8 +353,12 @@ class Boot:
         :param size: Размер ботинка
         :param color: Цвет ботинка
 
+        В атрибуте catalog_version сохраняются версии boots_database и color_database, по которым ботинок был проверен
+
         Примеры:
         >>> boot = Boot('кроссовки', 36, 'фиолетовый')
+        >>> boot.catalog_version == (Boot.boots_database.version, Boot.color_database.version)
+        True
 
         >>> boot = Boot('мокасины', 60, 'красный')
         Traceback (most recent call last):
@@ -229,24 +370,32 @@ class Boot:
         Traceback (most recent call last):
         TypeError: Ошибка. color должен быть str
         """
-        if not isinstance(boot_type, str):
-            raise TypeError("Ошибка. Тип обуви boot_type должен быть str")
-        if boot_type not in Boot.boots_database:
-            raise ValueError(f"Ошибка. Типа обуви '{boot_type}' нет в базе данных (boots_database - атрибут класса)")
-        self.boot_type = boot_type
+        types_version, boot_types = Boot.boots_database.snapshot()
+        colors_version, colors = Boot.color_database.snapshot()
+        Boot._schema.init(self, boot_type, size, color, boot_types, colors)
+        self.catalog_version = (types_version, colors_version)
 
-        if not isinstance(size, (int, float)):
-            raise TypeError("Ошибка. Размер ботинка size должен быть int или float")
-        if not (16 <= size <= 60):
-            raise ValueError("Ошибка. Размер ботинка size должен быть в пределах от 16 до 60")  # Допустим, что
-            # продаются только такие размеры
-        self.size = size
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence]) -> list["Boot"]:
+        """
+        Классовый метод, создаёт ботинки из строк (boot_type, size, color). Вся партия проверяется по одному снимку
+        баз данных теми же правилами, что и в __init__, после чего объекты создаются без повторных проверок
 
-        if not isinstance(color, str):
-            raise TypeError("Ошибка. color должен быть str")
-        if color not in Boot.color_database:
-            raise ValueError(f"Ошибка. Цвета  '{color}' нет в базе данных (color_database - атрибут класса)")
-        self.color = color
+        :param rows: Строки со значениями аргументов __init__
+        :return: Список ботинков
+
+        Примеры:
+        >>> boots = Boot.from_rows([('кроссовки', 36, 'фиолетовый'), ('кеды', 40, 'синий')])
+        >>> print(boots[1].boot_type, boots[1].size, boots[1].color)
+        кеды 40 синий
+        >>> boots = Boot.from_rows([('кроссовки', 36, 'фиолетовый'), ('кеды', 40, 'зелёный')])
+        Traceback (most recent call last):
+        ValueError: Ошибка. Цвета  'зелёный' нет в базе данных (color_database - атрибут класса)
+        """
+        types_version, boot_types = Boot.boots_database.snapshot()
+        colors_version, colors = Boot.color_database.snapshot()
+        return cls._schema.from_rows(cls, rows, boot_types, colors,
+                                     attributes={'catalog_version': (types_version, colors_version)})
 
     def delta_size(self, size: Union[int, float]) -> None:
         """
@@ -269,10 +418,31 @@ class Boot:
         """
         if not isinstance(size, (int, float)):
             raise TypeError("Ошибка. Размер ботинка size должен быть int или float")
+        old_size = self.size
         if size >= 0:
             self.size = self.size + size if self.size + size <= 60 else 60
         else:
             self.size = self.size + size if 16 <= self.size + size else 16
+        if self.size != old_size:
+            for observer in Boot._current_observers():
+                observer.boot_size_changed(self, old_size)
+
+    @classmethod
+    def add_observer(cls, observer: object) -> None:
+        """
+        Классовый метод, подписывает объект на изменения размеров ботинков и удаление типов обуви. Подписка хранится
+        по слабой ссылке и пропадает вместе с объектом
+
+        :param observer: Объект с методами boot_size_changed(boot, old_size) и boot_type_removed(boot_type)
+        :return: None
+        """
+        with cls._observers_lock:
+            cls.observers.add(observer)
+
+    @classmethod
+    def _current_observers(cls) -> list:
+        with cls._observers_lock:
+            return list(cls.observers)
 
     @classmethod
     def add_boot_type(cls, boot_type: str) -> None:
@@ -315,13 +485,25 @@ class Boot:
         """
         if not isinstance(boot_type, str):
             raise TypeError("Ошибка. boot_type должен быть str")
-        if boot_type not in cls.boots_database:
+        try:
+            cls.boots_database.remove(boot_type)
+        except KeyError:
             raise ValueError(f"Ошибка удаления. Типа обуви '{boot_type}' нет в базе данных "
-                             f"(boots_database - атрибут класса)")
-        cls.boots_database.remove(boot_type)
+                             f"(boots_database - атрибут класса)") from None
+        for observer in cls._current_observers():
+            observer.boot_type_removed(boot_type)
 
 
 class Guitar:
+    _schema = Schema(
+        Field('guitar_type', str, "Ошибка. Тип гитары guitar_type должен быть str"),
+        Field('strings_count', int, "Ошибка. Количество струн strings_count должен быть int", [
+            Check('strings_count < 0', ValueError,
+                  "Ошибка. Количество струн strings_count должен быть больше либо равен нулю"),
+        ]),
+        Field('is_electric', bool, "Ошибка. is_electric должен быть типа bool"),
+    )
+
     def __init__(self, guitar_type: str, strings_count: int, is_electric: bool):
         """
         Инициализация объекта "Гитара"
@@ -343,19 +525,23 @@ class Guitar:
         Traceback (most recent call last):
         ValueError: Ошибка. Количество струн strings_count должен быть больше либо равен нулю
         """
-        if not isinstance(guitar_type, str):
-            raise TypeError("Ошибка. Тип гитары guitar_type должен быть str")
-        self.guitar_type = guitar_type
+        self._schema.init(self, guitar_type, strings_count, is_electric)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence]) -> list["Guitar"]:
+        """
+        Классовый метод, создаёт гитары из строк (guitar_type, strings_count, is_electric). Строки проверяются по
+        столбцам теми же правилами, что и в __init__, после чего объекты создаются без повторных проверок
 
-        if not isinstance(strings_count, int):
-            raise TypeError("Ошибка. Количество струн strings_count должен быть int")
-        if strings_count < 0:
-            raise ValueError("Ошибка. Количество струн strings_count должен быть больше либо равен нулю")
-        self.strings_count = strings_count
+        :param rows: Строки со значениями аргументов __init__
+        :return: Список гитар
 
-        if not isinstance(is_electric, bool):
-            raise TypeError("Ошибка. is_electric должен быть типа bool")
-        self.is_electric = is_electric
+        Примеры:
+        >>> guitars = Guitar.from_rows([('балалайка', 3, True), ('советская гитара', 6, False)])
+        >>> print(guitars[1].guitar_type, guitars[1].strings_count, guitars[1].is_electric)
+        советская гитара 6 False
+        """
+        return cls._schema.from_rows(cls, rows)
 
     def change_electric(self) -> None:
         """
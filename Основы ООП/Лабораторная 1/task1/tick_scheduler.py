@@ -0,0 +1,246 @@
+from collections import deque
+from typing import Optional, Union
+
+import asyncio
+import doctest
+import time
+
+from main import GameCharacter
+
+
+TAKE_DAMAGE, REDUCE_HEALTH, INCREASE_HEALTH = range(3)
+
+
+class TickScheduler:
+    """
+    Планировщик игровых тиков. Урон и лечение не применяются сразу, а накапливаются в очереди персонажа и
+    применяются раз в тик одним проходом по событиям каждого персонажа в порядке поступления, с той же
+    арифметикой и теми же ограничениями, что и методы GameCharacter.
+    """
+    def __init__(self, interval: float = 0.05, latency_window: int = 10_000):
+        """
+        Инициализация объекта "Планировщик тиков"
+
+        :param interval: Длительность тика в секундах
+        :param latency_window: Количество последних тиков, по которым считаются перцентили длительности
+
+        Примеры:
+        >>> scheduler = TickScheduler(0.1)
+        >>> scheduler = TickScheduler(0)
+        Traceback (most recent call last):
+        ValueError: Ошибка. interval должен быть строго положительным
+        """
+        if not isinstance(interval, (int, float)):
+            raise TypeError("Ошибка. interval должен быть int или float")
+        if interval <= 0:
+            raise ValueError("Ошибка. interval должен быть строго положительным")
+        self.interval = interval
+        self._pending: dict[GameCharacter, list[tuple[int, Union[int, float]]]] = {}
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+        self._running = False
+        self.ticks = 0
+        self.applied_events = 0
+        self.rejected_events = 0
+
+    def _events(self, character: GameCharacter) -> list[tuple[int, Union[int, float]]]:
+        events = self._pending.get(character)
+        if events is None:
+            if not isinstance(character, GameCharacter):
+                raise TypeError("Ошибка. character должен быть объектом класса GameCharacter")
+            events = self._pending[character] = []
+        return events
+
+    def take_damage(self, character: GameCharacter, enemy_damage: Union[int, float]) -> None:
+        """
+        Метод ставит в очередь урон с учётом брони, как GameCharacter.take_damage. Значение проверяется сразу
+
+        :param character: Персонаж
+        :param enemy_damage: Полученный урон
+        :return: None
+
+        Примеры:
+        >>> scheduler = TickScheduler()
+        >>> man = GameCharacter('Шарик', 100, 80, 10)
+        >>> scheduler.take_damage(man, 10)
+        >>> scheduler.take_damage(man, 15)
+        >>> print(man.health)
+        80
+        >>> scheduler.tick()
+        2
+        >>> print(man.health)
+        64.25
+        >>> scheduler.take_damage(man, -15)
+        Traceback (most recent call last):
+        ValueError: Ошибка. Значение урона enemy_damage должно быть строго положительным
+        """
+        if not isinstance(enemy_damage, (int, float)):
+            raise TypeError("Ошибка. Значение урона enemy_damage должно быть int или float")
+        if enemy_damage <= 0:
+            raise ValueError("Ошибка. Значение урона enemy_damage должно быть строго положительным")
+        self._events(character).append((TAKE_DAMAGE, enemy_damage))
+
+    def reduce_health(self, character: GameCharacter, health_damage: Union[int, float]) -> None:
+        """
+        Метод ставит в очередь итоговое уменьшение здоровья, как GameCharacter.reduce_health
+
+        :param character: Персонаж
+        :param health_damage: Количество здоровья, на которое необходимо уменьшить текущее здоровье
+        :return: None
+        """
+        if not isinstance(health_damage, (int, float)):
+            raise TypeError("Ошибка. Значение полученного урона health_damage должно быть int или float")
+        if health_damage <= 0:
+            raise ValueError("Ошибка. Значение полученного урона health_damage должно быть строго положительным")
+        self._events(character).append((REDUCE_HEALTH, health_damage))
+
+    def increase_health(self, character: GameCharacter, health_increment: Union[int, float]) -> None:
+        """
+        Метод ставит в очередь лечение, как GameCharacter.increase_health
+
+        :param character: Персонаж
+        :param health_increment: Количество здоровья, на которое необходимо увеличить текущее здоровье
+        :return: None
+
+        Примеры:
+        >>> scheduler = TickScheduler()
+        >>> man = GameCharacter('Шарик', 100, 80, 10)
+        >>> scheduler.reduce_health(man, 90)
+        >>> scheduler.increase_health(man, 30)
+        >>> scheduler.tick()
+        2
+        >>> print(man.health)
+        30
+        """
+        if not isinstance(health_increment, (int, float)):
+            raise TypeError("Ошибка. Значение увеличения здоровья health_increment должно быть int или float")
+        if health_increment <= 0:
+            raise ValueError("Ошибка. Значение увеличения здоровья health_increment должно быть строго положительным")
+        self._events(character).append((INCREASE_HEALTH, health_increment))
+
+    def tick(self) -> int:
+        """
+        Метод применяет все накопленные события. Удар, который при текущей броне не наносит урона (GameCharacter
+        в этом случае выбрасывает ValueError), пропускается и учитывается в rejected_events
+
+        :return: Количество применённых событий
+        """
+        start = time.perf_counter()
+        pending, self._pending = self._pending, {}
+        applied = 0
+        for character, events in pending.items():
+            health, max_health, armor = character.health, character.max_health, character.armor
+            reduction = round((armor * 0.06) / (1 + armor * 0.06), 2)
+            for kind, value in events:
+                if kind == TAKE_DAMAGE:
+                    value = value - value * reduction
+                    if value <= 0:
+                        self.rejected_events += 1
+                        continue
+                if kind == INCREASE_HEALTH:
+                    health = health + value if health + value < max_health else max_health
+                else:
+                    health = health - value if 0 < health - value else 0
+                applied += 1
+            character.health = health
+        self.ticks += 1
+        self.applied_events += applied
+        self._latencies.append(time.perf_counter() - start)
+        return applied
+
+    def latency_percentile(self, percent: Union[int, float]) -> Optional[float]:
+        """
+        Метод возвращает перцентиль длительности тика в секундах по последним тикам
+
+        :param percent: Перцентиль от 0 до 100
+        :return: Длительность тика или None, если тиков ещё не было
+        """
+        if not 0 <= percent <= 100:
+            raise ValueError("Ошибка. percent должен быть в пределах от 0 до 100")
+        if not self._latencies:
+            return None
+        latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percent / 100))]
+
+    def metrics(self) -> dict[str, Union[int, float, None]]:
+        """
+        Метод возвращает счётчики планировщика и перцентили p50/p99 длительности тика
+
+        :return: Словарь метрик
+        """
+        return {
+            "ticks": self.ticks,
+            "applied_events": self.applied_events,
+            "rejected_events": self.rejected_events,
+            "pending_characters": len(self._pending),
+            "tick_latency_p50": self.latency_percentile(50),
+            "tick_latency_p99": self.latency_percentile(99),
+        }
+
+    async def run(self) -> None:
+        """
+        Корутина выполняет тики каждые interval секунд, пока не будет вызван метод stop
+
+        :return: None
+        """
+        loop = asyncio.get_running_loop()
+        self._running = True
+        next_tick = loop.time()
+        while self._running:
+            next_tick += self.interval
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            self.tick()
+
+    def stop(self) -> None:
+        self._running = False
+
+
+def benchmark(characters: int = 100, events_per_character: int = 100) -> None:
+    """
+    Сравнивает стоимость одного события при прямых вызовах GameCharacter и при накоплении в TickScheduler
+
+    :param characters: Количество персонажей
+    :param events_per_character: Количество событий на персонажа за тик
+    :return: None
+    """
+    events = characters * events_per_character
+    targets = [GameCharacter('Шарик', 10 ** 9, 10 ** 9, index % 50) for index in range(characters)]
+    start = time.perf_counter()
+    for _ in range(events_per_character):
+        for character in targets:
+            character.take_damage(3)
+            character.increase_health(1)
+    direct_time = time.perf_counter() - start
+
+    scheduler = TickScheduler()
+    start = time.perf_counter()
+    for _ in range(events_per_character):
+        for character in targets:
+            scheduler.take_damage(character, 3)
+            scheduler.increase_health(character, 1)
+    scheduler.tick()
+    scheduled_time = time.perf_counter() - start
+    print(f"{2 * events} событий: прямые вызовы {direct_time / (2 * events) * 1e9:.0f} нс/событие, "
+          f"TickScheduler {scheduled_time / (2 * events) * 1e9:.0f} нс/событие")
+
+
+async def _demo() -> None:
+    scheduler = TickScheduler(interval=0.01)
+    heroes = [GameCharacter(f'Герой {index}', 100, 100, index) for index in range(1000)]
+    ticker = asyncio.create_task(scheduler.run())
+
+    async def attacker(hero: GameCharacter) -> None:
+        for _ in range(20):
+            scheduler.take_damage(hero, 1)
+            await asyncio.sleep(0.001)
+
+    await asyncio.gather(*(attacker(hero) for hero in heroes))
+    await asyncio.sleep(2 * scheduler.interval)
+    scheduler.stop()
+    await ticker
+    print(scheduler.metrics())
+
+
+if __name__ == "__main__":
+    doctest.testmod()
+    asyncio.run(_demo())
+    benchmark()